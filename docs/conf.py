@@ -148,6 +148,7 @@ html_theme_options = {
             ("_menu", "Services Attributes", [
                 ("Webhooks Attributes", "config/webhooks"),
                 ("Plex Attributes", "config/plex"),
+                ("Emby Attributes", "config/emby"),
                 ("TMDb Attributes", "config/tmdb"),
                 ("Tautulli Attributes", "config/tautulli"),
                 ("OMDb Attributes", "config/omdb"),
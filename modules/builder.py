@@ -564,10 +564,10 @@ class CollectionBuilder:
                 self.details["collection_order"] = test_sort.lower()
                 if test_sort.lower() == "custom" and self.build_collection:
                     self.custom_sort = True
-            elif (self.library.is_movie and test_sort.lower() in plex.movie_sorts) or (self.library.is_show and test_sort.lower() in plex.show_sorts):
+            elif test_sort.lower().partition(".")[0] in emby.search_sorts and test_sort.lower().partition(".")[2] in ["", "asc", "desc"]:
                 self.custom_sort = test_sort.lower()
             else:
-                raise Failed(f"{self.Type} Error: {test_sort} collection_order invalid\n\trelease (Order Collection by release dates)\n\talpha (Order Collection Alphabetically)\n\tcustom (Custom Order Collection)\n\tOther sorting options can be found at https://github.com/meisnate12/Plex-Meta-Manager/wiki/Smart-Builders#sort-options")
+                raise Failed(f"{self.Type} Error: {test_sort} collection_order invalid\n\trelease (Order Collection by release dates)\n\talpha (Order Collection Alphabetically)\n\tcustom (Custom Order Collection)\n\tOther sorting options: {', '.join(emby.search_sorts)} (optionally ending in .asc or .desc)")
 
         if self.smart_url or self.smart_label_collection:
             self.custom_sort = False
@@ -1156,7 +1156,7 @@ class CollectionBuilder:
                 if method_name == "emby_search":
                     type_override = f"{self.collection_level}s" if self.collection_level in emby.collection_level_options else None
                     new_dictionary = dict(dict_data)
-                    #new_dictionary = self.build_emby_filter("emby_search", dict_data, type_override=type_override)
+                    self.library.build_search(new_dictionary)
                 elif method_name == "plex_collectionless":
                     prefix_list = util.parse(self.Type, "exclude_prefix", dict_data, datatype="list", methods=dict_methods) if "exclude_prefix" in dict_methods else []
                     exact_list = util.parse(self.Type, "exclude", dict_data, datatype="list", methods=dict_methods) if "exclude" in dict_methods else []
@@ -1167,7 +1167,9 @@ class CollectionBuilder:
                     new_dictionary["exclude"] = exact_list
                 self.builders.append((method_name, new_dictionary))
         else:
-            self.builders.append(("plex_search", self.build_filter("plex_search", {"any": {method_name: method_data}})))
+            new_dictionary = {"any": {method_name: method_data}}
+            self.library.build_search(new_dictionary)
+            self.builders.append(("emby_search", new_dictionary))
 
     def _plex(self, method_name, method_data):
         if method_name in ["plex_all", "plex_pilots"]:
@@ -1176,9 +1178,11 @@ class CollectionBuilder:
             for dict_data in util.parse(self.Type, method_name, method_data, datatype="listdict"):
                 dict_methods = {dm.lower(): dm for dm in dict_data}
                 new_dictionary = {}
+                builder_name = method_name
                 if method_name == "plex_search":
-                    type_override = f"{self.collection_level}s" if self.collection_level in plex.collection_level_options else None
-                    new_dictionary = self.build_filter("plex_search", dict_data, type_override=type_override)
+                    new_dictionary = dict(dict_data)
+                    self.library.build_search(new_dictionary)
+                    builder_name = "emby_search"
                 elif method_name == "plex_collectionless":
                     prefix_list = util.parse(self.Type, "exclude_prefix", dict_data, datatype="list", methods=dict_methods) if "exclude_prefix" in dict_methods else []
                     exact_list = util.parse(self.Type, "exclude", dict_data, datatype="list", methods=dict_methods) if "exclude" in dict_methods else []
@@ -1187,9 +1191,11 @@ class CollectionBuilder:
                     exact_list.append(self.name)
                     new_dictionary["exclude_prefix"] = prefix_list
                     new_dictionary["exclude"] = exact_list
-                self.builders.append((method_name, new_dictionary))
+                self.builders.append((builder_name, new_dictionary))
         else:
-            self.builders.append(("plex_search", self.build_filter("plex_search", {"any": {method_name: method_data}})))
+            new_dictionary = {"any": {method_name: method_data}}
+            self.library.build_search(new_dictionary)
+            self.builders.append(("emby_search", new_dictionary))
 
     def _reciperr(self, method_name, method_data):
         if method_name == "reciperr_list":
@@ -1431,8 +1437,6 @@ class CollectionBuilder:
             ids = []
             logger.error(f"{self.Type} Error: {method} method not supported")
         if self.config.Cache and self.details["cache_builders"] and ids:
-            if list_key:
-                self.config.Cache.delete_list_ids(list_key)
             list_key = self.config.Cache.update_list_cache(method, str(value), expired, self.details["cache_builders"])
             self.config.Cache.update_list_ids(list_key, ids)
         return ids
@@ -1444,6 +1448,18 @@ class CollectionBuilder:
             logger.debug("")
             logger.debug(f"{total_ids} IDs Found: {ids}")
             logger.debug("")
+            imdb_conversions = {}
+            if self.collection_level == "episode" or self.playlist or self.do_missing:
+                imdb_ids = [input_id for input_id, id_type in ids if id_type == "imdb" and input_id not in self.ignore_imdb_ids
+                            and not any([input_id in pl_library.imdb_map for pl_library in self.libraries])]
+                imdb_conversions = self.config.Convert.imdb_to_tmdb_many(imdb_ids) if imdb_ids else {}
+            tmdb_show_ids = [input_id for input_id, id_type in ids if id_type == "tmdb_show" and not self.parts_collection]
+            for _id, tmdb_type in imdb_conversions.values():
+                if tmdb_type == "show" and self.do_missing:
+                    tmdb_show_ids.append(_id)
+                elif tmdb_type == "episode" and (self.collection_level == "episode" or self.playlist):
+                    tmdb_show_ids.append(_id.split("_")[0])
+            tvdb_conversions = self.config.Convert.tmdb_to_tvdb_many(tmdb_show_ids) if tmdb_show_ids else {}
             for i, input_data in enumerate(ids, 1):
                 input_id, id_type = input_data
                 logger.ghost(f"Parsing ID {i}/{total_ids}")
@@ -1460,11 +1476,15 @@ class CollectionBuilder:
                                 break
                         if not found and (self.collection_level == "episode" or self.playlist or self.do_missing):
                             try:
-                                _id, tmdb_type = self.config.Convert.imdb_to_tmdb(input_id, fail=True)
+                                _id, tmdb_type = imdb_conversions[input_id] if input_id in imdb_conversions else (None, None)
+                                if not _id:
+                                    raise Failed(f"Convert Error: No TMDb ID Found for IMDb ID: {input_id}")
                                 if tmdb_type == "episode" and (self.collection_level == "episode" or self.playlist):
                                     try:
                                         tmdb_id, season_num, episode_num = _id.split("_")
-                                        tvdb_id = self.config.Convert.tmdb_to_tvdb(tmdb_id, fail=True)
+                                        tvdb_id = tvdb_conversions[int(tmdb_id)] if int(tmdb_id) in tvdb_conversions else None
+                                        if not tvdb_id:
+                                            raise Failed(f"Convert Error: No TVDb ID Found for TMDb ID: {tmdb_id}")
                                         tvdb_id = int(tvdb_id)
                                     except Failed as e:
                                         try:
@@ -1495,7 +1515,9 @@ class CollectionBuilder:
                                 elif tmdb_type == "movie" and self.do_missing and _id not in self.missing_movies:
                                     self.missing_movies.append(_id)
                                 elif tmdb_type == "show" and self.do_missing:
-                                    tvdb_id = self.config.Convert.tmdb_to_tvdb(_id, fail=True)
+                                    tvdb_id = tvdb_conversions[int(_id)] if int(_id) in tvdb_conversions else None
+                                    if not tvdb_id:
+                                        raise Failed(f"Convert Error: No TVDb ID Found for TMDb ID: {_id}")
                                     if tvdb_id not in self.missing_shows:
                                         self.missing_shows.append(tvdb_id)
                             except Failed as e:
@@ -1515,10 +1537,9 @@ class CollectionBuilder:
                             self.missing_movies.append(input_id)
                 elif id_type in ["tvdb", "tmdb_show"] and not self.parts_collection:
                     if id_type == "tmdb_show":
-                        try:
-                            tvdb_id = self.config.Convert.tmdb_to_tvdb(input_id, fail=True)
-                        except Failed as e:
-                            logger.warning(e)
+                        tvdb_id = tvdb_conversions[int(input_id)] if int(input_id) in tvdb_conversions else None
+                        if not tvdb_id:
+                            logger.warning(f"Convert Error: No TVDb ID Found for TMDb ID: {input_id}")
                             continue
                     else:
                         tvdb_id = int(input_id)
@@ -1569,16 +1590,9 @@ class CollectionBuilder:
 
                 if not isinstance(rating_keys, list):
                     rating_keys = [rating_keys]
-                for rk in rating_keys:
-                    try:
-                        item = self.fetch_item(rk)
-                        if self.playlist and isinstance(item, (Show, Season)):
-                            items.extend(item.episodes())
-                        else:
-                            items.append(item)
-                    except Failed as e:
-                        logger.error(e)
+                items.extend(rating_keys)
             logger.exorcise()
+            items = self.load_items(items)
         if not items:
             return None
         name = self.obj.name if self.obj else self.name
@@ -2094,6 +2108,37 @@ class CollectionBuilder:
         except (BadRequest, NotFound):
             raise Failed(f"Plex Error: Item {item} not found")
 
+    def fetch_items(self, rating_keys):
+        rating_keys = list(dict.fromkeys([str(rk) for rk in rating_keys]))
+        if not rating_keys:
+            return {}
+        try:
+            current = self.library.fetch_items(rating_keys, filters=self.filters)
+        except Failed as e:
+            logger.error(e)
+            return {}
+        items = {}
+        for rk in rating_keys:
+            item = current[rk] if rk in current else None
+            if item is None or item.type not in ["Movie", "Series", "Season", "Episode", "MusicArtist", "MusicAlbum", "Audio", "BoxSet"]:
+                logger.error(f"Plex Error: Item {rk} not found")
+            else:
+                items[rk] = item
+        return items
+
+    def load_items(self, items):
+        fetched = self.fetch_items([rk for rk in items if isinstance(rk, (str, int))])
+        loaded_items = []
+        for item in items:
+            if not isinstance(item, (str, int)):
+                loaded_items.append(item)
+            elif str(item) in fetched:
+                if self.playlist and isinstance(fetched[str(item)], (Show, Season)):
+                    loaded_items.extend(fetched[str(item)].episodes())
+                else:
+                    loaded_items.append(fetched[str(item)])
+        return loaded_items
+
     def favorite_collection(self, recursive=False):
         collection_id, collection_items = self.library.get_collection_id_and_items(self.obj.name if self.obj else self.name, self.smart_label_collection)
         if recursive:
@@ -2860,21 +2905,16 @@ class CollectionBuilder:
         if self.custom_sort is True:
             items = self.added_items
         else:
-            plex_search = {"sort_by": self.custom_sort}
-            if self.collection_level in ["season", "episode"]:
-                plex_search["type"] = f"{self.collection_level}s"
-                plex_search["any"] = {f"{self.collection_level}_collection": self.name}
-            else:
-                plex_search["any"] = {"collection": self.name}
-            search_data = self.build_filter("plex_search", plex_search)
-            items = self.library.get_filter_items(search_data[2])
-        previous = None
-        for i, item in enumerate(items, 0):
-            if len(self.items) <= i or item.ratingKey != self.items[i].ratingKey:
-                text = f"after {util.item_title(previous)}" if previous else "to the beginning"
-                logger.info(f"Moving {util.item_title(item)} {text}")
-                self.library.moveItem(self.obj, item, previous)
-            previous = item
+            try:
+                items = self.library.get_filter_items({"sort_by": self.custom_sort, "all": {"collection": self.name}})
+            except Failed as e:
+                logger.error(e)
+                return
+        if [item.id for item in items] == [item.id for item in self.items]:
+            logger.info(f"{self.Type} is already sorted")
+        else:
+            # Emby has no API to move an item within a collection
+            logger.warning(f"{self.Type} Warning: Emby does not support reordering {self.Type} items, collection_order {'custom' if self.custom_sort is True else self.custom_sort} skipped")
 
     def delete_user_playlist(self, title, user):
         user_server = self.library.PlexServer.switchUser(user)
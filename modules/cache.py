@@ -1,276 +1,742 @@
-import os, random, sqlite3
-from contextlib import closing
+import atexit, base64, bisect, csv, gzip, json, os, random, sqlite3, threading, time, zlib
+from contextlib import closing, contextmanager
 from datetime import datetime, timedelta
 from modules import util
+from retrying import retry
 
 logger = util.logger
 
+expiring_tables = [
+    "guids_map", "imdb_to_tmdb_map", "imdb_to_tvdb_map2", "tmdb_to_tvdb_map2", "letterboxd_map", "flixpatrol_map", "omdb_data3",
+    "mdb_data2", "tmdb_movie_data", "tmdb_show_data", "anime_map", "list_cache", "imdb_parental", "ergast_race"
+]
+snapshot_tables = {
+    "imdb_to_tmdb_map": ["imdb_id"], "imdb_to_tvdb_map2": ["imdb_id"], "tmdb_to_tvdb_map2": ["tmdb_id"], "letterboxd_map": ["letterboxd_id"],
+    "flixpatrol_map": ["flixpatrol_id"], "anime_map": ["anidb"], "omdb_data3": ["imdb_id"], "mdb_data2": ["key_id"],
+    "tmdb_movie_data": ["tmdb_id"], "tmdb_show_data": ["tmdb_id"], "imdb_parental": ["imdb_id"], "list_cache": ["list_type", "list_data"],
+    "cache_data": ["data_type", "data_id"]
+}
+compressed_tables = ["omdb_data3", "mdb_data2", "tmdb_movie_data", "tmdb_show_data"]
+list_gap = 1024
+static_expires_at = 253402214400
+mapping_aliases = {"imdb": "imdb_id", "tmdb": "tmdb_id", "themoviedb_id": "tmdb_id", "tvdb": "tvdb_id", "thetvdb_id": "tvdb_id", "type": "media_type"}
+mapping_types = {"movie": "movie", "show": "show", "tv": "show", "series": "show"}
+journal_modes = {"wal": "Write-Ahead Logging (Local Disks)", "delete": "Rollback Journal (Network Filesystems)"}
+
+def retry_if_locked(exception):
+    return isinstance(exception, sqlite3.OperationalError) and ("locked" in str(exception) or "busy" in str(exception))
+
+class CompressedData(dict):
+    def __init__(self, data, convert):
+        super().__init__()
+        self._data = data
+        self._convert = convert
+
+    def _load(self):
+        if self._data is not None:
+            super().update(self._convert(json.loads(zlib.decompress(self._data))))
+            self._data = None
+
+    def __getitem__(self, key):
+        self._load()
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        self._load()
+        return super().__contains__(key)
+
+    def __iter__(self):
+        self._load()
+        return super().__iter__()
+
+    def __len__(self):
+        self._load()
+        return super().__len__()
+
+    def __bool__(self):
+        return True
+
+    def get(self, key, default=None):
+        self._load()
+        return super().get(key, default)
+
+    def keys(self):
+        self._load()
+        return super().keys()
+
+    def items(self):
+        self._load()
+        return super().items()
+
+    def values(self):
+        self._load()
+        return super().values()
+
 class Cache:
-    def __init__(self, config_path, expiration):
+    def __init__(self, config_path, params):
         self.cache_path = f"{os.path.splitext(config_path)[0]}.cache"
-        self.expiration = expiration
-        with sqlite3.connect(self.cache_path) as connection:
+        self.expiration = params["expiration"]
+        self.busy_timeout = params["busy_timeout"]
+        self.batch_size = params["batch_size"]
+        self.batch_seconds = params["batch_seconds"]
+        self.failed_expiration = params["failed_expiration"]
+        self.compress = params["compress"]
+        self.journal_mode = params["journal_mode"]
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._guid_maps = {}
+        self._image_maps = {}
+        self._image_tables = {}
+        self.stats = {}
+        self._write_lock = threading.RLock()
+        self._writes = {}
+        self._write_keys = {}
+        self._write_tables = set()
+        self._write_count = 0
+        self._write_start = None
+        atexit.register(self.close)
+        migrations = [self._create_tables, self._add_expiration_columns, self._add_failed_conversions, self._add_cache_data, self._add_list_positions]
+        with self._cursor() as cursor:
+            version = self._schema_version(cursor)
+            if version == 0:
+                cursor.execute("SELECT count(name) FROM sqlite_master WHERE type='table' AND name='guids_map'")
+                new_cache = cursor.fetchone()[0] == 0
+            else:
+                new_cache = False
+            logger.info(f"{'Initializing' if new_cache else 'Using'} cache database at {self.cache_path}")
+            if version < len(migrations):
+                cursor.execute("BEGIN IMMEDIATE")
+                version = self._schema_version(cursor)
+                if not new_cache and version < len(migrations):
+                    logger.info(f"Migrating cache database from version {version} to {len(migrations)}")
+                for migration in migrations[version:]:
+                    migration(cursor)
+                cursor.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER)")
+                cursor.execute("DELETE FROM schema_version")
+                cursor.execute("INSERT INTO schema_version(version) VALUES(?)", (len(migrations),))
+
+    def _schema_version(self, cursor):
+        try:
+            cursor.execute("SELECT version FROM schema_version")
+            row = cursor.fetchone()
+            return row["version"] if row else 0
+        except sqlite3.OperationalError:
+            return 0
+
+    def _create_tables(self, cursor):
+        cursor.execute("DROP TABLE IF EXISTS guids")
+        cursor.execute("DROP TABLE IF EXISTS guid_map")
+        cursor.execute("DROP TABLE IF EXISTS imdb_to_tvdb_map")
+        cursor.execute("DROP TABLE IF EXISTS tmdb_to_tvdb_map")
+        cursor.execute("DROP TABLE IF EXISTS imdb_map")
+        cursor.execute("DROP TABLE IF EXISTS mdb_data")
+        cursor.execute("DROP TABLE IF EXISTS omdb_data")
+        cursor.execute("DROP TABLE IF EXISTS omdb_data2")
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS guids_map (
+            key INTEGER PRIMARY KEY,
+            emby_guid TEXT UNIQUE,
+            t_id TEXT,
+            imdb_id TEXT,
+            media_type TEXT,
+            expires_at INTEGER)"""
+        )
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS imdb_to_tmdb_map (
+            key INTEGER PRIMARY KEY,
+            imdb_id TEXT UNIQUE,
+            tmdb_id TEXT,
+            media_type TEXT,
+            expires_at INTEGER)"""
+        )
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS imdb_to_tvdb_map2 (
+            key INTEGER PRIMARY KEY,
+            imdb_id TEXT UNIQUE,
+            tvdb_id TEXT,
+            expires_at INTEGER)"""
+        )
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS tmdb_to_tvdb_map2 (
+            key INTEGER PRIMARY KEY,
+            tmdb_id TEXT UNIQUE,
+            tvdb_id TEXT,
+            expires_at INTEGER)"""
+        )
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS letterboxd_map (
+            key INTEGER PRIMARY KEY,
+            letterboxd_id TEXT UNIQUE,
+            tmdb_id TEXT,
+            expires_at INTEGER)"""
+        )
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS flixpatrol_map (
+            key INTEGER PRIMARY KEY,
+            flixpatrol_id TEXT UNIQUE,
+            tmdb_id TEXT,
+            media_type TEXT,
+            expires_at INTEGER)"""
+        )
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS omdb_data3 (
+            key INTEGER PRIMARY KEY,
+            imdb_id TEXT UNIQUE,
+            title TEXT,
+            year INTEGER,
+            released TEXT,
+            content_rating TEXT,
+            genres TEXT,
+            imdb_rating REAL,
+            imdb_votes INTEGER,
+            metacritic_rating INTEGER,
+            type TEXT,
+            series_id TEXT,
+            season_num INTEGER,
+            episode_num INTEGER,
+            expires_at INTEGER)"""
+        )
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS mdb_data2 (
+            key INTEGER PRIMARY KEY,
+            key_id TEXT UNIQUE,
+            title TEXT,
+            year INTEGER,
+            released TEXT,
+            type TEXT,
+            imdbid TEXT,
+            traktid INTEGER,
+            tmdbid INTEGER,
+            score INTEGER,
+            imdb_rating REAL,
+            metacritic_rating INTEGER,
+            metacriticuser_rating REAL,
+            trakt_rating INTEGER,
+            tomatoes_rating INTEGER,
+            tomatoesaudience_rating INTEGER,
+            tmdb_rating INTEGER,
+            letterboxd_rating REAL,
+            commonsense TEXT,
+            certification TEXT,
+            expires_at INTEGER)"""
+        )
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS tmdb_movie_data (
+            key INTEGER PRIMARY KEY,
+            tmdb_id INTEGER UNIQUE,
+            title TEXT,
+            original_title TEXT,
+            studio TEXT,
+            overview TEXT,
+            tagline TEXT,
+            imdb_id TEXT,
+            poster_url TEXT,
+            backdrop_url TEXT,
+            vote_count INTEGER,
+            vote_average REAL,
+            language_iso TEXT,
+            language_name TEXT,
+            genres TEXT,
+            keywords TEXT,
+            release_date TEXT,
+            collection_id INTEGER,
+            collection_name TEXT,
+            expires_at INTEGER)"""
+        )
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS tmdb_show_data (
+            key INTEGER PRIMARY KEY,
+            tmdb_id INTEGER UNIQUE,
+            title TEXT,
+            original_title TEXT,
+            studio TEXT,
+            overview TEXT,
+            tagline TEXT,
+            imdb_id TEXT,
+            poster_url TEXT,
+            backdrop_url TEXT,
+            vote_count INTEGER,
+            vote_average REAL,
+            language_iso TEXT,
+            language_name TEXT,
+            genres TEXT,
+            keywords TEXT,
+            first_air_date TEXT,
+            last_air_date TEXT,
+            status TEXT,
+            type TEXT,
+            tvdb_id INTEGER,
+            countries TEXT,
+            seasons TEXT,
+            expires_at INTEGER)"""
+        )
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS anime_map (
+            key INTEGER PRIMARY KEY,
+            anidb TEXT UNIQUE,
+            anilist TEXT,
+            myanimelist TEXT,
+            kitsu TEXT,
+            expires_at INTEGER)"""
+        )
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS image_maps (
+            key INTEGER PRIMARY KEY,
+            library TEXT UNIQUE)"""
+        )
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS radarr_adds (
+            key INTEGER PRIMARY KEY,
+            tmdb_id TEXT,
+            library TEXT)"""
+        )
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS sonarr_adds (
+            key INTEGER PRIMARY KEY,
+            tvdb_id TEXT,
+            library TEXT)"""
+        )
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS list_cache (
+            key INTEGER PRIMARY KEY,
+            list_type TEXT,
+            list_data TEXT,
+            expires_at INTEGER)"""
+        )
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS list_ids (
+            key INTEGER PRIMARY KEY,
+            list_key TEXT,
+            media_id TEXT,
+            media_type TEXT)"""
+        )
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS imdb_parental (
+            key INTEGER PRIMARY KEY,
+            imdb_id TEXT,
+            nudity TEXT,
+            violence TEXT,
+            profanity TEXT,
+            alcohol TEXT,
+            frightening TEXT,
+            expires_at INTEGER)"""
+        )
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS ergast_race (
+            key INTEGER PRIMARY KEY,
+            season INTEGER,
+            round INTEGER,
+            name TEXT,
+            date TEXT,
+            expires_at INTEGER)"""
+        )
+        cursor.execute("SELECT count(name) FROM sqlite_master WHERE type='table' AND name='image_map'")
+        if cursor.fetchone()[0] > 0:
+            cursor.execute(f"SELECT DISTINCT library FROM image_map")
+            for library in cursor.fetchall():
+                table_name = self._image_table_name(cursor, library["library"])
+                cursor.execute(f"SELECT DISTINCT * FROM image_map WHERE library = ? AND type = 'poster'", (library["library"],))
+                rows = cursor.fetchall()
+                cursor.executemany(f"INSERT OR IGNORE INTO {table_name}(id) VALUES(?)", [(row["id"],) for row in rows])
+                cursor.executemany(f"UPDATE {table_name} SET location = ?, compare = ?, overlay = ? WHERE id = ?",
+                                   [(row["location"], row["compare"], row["overlay"], row["id"]) for row in rows])
+            cursor.execute("DROP TABLE IF EXISTS image_map")
+
+    def _add_expiration_columns(self, cursor):
+        for table in expiring_tables:
+            cursor.execute(f"PRAGMA table_info({table})")
+            columns = [row["name"] for row in cursor.fetchall()]
+            if "expires_at" not in columns:
+                logger.info(f"Migrating cache table {table} to integer expiration")
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN expires_at INTEGER")
+                cursor.execute(f"UPDATE {table} SET expires_at = CAST(strftime('%s', expiration_date, 'utc') AS INTEGER) + ? "
+                               f"WHERE expiration_date IS NOT NULL", ((self.expiration + 1) * 86400,))
+        cursor.execute("DELETE FROM imdb_parental WHERE key NOT IN (SELECT MAX(key) FROM imdb_parental GROUP BY imdb_id)")
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS imdb_parental_imdb_id ON imdb_parental(imdb_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS imdb_to_tmdb_map_tmdb_id ON imdb_to_tmdb_map(tmdb_id, media_type)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS imdb_to_tvdb_map2_tvdb_id ON imdb_to_tvdb_map2(tvdb_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS tmdb_to_tvdb_map2_tvdb_id ON tmdb_to_tvdb_map2(tvdb_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS anime_map_anilist ON anime_map(anilist)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS anime_map_myanimelist ON anime_map(myanimelist)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS anime_map_kitsu ON anime_map(kitsu)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS radarr_adds_tmdb_id ON radarr_adds(tmdb_id, library)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS sonarr_adds_tvdb_id ON sonarr_adds(tvdb_id, library)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS list_cache_list ON list_cache(list_type, list_data)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS list_ids_list_key ON list_ids(list_key)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ergast_race_season ON ergast_race(season)")
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name GLOB 'image_map_*'")
+        for row in cursor.fetchall():
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {row['name']}_overlay ON {row['name']}(overlay)")
+
+    def _add_failed_conversions(self, cursor):
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS failed_conversions (
+            key INTEGER PRIMARY KEY,
+            id_type TEXT,
+            id TEXT,
+            to_type TEXT,
+            error TEXT,
+            expires_at INTEGER)"""
+        )
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS failed_conversions_id ON failed_conversions(id_type, id, to_type)")
+
+    def _add_cache_data(self, cursor):
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS cache_data (
+            key INTEGER PRIMARY KEY,
+            data_type TEXT,
+            data_id TEXT,
+            data BLOB,
+            expires_at INTEGER)"""
+        )
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS cache_data_id ON cache_data(data_type, data_id)")
+
+    def _add_list_positions(self, cursor):
+        cursor.execute("ALTER TABLE list_ids ADD COLUMN position INTEGER")
+        cursor.execute("DELETE FROM list_ids WHERE key NOT IN (SELECT MIN(key) FROM list_ids GROUP BY list_key, media_id, media_type)")
+        cursor.execute("UPDATE list_ids SET position = key * ?", (list_gap,))
+        cursor.execute("DROP INDEX IF EXISTS list_ids_list_key")
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS list_ids_list_key ON list_ids(list_key, media_id, media_type)")
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.cache_path, timeout=self.busy_timeout, cached_statements=256, check_same_thread=False)
             connection.row_factory = sqlite3.Row
+            self._set_journal_mode(connection)
+            connection.execute(f"PRAGMA synchronous={'NORMAL' if self.journal_mode == 'wal' else 'FULL'}")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @retry(stop_max_attempt_number=6, wait_exponential_multiplier=250, wait_exponential_max=10000, wait_jitter_max=1000, retry_on_exception=retry_if_locked)
+    def _set_journal_mode(self, connection):
+        # Switching journal mode skips the busy handler, so another process opening the same file can fail it with "database is locked"
+        if connection.execute("PRAGMA journal_mode").fetchone()[0].lower() != self.journal_mode:
+            connection.execute(f"PRAGMA journal_mode={self.journal_mode.upper()}")
+
+    @contextmanager
+    def _cursor(self):
+        connection = self._connection()
+        with connection:
             with closing(connection.cursor()) as cursor:
-                cursor.execute("SELECT count(name) FROM sqlite_master WHERE type='table' AND name='guid_map'")
-                if cursor.fetchone()[0] == 0:
-                    logger.info(f"Initializing cache database at {self.cache_path}")
+                yield cursor
+
+    def _queue_write(self, table, keys, insert_sql, insert_params, update_sql, update_params):
+        with self._write_lock:
+            group = (insert_sql, update_sql)
+            if any(self._write_keys.get((table, k, str(v)), group) != group for k, v in keys):
+                self.flush()
+            if group not in self._writes:
+                self._writes[group] = []
+            self._writes[group].append((insert_params, update_params))
+            for k, v in keys:
+                self._write_keys[(table, k, str(v))] = group
+            self._write_tables.add(table)
+            self._write_count += 1
+            if self._write_start is None:
+                self._write_start = time.time()
+            if self._write_count >= self.batch_size or time.time() - self._write_start >= self.batch_seconds:
+                self.flush()
+
+    def _check_writes(self, table, key=None, value=None):
+        if table in self._write_tables and (key is None or (table, key, str(value)) in self._write_keys):
+            self.flush()
+
+    @retry(stop_max_attempt_number=6, wait_exponential_multiplier=250, wait_exponential_max=10000, wait_jitter_max=1000, retry_on_exception=retry_if_locked)
+    def flush(self):
+        with self._write_lock:
+            if not self._writes:
+                return
+            with self._cursor() as cursor:
+                for (insert_sql, update_sql), rows in self._writes.items():
+                    cursor.executemany(insert_sql, [r[0] for r in rows])
+                    cursor.executemany(update_sql, [r[1] for r in rows])
+            self._writes = {}
+            self._write_keys = {}
+            self._write_tables = set()
+            self._write_count = 0
+            self._write_start = None
+
+    def close(self):
+        atexit.unregister(self.close)
+        try:
+            self.flush()
+        except sqlite3.Error as e:
+            logger.error(f"Cache Error: Failed to write {self._write_count} pending cache updates: {e}")
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+        self._local = threading.local()
+
+    def _record(self, table, start, found, expired=False):
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            if table not in self.stats:
+                self.stats[table] = {"hit": 0, "miss": 0, "expired": 0, "time": 0.0}
+            self.stats[table]["miss" if not found else "expired" if expired else "hit"] += 1
+            self.stats[table]["time"] += elapsed
+
+    def get_stats(self):
+        stats = {}
+        with self._lock:
+            for table, data in sorted(self.stats.items()):
+                total = data["hit"] + data["miss"] + data["expired"]
+                stats[table] = {
+                    "hits": data["hit"],
+                    "misses": data["miss"],
+                    "expired": data["expired"],
+                    "hit_rate": round(data["hit"] / total, 4) if total else 0,
+                    "average_ms": round(data["time"] * 1000 / total, 3) if total else 0
+                }
+        return stats
+
+    def _table_sizes(self, cursor):
+        try:
+            cursor.execute("SELECT name, SUM(pgsize) AS size FROM dbstat GROUP BY name")
+            return {row["name"]: row["size"] for row in cursor.fetchall()}
+        except sqlite3.OperationalError:
+            return {}
+
+    @retry(stop_max_attempt_number=6, wait_exponential_multiplier=250, wait_exponential_max=10000, wait_jitter_max=1000, retry_on_exception=retry_if_locked)
+    def maintenance(self, retention, max_rows=0):
+        self.flush()
+        self._guid_maps = {}
+        self._image_maps = {}
+        file_size = os.path.getsize(self.cache_path)
+        cutoff = int(time.time()) - (retention - 1) * self.expiration * 86400
+        report = {}
+        with self._cursor() as cursor:
+            sizes = self._table_sizes(cursor)
+            for table in expiring_tables + ["failed_conversions", "cache_data"]:
+                cursor.execute(f"DELETE FROM {table} WHERE expires_at IS NULL OR expires_at < ?", (cutoff,))
+                deleted = cursor.rowcount
+                if max_rows:
+                    cursor.execute(f"SELECT count(*) FROM {table}")
+                    over = cursor.fetchone()[0] - max_rows
+                    if over > 0:
+                        cursor.execute(f"DELETE FROM {table} WHERE key IN (SELECT key FROM {table} ORDER BY expires_at LIMIT ?)", (over,))
+                        deleted += cursor.rowcount
+                report[table] = {"deleted": deleted, "size": sizes[table] if table in sizes else None}
+            cursor.execute("DELETE FROM list_ids WHERE list_key NOT IN (SELECT key FROM list_cache)")
+            report["list_ids"] = {"deleted": cursor.rowcount, "size": sizes["list_ids"] if "list_ids" in sizes else None}
+        connection = self._connection()
+        connection.execute("ANALYZE")
+        connection.execute("VACUUM")
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        with self._cursor() as cursor:
+            sizes = self._table_sizes(cursor)
+        for table, data in report.items():
+            data["reclaimed"] = data["size"] - sizes[table] if data["size"] is not None and table in sizes else None
+        return report, file_size - os.path.getsize(self.cache_path)
+
+    def query_expiring(self, table, column, seconds=86400):
+        self._check_writes(table)
+        now = int(time.time())
+        with self._cursor() as cursor:
+            if self.compress and table in compressed_tables:
+                cursor.execute("SELECT data_id FROM cache_data WHERE data_type = ? AND expires_at > ? AND expires_at <= ?", (table, now, now + seconds))
+            else:
+                cursor.execute(f"SELECT {column} FROM {table} WHERE expires_at > ? AND expires_at <= ?", (now, now + seconds))
+            return [row[0] for row in cursor.fetchall()]
+
+    def query_id_pairs(self):
+        pairs = []
+        now = int(time.time())
+        for table, from_type, from_id, to_id in [
+            ("imdb_to_tmdb_map", "imdb", "imdb_id", "tmdb_id"),
+            ("imdb_to_tvdb_map2", "imdb", "imdb_id", "tvdb_id"),
+            ("tmdb_to_tvdb_map2", "tmdb_show", "tmdb_id", "tvdb_id")
+        ]:
+            self._check_writes(table)
+            with self._cursor() as cursor:
+                cursor.execute(f"SELECT * FROM {table} WHERE IFNULL(expires_at, 0) > ? AND {from_id} IS NOT NULL AND {to_id} IS NOT NULL", (now,))
+                for row in cursor.fetchall():
+                    to_type = f"tmdb_{row['media_type']}" if to_id == "tmdb_id" else "tvdb"
+                    pairs.append((from_type, row[from_id], to_type, row[to_id]))
+        return pairs
+
+    def export_snapshot(self, path, tables=None):
+        for table in tables if tables else []:
+            if table not in snapshot_tables:
+                raise util.Failed(f"Cache Error: {table} cannot be exported. Options: {', '.join(snapshot_tables)}")
+        self.flush()
+        counts = {}
+        with gzip.open(path, "wt", encoding="utf-8") as f, self._cursor() as cursor:
+            for table in tables if tables else snapshot_tables:
+                cursor.execute(f"SELECT * FROM {table} WHERE expires_at > ?", (int(time.time()),))
+                rows = cursor.fetchall()
+                for row in rows:
+                    entry = {"table": table, "row": {k: base64.b64encode(row[k]).decode() if k == "data" and row[k] else row[k] for k in row.keys() if k != "key"}}
+                    if table == "list_cache":
+                        cursor.execute("SELECT media_id, media_type FROM list_ids WHERE list_key = ? ORDER BY position", (row["key"],))
+                        entry["ids"] = [[i["media_id"], i["media_type"]] for i in cursor.fetchall()]
+                    f.write(f"{json.dumps(entry)}\n")
+                counts[table] = len(rows)
+        return counts
+
+    @retry(stop_max_attempt_number=6, wait_exponential_multiplier=250, wait_exponential_max=10000, wait_jitter_max=1000, retry_on_exception=retry_if_locked)
+    def import_snapshot(self, path):
+        self.flush()
+        self._guid_maps = {}
+        self._image_maps = {}
+        counts = {}
+        columns = {}
+        with gzip.open(path, "rt", encoding="utf-8") as f, self._cursor() as cursor:
+            for line in f:
+                entry = json.loads(line)
+                table = entry["table"]
+                if table not in snapshot_tables:
+                    continue
+                if table not in columns:
+                    cursor.execute(f"PRAGMA table_info({table})")
+                    columns[table] = [c["name"] for c in cursor.fetchall() if c["name"] != "key"]
+                    counts[table] = {"inserted": 0, "updated": 0, "skipped": 0}
+                row = {k: base64.b64decode(v) if table == "cache_data" and k == "data" and v else v for k, v in entry["row"].items() if k in columns[table]}
+                key_columns = snapshot_tables[table]
+                cursor.execute(f"SELECT key, IFNULL(expires_at, 0) AS expires_at FROM {table} WHERE {' AND '.join([f'{k} = ?' for k in key_columns])}",
+                               [row[k] for k in key_columns])
+                existing = cursor.fetchone()
+                if existing and existing["expires_at"] >= (row["expires_at"] if row.get("expires_at") else 0):
+                    counts[table]["skipped"] += 1
+                    continue
+                if existing:
+                    cursor.execute(f"UPDATE {table} SET {', '.join([f'{k} = ?' for k in row])} WHERE key = ?", list(row.values()) + [existing["key"]])
+                    list_key = existing["key"]
+                    counts[table]["updated"] += 1
                 else:
-                    logger.info(f"Using cache database at {self.cache_path}")
-                cursor.execute("DROP TABLE IF EXISTS guids")
-                cursor.execute("DROP TABLE IF EXISTS guid_map")
-                cursor.execute("DROP TABLE IF EXISTS imdb_to_tvdb_map")
-                cursor.execute("DROP TABLE IF EXISTS tmdb_to_tvdb_map")
-                cursor.execute("DROP TABLE IF EXISTS imdb_map")
-                cursor.execute("DROP TABLE IF EXISTS mdb_data")
-                cursor.execute("DROP TABLE IF EXISTS omdb_data")
-                cursor.execute("DROP TABLE IF EXISTS omdb_data2")
-                cursor.execute(
-                    """CREATE TABLE IF NOT EXISTS guids_map (
-                    key INTEGER PRIMARY KEY,
-                    emby_guid TEXT UNIQUE,
-                    t_id TEXT,
-                    imdb_id TEXT,
-                    media_type TEXT,
-                    expiration_date TEXT)"""
-                )
-                cursor.execute(
-                    """CREATE TABLE IF NOT EXISTS imdb_to_tmdb_map (
-                    key INTEGER PRIMARY KEY,
-                    imdb_id TEXT UNIQUE,
-                    tmdb_id TEXT,
-                    media_type TEXT,
-                    expiration_date TEXT)"""
-                )
-                cursor.execute(
-                    """CREATE TABLE IF NOT EXISTS imdb_to_tvdb_map2 (
-                    key INTEGER PRIMARY KEY,
-                    imdb_id TEXT UNIQUE,
-                    tvdb_id TEXT,
-                    expiration_date TEXT)"""
-                )
-                cursor.execute(
-                    """CREATE TABLE IF NOT EXISTS tmdb_to_tvdb_map2 (
-                    key INTEGER PRIMARY KEY,
-                    tmdb_id TEXT UNIQUE,
-                    tvdb_id TEXT,
-                    expiration_date TEXT)"""
-                )
-                cursor.execute(
-                    """CREATE TABLE IF NOT EXISTS letterboxd_map (
-                    key INTEGER PRIMARY KEY,
-                    letterboxd_id TEXT UNIQUE,
-                    tmdb_id TEXT,
-                    expiration_date TEXT)"""
-                )
-                cursor.execute(
-                    """CREATE TABLE IF NOT EXISTS flixpatrol_map (
-                    key INTEGER PRIMARY KEY,
-                    flixpatrol_id TEXT UNIQUE,
-                    tmdb_id TEXT,
-                    media_type TEXT,
-                    expiration_date TEXT)"""
-                )
-                cursor.execute(
-                    """CREATE TABLE IF NOT EXISTS omdb_data3 (
-                    key INTEGER PRIMARY KEY,
-                    imdb_id TEXT UNIQUE,
-                    title TEXT,
-                    year INTEGER,
-                    released TEXT,
-                    content_rating TEXT,
-                    genres TEXT,
-                    imdb_rating REAL,
-                    imdb_votes INTEGER,
-                    metacritic_rating INTEGER,
-                    type TEXT,
-                    series_id TEXT,
-                    season_num INTEGER,
-                    episode_num INTEGER,
-                    expiration_date TEXT)"""
-                )
-                cursor.execute(
-                    """CREATE TABLE IF NOT EXISTS mdb_data2 (
-                    key INTEGER PRIMARY KEY,
-                    key_id TEXT UNIQUE,
-                    title TEXT,
-                    year INTEGER,
-                    released TEXT,
-                    type TEXT,
-                    imdbid TEXT,
-                    traktid INTEGER,
-                    tmdbid INTEGER,
-                    score INTEGER,
-                    imdb_rating REAL,
-                    metacritic_rating INTEGER,
-                    metacriticuser_rating REAL,
-                    trakt_rating INTEGER,
-                    tomatoes_rating INTEGER,
-                    tomatoesaudience_rating INTEGER,
-                    tmdb_rating INTEGER,
-                    letterboxd_rating REAL,
-                    commonsense TEXT,
-                    certification TEXT,
-                    expiration_date TEXT)"""
-                )
-                cursor.execute(
-                    """CREATE TABLE IF NOT EXISTS tmdb_movie_data (
-                    key INTEGER PRIMARY KEY,
-                    tmdb_id INTEGER UNIQUE,
-                    title TEXT,
-                    original_title TEXT,
-                    studio TEXT,
-                    overview TEXT,
-                    tagline TEXT,
-                    imdb_id TEXT,
-                    poster_url TEXT,
-                    backdrop_url TEXT,
-                    vote_count INTEGER,
-                    vote_average REAL,
-                    language_iso TEXT,
-                    language_name TEXT,
-                    genres TEXT,
-                    keywords TEXT,
-                    release_date TEXT,
-                    collection_id INTEGER,
-                    collection_name TEXT,
-                    expiration_date TEXT)"""
-                )
-                cursor.execute(
-                    """CREATE TABLE IF NOT EXISTS tmdb_show_data (
-                    key INTEGER PRIMARY KEY,
-                    tmdb_id INTEGER UNIQUE,
-                    title TEXT,
-                    original_title TEXT,
-                    studio TEXT,
-                    overview TEXT,
-                    tagline TEXT,
-                    imdb_id TEXT,
-                    poster_url TEXT,
-                    backdrop_url TEXT,
-                    vote_count INTEGER,
-                    vote_average REAL,
-                    language_iso TEXT,
-                    language_name TEXT,
-                    genres TEXT,
-                    keywords TEXT,
-                    first_air_date TEXT,
-                    last_air_date TEXT,
-                    status TEXT,
-                    type TEXT,
-                    tvdb_id INTEGER,
-                    countries TEXT,
-                    seasons TEXT,
-                    expiration_date TEXT)"""
-                )
-                cursor.execute(
-                    """CREATE TABLE IF NOT EXISTS anime_map (
-                    key INTEGER PRIMARY KEY,
-                    anidb TEXT UNIQUE,
-                    anilist TEXT,
-                    myanimelist TEXT,
-                    kitsu TEXT,
-                    expiration_date TEXT)"""
-                )
-                cursor.execute(
-                    """CREATE TABLE IF NOT EXISTS image_maps (
-                    key INTEGER PRIMARY KEY,
-                    library TEXT UNIQUE)"""
-                )
-                cursor.execute(
-                    """CREATE TABLE IF NOT EXISTS radarr_adds (
-                    key INTEGER PRIMARY KEY,
-                    tmdb_id TEXT,
-                    library TEXT)"""
-                )
-                cursor.execute(
-                    """CREATE TABLE IF NOT EXISTS sonarr_adds (
-                    key INTEGER PRIMARY KEY,
-                    tvdb_id TEXT,
-                    library TEXT)"""
-                )
-                cursor.execute(
-                    """CREATE TABLE IF NOT EXISTS list_cache (
-                    key INTEGER PRIMARY KEY,
-                    list_type TEXT,
-                    list_data TEXT,
-                    expiration_date TEXT)"""
-                )
-                cursor.execute(
-                    """CREATE TABLE IF NOT EXISTS list_ids (
-                    key INTEGER PRIMARY KEY,
-                    list_key TEXT,
-                    media_id TEXT,
-                    media_type TEXT)"""
-                )
-                cursor.execute(
-                    """CREATE TABLE IF NOT EXISTS imdb_parental (
-                    key INTEGER PRIMARY KEY,
-                    imdb_id TEXT,
-                    nudity TEXT,
-                    violence TEXT,
-                    profanity TEXT,
-                    alcohol TEXT,
-                    frightening TEXT,
-                    expiration_date TEXT)"""
-                )
-                cursor.execute(
-                    """CREATE TABLE IF NOT EXISTS ergast_race (
-                    key INTEGER PRIMARY KEY,
-                    season INTEGER,
-                    round INTEGER,
-                    name TEXT,
-                    date TEXT,
-                    expiration_date TEXT)"""
+                    cursor.execute(f"INSERT INTO {table}({', '.join(row)}) VALUES({', '.join(['?'] * len(row))})", list(row.values()))
+                    list_key = cursor.lastrowid
+                    counts[table]["inserted"] += 1
+                if table == "list_cache":
+                    cursor.execute("DELETE FROM list_ids WHERE list_key = ?", (list_key,))
+                    cursor.executemany("INSERT OR IGNORE INTO list_ids(list_key, media_id, media_type, position) VALUES(?, ?, ?, ?)",
+                                       [(list_key, media_id, media_type, (i + 1) * list_gap) for i, (media_id, media_type) in enumerate(entry["ids"])])
+        return counts
+
+    def _mapping_records(self, path):
+        file_type = os.path.splitext(path[:-3] if path.endswith(".gz") else path)[1].lower()
+        if file_type not in [".csv", ".tsv", ".json", ".jsonl", ".ndjson"]:
+            raise util.Failed(f"Cache Error: {path} must be a .csv, .tsv, .json, .jsonl or .ndjson file")
+        if not os.path.exists(path):
+            raise util.Failed(f"Cache Error: {path} not found")
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8", newline="") as f:
+            if file_type in [".csv", ".tsv"]:
+                yield from csv.DictReader(f, delimiter="\t" if file_type == ".tsv" else ",")
+            elif file_type == ".json":
+                yield from json.load(f)
+            else:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+    @retry(stop_max_attempt_number=6, wait_exponential_multiplier=250, wait_exponential_max=10000, wait_jitter_max=1000, retry_on_exception=retry_if_locked)
+    def import_mappings(self, path, static=False):
+        rows = {"imdb_to_tmdb_map": [], "tmdb_to_tvdb_map2": [], "imdb_to_tvdb_map2": []}
+        skipped = 0
+        for record in self._mapping_records(path):
+            record = {mapping_aliases[k] if k in mapping_aliases else k: str(v).strip() for k, v in record.items() if k and v is not None}
+            imdb_id = record["imdb_id"] if "imdb_id" in record and record["imdb_id"].startswith("tt") and "," not in record["imdb_id"] else None
+            tmdb_id = int(record["tmdb_id"]) if "tmdb_id" in record and record["tmdb_id"].isdigit() else None
+            tvdb_id = int(record["tvdb_id"]) if "tvdb_id" in record and record["tvdb_id"].isdigit() else None
+            media_type = mapping_types[record["media_type"].lower()] if "media_type" in record and record["media_type"].lower() in mapping_types else None
+            expires_at = static_expires_at if static else self._expires_at(False)
+            start = sum(len(r) for r in rows.values())
+            if imdb_id and tmdb_id and media_type:
+                rows["imdb_to_tmdb_map"].append((imdb_id, str(tmdb_id), media_type, expires_at))
+            if tmdb_id and tvdb_id and media_type == "show":
+                rows["tmdb_to_tvdb_map2"].append((str(tmdb_id), str(tvdb_id), expires_at))
+            if imdb_id and tvdb_id and media_type == "show":
+                rows["imdb_to_tvdb_map2"].append((imdb_id, str(tvdb_id), expires_at))
+            if sum(len(r) for r in rows.values()) == start:
+                skipped += 1
+        for table in rows:
+            self._check_writes(table)
+        counts = {}
+        with self._cursor() as cursor:
+            for table, columns in [
+                ("imdb_to_tmdb_map", ["imdb_id", "tmdb_id", "media_type"]),
+                ("tmdb_to_tvdb_map2", ["tmdb_id", "tvdb_id"]),
+                ("imdb_to_tvdb_map2", ["imdb_id", "tvdb_id"])
+            ]:
+                cursor.executemany(
+                    f"INSERT INTO {table}({', '.join(columns)}, expires_at) VALUES({', '.join(['?'] * (len(columns) + 1))}) "
+                    f"ON CONFLICT({columns[0]}) DO UPDATE SET {', '.join([f'{c} = excluded.{c}' for c in columns[1:]])}, expires_at = excluded.expires_at "
+                    f"WHERE IFNULL({table}.expires_at, 0) < excluded.expires_at",
+                    rows[table]
                 )
-                cursor.execute("SELECT count(name) FROM sqlite_master WHERE type='table' AND name='image_map'")
-                if cursor.fetchone()[0] > 0:
-                    cursor.execute(f"SELECT DISTINCT library FROM image_map")
-                    for library in cursor.fetchall():
-                        table_name = self.get_image_table_name(library["library"])
-                        cursor.execute(f"SELECT DISTINCT * FROM image_map WHERE library='{library['library']}'")
-                        for row in cursor.fetchall():
-                            if row["type"] == "poster":
-                                final_table = table_name if row["type"] == "poster" else f"{table_name}_backgrounds"
-                                self.update_image_map(row["id"], final_table, row["location"], row["compare"], overlay=row["overlay"])
-                    cursor.execute("DROP TABLE IF EXISTS image_map")
+                counts[table] = {"read": len(rows[table]), "imported": cursor.rowcount}
+        return counts, skipped
+
+    def _expires_at(self, expired, expiration=None, jitter=True):
+        expiration = self.expiration if expiration is None else expiration
+        days = expiration if expired is True else expiration - (random.randint(1, expiration) if jitter else expiration)
+        return int(datetime.combine(datetime.now().date() + timedelta(days=days + 1), datetime.min.time()).timestamp())
+
+    def _guid_map_row(self, row):
+        id_to_return = util.get_list(row["t_id"], int_list=True)
+        imdb_id = util.get_list(row["imdb_id"])
+        return id_to_return, imdb_id, row["media_type"], row["expired"] == 1
+
+    def load_guid_maps(self, emby_guids, chunk_size=500):
+        emby_guids = [str(g) for g in dict.fromkeys(emby_guids)]
+        self._check_writes("guids_map")
+        loaded = {g: (None, None, None, None) for g in emby_guids}
+        now = int(time.time())
+        with self._cursor() as cursor:
+            for i in range(0, len(emby_guids), chunk_size):
+                chunk = emby_guids[i:i + chunk_size]
+                cursor.execute(f"SELECT *, IFNULL(expires_at, 0) <= ? AS expired FROM guids_map WHERE emby_guid IN ({','.join(['?'] * len(chunk))})", [now] + chunk)
+                for row in cursor.fetchall():
+                    loaded[row["emby_guid"]] = self._guid_map_row(row)
+        self._guid_maps.update(loaded)
+        return len([v for v in loaded.values() if v[3] is False])
 
     def query_guid_map(self, emby_guid):
+        start = time.perf_counter()
+        if str(emby_guid) in self._guid_maps:
+            cache_ids, imdb_ids, media_type, expired = self._guid_maps[str(emby_guid)]
+            self._record("guids_map", start, expired is not None, expired=expired)
+            return cache_ids, imdb_ids, media_type, expired
+        self._check_writes("guids_map", "emby_guid", emby_guid)
         id_to_return = None
         imdb_id = None
         media_type = None
         expired = None
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute(f"SELECT * FROM guids_map WHERE emby_guid = ?", (emby_guid,))
-                row = cursor.fetchone()
-                if row:
-                    time_between_insertion = datetime.now() - datetime.strptime(row["expiration_date"], "%Y-%m-%d")
-                    id_to_return = util.get_list(row["t_id"], int_list=True)
-                    imdb_id = util.get_list(row["imdb_id"])
-                    media_type = row["media_type"]
-                    expired = time_between_insertion.days > self.expiration
+        with self._cursor() as cursor:
+            cursor.execute(f"SELECT *, IFNULL(expires_at, 0) <= ? AS expired FROM guids_map WHERE emby_guid = ?", (int(time.time()), emby_guid))
+            row = cursor.fetchone()
+            if row:
+                id_to_return, imdb_id, media_type, expired = self._guid_map_row(row)
+        self._record("guids_map", start, row is not None, expired=expired)
         return id_to_return, imdb_id, media_type, expired
 
     def update_guid_map(self, emby_guid, t_id, imdb_id, expired, media_type):
-        expiration_date = datetime.now() if expired is True else (datetime.now() - timedelta(days=random.randint(1, self.expiration)))
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute(f"INSERT OR IGNORE INTO guids_map(emby_guid) VALUES(?)", (emby_guid,))
-                if media_type is None:
-                    sql = f"UPDATE guids_map SET t_id = ?, imdb_id = ?, expiration_date = ? WHERE emby_guid = ?"
-                    cursor.execute(sql, (t_id, imdb_id, expiration_date.strftime("%Y-%m-%d"), emby_guid))
-                else:
-                    sql = f"UPDATE guids_map SET t_id = ?, imdb_id = ?, expiration_date = ?, media_type = ? WHERE emby_guid = ?"
-                    cursor.execute(sql, (t_id, imdb_id, expiration_date.strftime("%Y-%m-%d"), media_type, emby_guid))
+        self._guid_maps.pop(str(emby_guid), None)
+        expires_at = self._expires_at(expired)
+        insert_sql = f"INSERT OR IGNORE INTO guids_map(emby_guid) VALUES(?)"
+        if media_type is None:
+            sql = f"UPDATE guids_map SET t_id = ?, imdb_id = ?, expires_at = ? WHERE emby_guid = ?"
+            params = (t_id, imdb_id, expires_at, emby_guid)
+        else:
+            sql = f"UPDATE guids_map SET t_id = ?, imdb_id = ?, expires_at = ?, media_type = ? WHERE emby_guid = ?"
+            params = (t_id, imdb_id, expires_at, media_type, emby_guid)
+        self._queue_write("guids_map", [("emby_guid", emby_guid)], insert_sql, (emby_guid,), sql, params)
 
     def query_imdb_to_tmdb_map(self, _id, imdb=True, media_type=None, return_type=False):
         from_id = "imdb_id" if imdb else "tmdb_id"
         to_id = "tmdb_id" if imdb else "imdb_id"
         return self._query_map("imdb_to_tmdb_map", _id, from_id, to_id, media_type=media_type, return_type=return_type)
 
+    def query_imdb_to_tmdb_maps(self, ids, imdb=True, media_type=None):
+        from_id = "imdb_id" if imdb else "tmdb_id"
+        to_id = "tmdb_id" if imdb else "imdb_id"
+        return self._query_maps("imdb_to_tmdb_map", ids, from_id, to_id, media_type=media_type)
+
     def update_imdb_to_tmdb_map(self, media_type, expired, imdb_id, tmdb_id):
         self._update_map("imdb_to_tmdb_map", "imdb_id", imdb_id, "tmdb_id", tmdb_id, expired, media_type=media_type)
 
@@ -279,6 +745,11 @@ class Cache:
         to_id = "tvdb_id" if imdb else "imdb_id"
         return self._query_map("imdb_to_tvdb_map2", _id, from_id, to_id)
 
+    def query_imdb_to_tvdb_maps(self, ids, imdb=True):
+        from_id = "imdb_id" if imdb else "tvdb_id"
+        to_id = "tvdb_id" if imdb else "imdb_id"
+        return self._query_maps("imdb_to_tvdb_map2", ids, from_id, to_id)
+
     def update_imdb_to_tvdb_map(self, expired, imdb_id, tvdb_id):
         self._update_map("imdb_to_tvdb_map2", "imdb_id", imdb_id, "tvdb_id", tvdb_id, expired)
 
@@ -287,6 +758,11 @@ class Cache:
         to_id = "tvdb_id" if tmdb else "tmdb_id"
         return self._query_map("tmdb_to_tvdb_map2", _id, from_id, to_id)
 
+    def query_tmdb_to_tvdb_maps(self, ids, tmdb=True):
+        from_id = "tmdb_id" if tmdb else "tvdb_id"
+        to_id = "tvdb_id" if tmdb else "tmdb_id"
+        return self._query_maps("tmdb_to_tvdb_map2", ids, from_id, to_id)
+
     def update_tmdb_to_tvdb_map(self, expired, tmdb_id, tvdb_id):
         self._update_map("tmdb_to_tvdb_map2", "tmdb_id", tmdb_id, "tvdb_id", tvdb_id, expired)
 
@@ -303,337 +779,448 @@ class Cache:
         self._update_map("flixpatrol_map", "flixpatrol_id", flixpatrol_id, "tmdb_id", tmdb_id, expired, media_type=media_type)
 
     def _query_map(self, map_name, _id, from_id, to_id, media_type=None, return_type=False):
+        start = time.perf_counter()
         id_to_return = None
         expired = None
         out_type = None
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                if media_type is None:
-                    cursor.execute(f"SELECT * FROM {map_name} WHERE {from_id} = ?", (_id,))
-                else:
-                    cursor.execute(f"SELECT * FROM {map_name} WHERE {from_id} = ? AND media_type = ?", (_id, media_type))
-                row = cursor.fetchone()
-                if row and row[to_id]:
-                    datetime_object = datetime.strptime(row["expiration_date"], "%Y-%m-%d")
-                    time_between_insertion = datetime.now() - datetime_object
-                    if "_" in row[to_id]:
-                        id_to_return = row[to_id]
-                    else:
-                        try:
-                            id_to_return = int(row[to_id])
-                        except ValueError:
-                            id_to_return = row[to_id]
-                    expired = time_between_insertion.days > self.expiration
-                    out_type = row["media_type"] if return_type else None
+        self._check_writes(map_name, from_id, _id)
+        with self._cursor() as cursor:
+            if media_type is None:
+                cursor.execute(f"SELECT *, IFNULL(expires_at, 0) <= ? AS expired FROM {map_name} WHERE {from_id} = ?", (int(time.time()), _id))
+            else:
+                cursor.execute(f"SELECT *, IFNULL(expires_at, 0) <= ? AS expired FROM {map_name} WHERE {from_id} = ? AND media_type = ?", (int(time.time()), _id, media_type))
+            row = cursor.fetchone()
+            if row and row[to_id]:
+                id_to_return = self._map_value(row[to_id])
+                expired = row["expired"] == 1
+                out_type = row["media_type"] if return_type else None
+        self._record(map_name, start, id_to_return is not None, expired=expired)
         if return_type:
             return id_to_return, out_type, expired
         else:
             return id_to_return, expired
 
+    def _map_value(self, value):
+        if "_" in value:
+            return value
+        try:
+            return int(value)
+        except ValueError:
+            return value
+
+    def _query_maps(self, map_name, ids, from_id, to_id, media_type=None, chunk_size=500):
+        start = time.perf_counter()
+        ids = [str(i) for i in dict.fromkeys(ids)]
+        results = {}
+        self._check_writes(map_name)
+        now = int(time.time())
+        with self._cursor() as cursor:
+            for i in range(0, len(ids), chunk_size):
+                chunk = ids[i:i + chunk_size]
+                sql = f"SELECT *, IFNULL(expires_at, 0) <= ? AS expired FROM {map_name} WHERE {from_id} IN ({','.join(['?'] * len(chunk))})"
+                params = [now] + chunk
+                if media_type is not None:
+                    sql += " AND media_type = ?"
+                    params.append(media_type)
+                cursor.execute(sql, params)
+                for row in cursor.fetchall():
+                    if row[to_id]:
+                        results[str(row[from_id])] = (self._map_value(row[to_id]), row["media_type"] if "media_type" in row.keys() else None, row["expired"] == 1)
+        for _id in ids:
+            found = _id in results
+            self._record(map_name, start, found, expired=results[_id][2] if found else None)
+            start = time.perf_counter()
+        return results
+
     def _update_map(self, map_name, val1_name, val1, val2_name, val2, expired, media_type=None):
-        expiration_date = datetime.now() if expired is True else (datetime.now() - timedelta(days=random.randint(1, self.expiration)))
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute(f"INSERT OR IGNORE INTO {map_name}({val1_name}) VALUES(?)", (val1,))
-                if media_type is None:
-                    sql = f"UPDATE {map_name} SET {val2_name} = ?, expiration_date = ? WHERE {val1_name} = ?"
-                    cursor.execute(sql, (val2, expiration_date.strftime("%Y-%m-%d"), val1))
-                else:
-                    sql = f"UPDATE {map_name} SET {val2_name} = ?, expiration_date = ?, media_type = ? WHERE {val1_name} = ?"
-                    cursor.execute(sql, (val2, expiration_date.strftime("%Y-%m-%d"), media_type, val1))
+        expires_at = self._expires_at(expired)
+        insert_sql = f"INSERT OR IGNORE INTO {map_name}({val1_name}) VALUES(?)"
+        if media_type is None:
+            sql = f"UPDATE {map_name} SET {val2_name} = ?, expires_at = ? WHERE {val1_name} = ?"
+            params = (val2, expires_at, val1)
+        else:
+            sql = f"UPDATE {map_name} SET {val2_name} = ?, expires_at = ?, media_type = ? WHERE {val1_name} = ?"
+            params = (val2, expires_at, media_type, val1)
+        self._queue_write(map_name, [(val1_name, val1), (val2_name, val2)], insert_sql, (val1,), sql, params)
+
+    def query_failed_conversion(self, id_type, _id, to_type):
+        start = time.perf_counter()
+        error = None
+        self._check_writes("failed_conversions", "conversion", f"{id_type}|{_id}|{to_type}")
+        with self._cursor() as cursor:
+            cursor.execute("SELECT error FROM failed_conversions WHERE id_type = ? AND id = ? AND to_type = ? AND IFNULL(expires_at, 0) > ?",
+                           (id_type, str(_id), to_type, int(time.time())))
+            row = cursor.fetchone()
+            if row:
+                error = row["error"]
+        self._record("failed_conversions", start, error is not None)
+        return error
+
+    def update_failed_conversion(self, id_type, _id, to_type, error):
+        expires_at = self._expires_at(False, self.failed_expiration)
+        params = (id_type, str(_id), to_type)
+        self._queue_write("failed_conversions", [("conversion", f"{id_type}|{_id}|{to_type}")],
+                          "INSERT OR IGNORE INTO failed_conversions(id_type, id, to_type) VALUES(?, ?, ?)", params,
+                          "UPDATE failed_conversions SET error = ?, expires_at = ? WHERE id_type = ? AND id = ? AND to_type = ?",
+                          (error, expires_at) + params)
+
+    def _query_data(self, table, id_name, _id):
+        self._check_writes(table, id_name, _id)
+        with self._cursor() as cursor:
+            if self.compress:
+                cursor.execute("SELECT data, IFNULL(expires_at, 0) <= ? AS expired FROM cache_data WHERE data_type = ? AND data_id = ?",
+                               (int(time.time()), table, str(_id)))
+            else:
+                cursor.execute(f"SELECT *, IFNULL(expires_at, 0) <= ? AS expired FROM {table} WHERE {id_name} = ?", (int(time.time()), _id))
+            return cursor.fetchone()
+
+    def _data(self, row, convert):
+        return CompressedData(row["data"], convert) if self.compress else convert(row)
+
+    def _update_data(self, table, id_name, _id, values, expires_at):
+        if self.compress:
+            data = zlib.compress(json.dumps({id_name: _id, **values}, separators=(",", ":")).encode("utf-8"))
+            self._queue_write(table, [(id_name, _id)], "INSERT OR IGNORE INTO cache_data(data_type, data_id) VALUES(?, ?)", (table, str(_id)),
+                              "UPDATE cache_data SET data = ?, expires_at = ? WHERE data_type = ? AND data_id = ?", (data, expires_at, table, str(_id)))
+        else:
+            self._queue_write(table, [(id_name, _id)], f"INSERT OR IGNORE INTO {table}({id_name}) VALUES(?)", (_id,),
+                              f"UPDATE {table} SET {', '.join([f'{k} = ?' for k in values])}, expires_at = ? WHERE {id_name} = ?",
+                              tuple(values.values()) + (expires_at, _id))
 
     def query_omdb(self, imdb_id, expiration):
+        start = time.perf_counter()
         omdb_dict = {}
         expired = None
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute("SELECT * FROM omdb_data3 WHERE imdb_id = ?", (imdb_id,))
-                row = cursor.fetchone()
-                if row:
-                    omdb_dict["imdbID"] = row["imdb_id"] if row["imdb_id"] else None
-                    omdb_dict["Title"] = row["title"] if row["title"] else None
-                    omdb_dict["Year"] = row["year"] if row["year"] else None
-                    omdb_dict["Released"] = row["released"] if row["released"] else None
-                    omdb_dict["Rated"] = row["content_rating"] if row["content_rating"] else None
-                    omdb_dict["Genre"] = row["genres"] if row["genres"] else None
-                    omdb_dict["imdbRating"] = row["imdb_rating"] if row["imdb_rating"] else None
-                    omdb_dict["imdbVotes"] = row["imdb_votes"] if row["imdb_votes"] else None
-                    omdb_dict["Metascore"] = row["metacritic_rating"] if row["metacritic_rating"] else None
-                    omdb_dict["Type"] = row["type"] if row["type"] else None
-                    omdb_dict["seriesID"] = row["series_id"] if row["series_id"] else None
-                    omdb_dict["Season"] = row["season_num"] if row["season_num"] else None
-                    omdb_dict["Episode"] = row["episode_num"] if row["episode_num"] else None
-                    omdb_dict["Response"] = "True"
-                    datetime_object = datetime.strptime(row["expiration_date"], "%Y-%m-%d")
-                    time_between_insertion = datetime.now() - datetime_object
-                    expired = time_between_insertion.days > expiration
+        row = self._query_data("omdb_data3", "imdb_id", imdb_id)
+        if row:
+            omdb_dict = self._data(row, self._omdb_dict)
+            expired = row["expired"] == 1
+        self._record("omdb_data3", start, bool(omdb_dict), expired=expired)
         return omdb_dict, expired
 
+    def _omdb_dict(self, row):
+        omdb_dict = {}
+        omdb_dict["imdbID"] = row["imdb_id"] if row["imdb_id"] else None
+        omdb_dict["Title"] = row["title"] if row["title"] else None
+        omdb_dict["Year"] = row["year"] if row["year"] else None
+        omdb_dict["Released"] = row["released"] if row["released"] else None
+        omdb_dict["Rated"] = row["content_rating"] if row["content_rating"] else None
+        omdb_dict["Genre"] = row["genres"] if row["genres"] else None
+        omdb_dict["imdbRating"] = row["imdb_rating"] if row["imdb_rating"] else None
+        omdb_dict["imdbVotes"] = row["imdb_votes"] if row["imdb_votes"] else None
+        omdb_dict["Metascore"] = row["metacritic_rating"] if row["metacritic_rating"] else None
+        omdb_dict["Type"] = row["type"] if row["type"] else None
+        omdb_dict["seriesID"] = row["series_id"] if row["series_id"] else None
+        omdb_dict["Season"] = row["season_num"] if row["season_num"] else None
+        omdb_dict["Episode"] = row["episode_num"] if row["episode_num"] else None
+        omdb_dict["Response"] = "True"
+        return omdb_dict
+
     def update_omdb(self, expired, omdb, expiration):
-        expiration_date = datetime.now() if expired is True else (datetime.now() - timedelta(days=random.randint(1, expiration)))
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute("INSERT OR IGNORE INTO omdb_data3(imdb_id) VALUES(?)", (omdb.imdb_id,))
-                update_sql = "UPDATE omdb_data3 SET title = ?, year = ?, released = ?, content_rating = ?, genres = ?, " \
-                             "imdb_rating = ?, imdb_votes = ?, metacritic_rating = ?, type = ?, series_id = ?, " \
-                             "season_num = ?, episode_num = ?, expiration_date = ? WHERE imdb_id = ?"
-                cursor.execute(update_sql, (
-                    omdb.title, omdb.year, omdb.released.strftime("%d %b %Y") if omdb.released else None, omdb.content_rating,
-                    omdb.genres_str, omdb.imdb_rating, omdb.imdb_votes, omdb.metacritic_rating, omdb.type, omdb.series_id,
-                    omdb.season_num, omdb.episode_num, expiration_date.strftime("%Y-%m-%d"), omdb.imdb_id))
+        self._update_data("omdb_data3", "imdb_id", omdb.imdb_id, {
+            "title": omdb.title,
+            "year": omdb.year,
+            "released": omdb.released.strftime("%d %b %Y") if omdb.released else None,
+            "content_rating": omdb.content_rating,
+            "genres": omdb.genres_str,
+            "imdb_rating": omdb.imdb_rating,
+            "imdb_votes": omdb.imdb_votes,
+            "metacritic_rating": omdb.metacritic_rating,
+            "type": omdb.type,
+            "series_id": omdb.series_id,
+            "season_num": omdb.season_num,
+            "episode_num": omdb.episode_num
+        }, self._expires_at(expired, expiration))
 
     def query_mdb(self, key_id, expiration):
+        start = time.perf_counter()
         mdb_dict = {}
         expired = None
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute("SELECT * FROM mdb_data2 WHERE key_id = ?", (key_id,))
-                row = cursor.fetchone()
-                if row:
-                    mdb_dict["title"] = row["title"] if row["title"] else None
-                    mdb_dict["year"] = row["year"] if row["year"] else None
-                    mdb_dict["released"] = row["released"] if row["released"] else None
-                    mdb_dict["type"] = row["type"] if row["type"] else None
-                    mdb_dict["imdbid"] = row["imdbid"] if row["imdbid"] else None
-                    mdb_dict["traktid"] = row["traktid"] if row["traktid"] else None
-                    mdb_dict["tmdbid"] = row["tmdbid"] if row["tmdbid"] else None
-                    mdb_dict["score"] = row["score"] if row["score"] else None
-                    mdb_dict["commonsense"] = row["commonsense"] if row["commonsense"] else None
-                    mdb_dict["certification"] = row["certification"] if row["certification"] else None
-                    mdb_dict["ratings"] = [
-                        {"source": "imdb", "value": row["imdb_rating"] if row["imdb_rating"] else None},
-                        {"source": "metacritic", "value": row["metacritic_rating"] if row["metacritic_rating"] else None},
-                        {"source": "metacriticuser", "value": row["metacriticuser_rating"] if row["metacriticuser_rating"] else None},
-                        {"source": "trakt", "value": row["trakt_rating"] if row["trakt_rating"] else None},
-                        {"source": "tomatoes", "value": row["tomatoes_rating"] if row["tomatoes_rating"] else None},
-                        {"source": "tomatoesaudience", "value": row["tomatoesaudience_rating"] if row["tomatoesaudience_rating"] else None},
-                        {"source": "tmdb", "value": row["tmdb_rating"] if row["tmdb_rating"] else None},
-                        {"source": "letterboxd", "value": row["letterboxd_rating"] if row["letterboxd_rating"] else None}
-                    ]
-                    datetime_object = datetime.strptime(row["expiration_date"], "%Y-%m-%d")
-                    time_between_insertion = datetime.now() - datetime_object
-                    expired = time_between_insertion.days > expiration
+        row = self._query_data("mdb_data2", "key_id", key_id)
+        if row:
+            mdb_dict = self._data(row, self._mdb_dict)
+            expired = row["expired"] == 1
+        self._record("mdb_data2", start, bool(mdb_dict), expired=expired)
         return mdb_dict, expired
 
+    def _mdb_dict(self, row):
+        mdb_dict = {}
+        mdb_dict["title"] = row["title"] if row["title"] else None
+        mdb_dict["year"] = row["year"] if row["year"] else None
+        mdb_dict["released"] = row["released"] if row["released"] else None
+        mdb_dict["type"] = row["type"] if row["type"] else None
+        mdb_dict["imdbid"] = row["imdbid"] if row["imdbid"] else None
+        mdb_dict["traktid"] = row["traktid"] if row["traktid"] else None
+        mdb_dict["tmdbid"] = row["tmdbid"] if row["tmdbid"] else None
+        mdb_dict["score"] = row["score"] if row["score"] else None
+        mdb_dict["commonsense"] = row["commonsense"] if row["commonsense"] else None
+        mdb_dict["certification"] = row["certification"] if row["certification"] else None
+        mdb_dict["ratings"] = [
+            {"source": "imdb", "value": row["imdb_rating"] if row["imdb_rating"] else None},
+            {"source": "metacritic", "value": row["metacritic_rating"] if row["metacritic_rating"] else None},
+            {"source": "metacriticuser", "value": row["metacriticuser_rating"] if row["metacriticuser_rating"] else None},
+            {"source": "trakt", "value": row["trakt_rating"] if row["trakt_rating"] else None},
+            {"source": "tomatoes", "value": row["tomatoes_rating"] if row["tomatoes_rating"] else None},
+            {"source": "tomatoesaudience", "value": row["tomatoesaudience_rating"] if row["tomatoesaudience_rating"] else None},
+            {"source": "tmdb", "value": row["tmdb_rating"] if row["tmdb_rating"] else None},
+            {"source": "letterboxd", "value": row["letterboxd_rating"] if row["letterboxd_rating"] else None}
+        ]
+        return mdb_dict
+
     def update_mdb(self, expired, key_id, mdb, expiration):
-        expiration_date = datetime.now() if expired is True else (datetime.now() - timedelta(days=random.randint(1, expiration)))
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute("INSERT OR IGNORE INTO mdb_data2(key_id) VALUES(?)", (key_id,))
-                update_sql = "UPDATE mdb_data2 SET title = ?, year = ?, released = ?, type = ?, imdbid = ?, traktid = ?, " \
-                             "tmdbid = ?, score = ?, imdb_rating = ?, metacritic_rating = ?, metacriticuser_rating = ?, " \
-                             "trakt_rating = ?, tomatoes_rating = ?, tomatoesaudience_rating = ?, tmdb_rating = ?, " \
-                             "letterboxd_rating = ?, certification = ?, commonsense = ?, expiration_date = ? WHERE key_id = ?"
-                cursor.execute(update_sql, (
-                    mdb.title, mdb.year, mdb.released.strftime("%Y-%m-%d") if mdb.released else None, mdb.type,
-                    mdb.imdbid, mdb.traktid, mdb.tmdbid, mdb.score, mdb.imdb_rating, mdb.metacritic_rating,
-                    mdb.metacriticuser_rating, mdb.trakt_rating, mdb.tomatoes_rating, mdb.tomatoesaudience_rating,
-                    mdb.tmdb_rating, mdb.letterboxd_rating, mdb.content_rating, mdb.commonsense,
-                    expiration_date.strftime("%Y-%m-%d"), key_id
-                ))
+        self._update_data("mdb_data2", "key_id", key_id, {
+            "title": mdb.title,
+            "year": mdb.year,
+            "released": mdb.released.strftime("%Y-%m-%d") if mdb.released else None,
+            "type": mdb.type,
+            "imdbid": mdb.imdbid,
+            "traktid": mdb.traktid,
+            "tmdbid": mdb.tmdbid,
+            "score": mdb.score,
+            "imdb_rating": mdb.imdb_rating,
+            "metacritic_rating": mdb.metacritic_rating,
+            "metacriticuser_rating": mdb.metacriticuser_rating,
+            "trakt_rating": mdb.trakt_rating,
+            "tomatoes_rating": mdb.tomatoes_rating,
+            "tomatoesaudience_rating": mdb.tomatoesaudience_rating,
+            "tmdb_rating": mdb.tmdb_rating,
+            "letterboxd_rating": mdb.letterboxd_rating,
+            "certification": mdb.content_rating,
+            "commonsense": mdb.commonsense
+        }, self._expires_at(expired, expiration))
 
     def query_tmdb_movie(self, tmdb_id, expiration):
+        start = time.perf_counter()
         tmdb_dict = {}
         expired = None
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute("SELECT * FROM tmdb_movie_data WHERE tmdb_id = ?", (tmdb_id,))
-                row = cursor.fetchone()
-                if row:
-                    tmdb_dict["title"] = row["title"] if row["title"] else ""
-                    tmdb_dict["original_title"] = row["original_title"] if row["original_title"] else ""
-                    tmdb_dict["studio"] = row["studio"] if row["studio"] else ""
-                    tmdb_dict["overview"] = row["overview"] if row["overview"] else ""
-                    tmdb_dict["tagline"] = row["tagline"] if row["tagline"] else ""
-                    tmdb_dict["imdb_id"] = row["imdb_id"] if row["imdb_id"] else ""
-                    tmdb_dict["poster_url"] = row["poster_url"] if row["poster_url"] else ""
-                    tmdb_dict["backdrop_url"] = row["backdrop_url"] if row["backdrop_url"] else ""
-                    tmdb_dict["vote_count"] = row["vote_count"] if row["vote_count"] else 0
-                    tmdb_dict["vote_average"] = row["vote_average"] if row["vote_average"] else 0
-                    tmdb_dict["language_iso"] = row["language_iso"] if row["language_iso"] else None
-                    tmdb_dict["language_name"] = row["language_name"] if row["language_name"] else None
-                    tmdb_dict["genres"] = row["genres"] if row["genres"] else ""
-                    tmdb_dict["keywords"] = row["keywords"] if row["keywords"] else ""
-                    tmdb_dict["release_date"] = datetime.strptime(row["release_date"], "%Y-%m-%d") if row["release_date"] else None
-                    tmdb_dict["collection_id"] = row["collection_id"] if row["collection_id"] else None
-                    tmdb_dict["collection_name"] = row["collection_name"] if row["collection_name"] else None
-                    datetime_object = datetime.strptime(row["expiration_date"], "%Y-%m-%d")
-                    time_between_insertion = datetime.now() - datetime_object
-                    expired = time_between_insertion.days > expiration
+        row = self._query_data("tmdb_movie_data", "tmdb_id", tmdb_id)
+        if row:
+            tmdb_dict = self._data(row, self._tmdb_movie_dict)
+            expired = row["expired"] == 1
+        self._record("tmdb_movie_data", start, bool(tmdb_dict), expired=expired)
         return tmdb_dict, expired
 
+    def _tmdb_movie_dict(self, row):
+        tmdb_dict = {}
+        tmdb_dict["title"] = row["title"] if row["title"] else ""
+        tmdb_dict["original_title"] = row["original_title"] if row["original_title"] else ""
+        tmdb_dict["studio"] = row["studio"] if row["studio"] else ""
+        tmdb_dict["overview"] = row["overview"] if row["overview"] else ""
+        tmdb_dict["tagline"] = row["tagline"] if row["tagline"] else ""
+        tmdb_dict["imdb_id"] = row["imdb_id"] if row["imdb_id"] else ""
+        tmdb_dict["poster_url"] = row["poster_url"] if row["poster_url"] else ""
+        tmdb_dict["backdrop_url"] = row["backdrop_url"] if row["backdrop_url"] else ""
+        tmdb_dict["vote_count"] = row["vote_count"] if row["vote_count"] else 0
+        tmdb_dict["vote_average"] = row["vote_average"] if row["vote_average"] else 0
+        tmdb_dict["language_iso"] = row["language_iso"] if row["language_iso"] else None
+        tmdb_dict["language_name"] = row["language_name"] if row["language_name"] else None
+        tmdb_dict["genres"] = row["genres"] if row["genres"] else ""
+        tmdb_dict["keywords"] = row["keywords"] if row["keywords"] else ""
+        tmdb_dict["release_date"] = datetime.strptime(row["release_date"], "%Y-%m-%d") if row["release_date"] else None
+        tmdb_dict["collection_id"] = row["collection_id"] if row["collection_id"] else None
+        tmdb_dict["collection_name"] = row["collection_name"] if row["collection_name"] else None
+        return tmdb_dict
+
     def update_tmdb_movie(self, expired, obj, expiration):
-        expiration_date = datetime.now() if expired is True else (datetime.now() - timedelta(days=random.randint(1, expiration)))
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute("INSERT OR IGNORE INTO tmdb_movie_data(tmdb_id) VALUES(?)", (obj.tmdb_id,))
-                update_sql = "UPDATE tmdb_movie_data SET title = ?, original_title = ?, studio = ?, overview = ?, tagline = ?, imdb_id = ?, " \
-                             "poster_url = ?, backdrop_url = ?, vote_count = ?, vote_average = ?, language_iso = ?, " \
-                             "language_name = ?, genres = ?, keywords = ?, release_date = ?, collection_id = ?, " \
-                             "collection_name = ?, expiration_date = ? WHERE tmdb_id = ?"
-                cursor.execute(update_sql, (
-                    obj.title, obj.original_title, obj.studio, obj.overview, obj.tagline, obj.imdb_id, obj.poster_url, obj.backdrop_url,
-                    obj.vote_count, obj.vote_average, obj.language_iso, obj.language_name, "|".join(obj.genres), "|".join(obj.keywords),
-                    obj.release_date.strftime("%Y-%m-%d") if obj.release_date else None, obj.collection_id, obj.collection_name,
-                    expiration_date.strftime("%Y-%m-%d"), obj.tmdb_id
-                ))
+        self._update_data("tmdb_movie_data", "tmdb_id", obj.tmdb_id, {
+            "title": obj.title,
+            "original_title": obj.original_title,
+            "studio": obj.studio,
+            "overview": obj.overview,
+            "tagline": obj.tagline,
+            "imdb_id": obj.imdb_id,
+            "poster_url": obj.poster_url,
+            "backdrop_url": obj.backdrop_url,
+            "vote_count": obj.vote_count,
+            "vote_average": obj.vote_average,
+            "language_iso": obj.language_iso,
+            "language_name": obj.language_name,
+            "genres": "|".join(obj.genres),
+            "keywords": "|".join(obj.keywords),
+            "release_date": obj.release_date.strftime("%Y-%m-%d") if obj.release_date else None,
+            "collection_id": obj.collection_id,
+            "collection_name": obj.collection_name
+        }, self._expires_at(expired, expiration))
 
     def query_tmdb_show(self, tmdb_id, expiration):
+        start = time.perf_counter()
         tmdb_dict = {}
         expired = None
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute("SELECT * FROM tmdb_show_data WHERE tmdb_id = ?", (tmdb_id,))
-                row = cursor.fetchone()
-                if row:
-                    tmdb_dict["title"] = row["title"] if row["title"] else ""
-                    tmdb_dict["original_title"] = row["original_title"] if row["original_title"] else ""
-                    tmdb_dict["studio"] = row["studio"] if row["studio"] else ""
-                    tmdb_dict["overview"] = row["overview"] if row["overview"] else ""
-                    tmdb_dict["tagline"] = row["tagline"] if row["tagline"] else ""
-                    tmdb_dict["imdb_id"] = row["imdb_id"] if row["imdb_id"] else ""
-                    tmdb_dict["poster_url"] = row["poster_url"] if row["poster_url"] else ""
-                    tmdb_dict["backdrop_url"] = row["backdrop_url"] if row["backdrop_url"] else ""
-                    tmdb_dict["vote_count"] = row["vote_count"] if row["vote_count"] else 0
-                    tmdb_dict["vote_average"] = row["vote_average"] if row["vote_average"] else 0
-                    tmdb_dict["language_iso"] = row["language_iso"] if row["language_iso"] else None
-                    tmdb_dict["language_name"] = row["language_name"] if row["language_name"] else None
-                    tmdb_dict["genres"] = row["genres"] if row["genres"] else ""
-                    tmdb_dict["keywords"] = row["keywords"] if row["keywords"] else ""
-                    tmdb_dict["first_air_date"] = datetime.strptime(row["first_air_date"], "%Y-%m-%d") if row["first_air_date"] else None
-                    tmdb_dict["last_air_date"] = datetime.strptime(row["last_air_date"], "%Y-%m-%d") if row["last_air_date"] else None
-                    tmdb_dict["status"] = row["status"] if row["status"] else None
-                    tmdb_dict["type"] = row["type"] if row["type"] else None
-                    tmdb_dict["tvdb_id"] = row["tvdb_id"] if row["tvdb_id"] else None
-                    tmdb_dict["countries"] = row["countries"] if row["countries"] else ""
-                    tmdb_dict["seasons"] = row["seasons"] if row["seasons"] else ""
-                    datetime_object = datetime.strptime(row["expiration_date"], "%Y-%m-%d")
-                    time_between_insertion = datetime.now() - datetime_object
-                    expired = time_between_insertion.days > expiration
+        row = self._query_data("tmdb_show_data", "tmdb_id", tmdb_id)
+        if row:
+            tmdb_dict = self._data(row, self._tmdb_show_dict)
+            expired = row["expired"] == 1
+        self._record("tmdb_show_data", start, bool(tmdb_dict), expired=expired)
         return tmdb_dict, expired
 
+    def _tmdb_show_dict(self, row):
+        tmdb_dict = {}
+        tmdb_dict["title"] = row["title"] if row["title"] else ""
+        tmdb_dict["original_title"] = row["original_title"] if row["original_title"] else ""
+        tmdb_dict["studio"] = row["studio"] if row["studio"] else ""
+        tmdb_dict["overview"] = row["overview"] if row["overview"] else ""
+        tmdb_dict["tagline"] = row["tagline"] if row["tagline"] else ""
+        tmdb_dict["imdb_id"] = row["imdb_id"] if row["imdb_id"] else ""
+        tmdb_dict["poster_url"] = row["poster_url"] if row["poster_url"] else ""
+        tmdb_dict["backdrop_url"] = row["backdrop_url"] if row["backdrop_url"] else ""
+        tmdb_dict["vote_count"] = row["vote_count"] if row["vote_count"] else 0
+        tmdb_dict["vote_average"] = row["vote_average"] if row["vote_average"] else 0
+        tmdb_dict["language_iso"] = row["language_iso"] if row["language_iso"] else None
+        tmdb_dict["language_name"] = row["language_name"] if row["language_name"] else None
+        tmdb_dict["genres"] = row["genres"] if row["genres"] else ""
+        tmdb_dict["keywords"] = row["keywords"] if row["keywords"] else ""
+        tmdb_dict["first_air_date"] = datetime.strptime(row["first_air_date"], "%Y-%m-%d") if row["first_air_date"] else None
+        tmdb_dict["last_air_date"] = datetime.strptime(row["last_air_date"], "%Y-%m-%d") if row["last_air_date"] else None
+        tmdb_dict["status"] = row["status"] if row["status"] else None
+        tmdb_dict["type"] = row["type"] if row["type"] else None
+        tmdb_dict["tvdb_id"] = row["tvdb_id"] if row["tvdb_id"] else None
+        tmdb_dict["countries"] = row["countries"] if row["countries"] else ""
+        tmdb_dict["seasons"] = row["seasons"] if row["seasons"] else ""
+        return tmdb_dict
+
     def update_tmdb_show(self, expired, obj, expiration):
-        expiration_date = datetime.now() if expired is True else (datetime.now() - timedelta(days=random.randint(1, expiration)))
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute("INSERT OR IGNORE INTO tmdb_show_data(tmdb_id) VALUES(?)", (obj.tmdb_id,))
-                update_sql = "UPDATE tmdb_show_data SET title = ?, original_title = ?, studio = ?, overview = ?, tagline = ?, imdb_id = ?, " \
-                             "poster_url = ?, backdrop_url = ?, vote_count = ?, vote_average = ?, language_iso = ?, " \
-                             "language_name = ?, genres = ?, keywords = ?, first_air_date = ?, last_air_date = ?, status = ?, " \
-                             "type = ?, tvdb_id = ?, countries = ?, seasons = ?, expiration_date = ? WHERE tmdb_id = ?"
-                cursor.execute(update_sql, (
-                    obj.title, obj.original_title, obj.studio, obj.overview, obj.tagline, obj.imdb_id, obj.poster_url, obj.backdrop_url,
-                    obj.vote_count, obj.vote_average, obj.language_iso, obj.language_name, "|".join(obj.genres), "|".join(obj.keywords),
-                    obj.first_air_date.strftime("%Y-%m-%d") if obj.first_air_date else None,
-                    obj.last_air_date.strftime("%Y-%m-%d") if obj.last_air_date else None,
-                    obj.status, obj.type, obj.tvdb_id, "|".join([str(c) for c in obj.countries]), "|".join([str(s) for s in obj.seasons]),
-                    expiration_date.strftime("%Y-%m-%d"), obj.tmdb_id
-                ))
+        self._update_data("tmdb_show_data", "tmdb_id", obj.tmdb_id, {
+            "title": obj.title,
+            "original_title": obj.original_title,
+            "studio": obj.studio,
+            "overview": obj.overview,
+            "tagline": obj.tagline,
+            "imdb_id": obj.imdb_id,
+            "poster_url": obj.poster_url,
+            "backdrop_url": obj.backdrop_url,
+            "vote_count": obj.vote_count,
+            "vote_average": obj.vote_average,
+            "language_iso": obj.language_iso,
+            "language_name": obj.language_name,
+            "genres": "|".join(obj.genres),
+            "keywords": "|".join(obj.keywords),
+            "first_air_date": obj.first_air_date.strftime("%Y-%m-%d") if obj.first_air_date else None,
+            "last_air_date": obj.last_air_date.strftime("%Y-%m-%d") if obj.last_air_date else None,
+            "status": obj.status,
+            "type": obj.type,
+            "tvdb_id": obj.tvdb_id,
+            "countries": "|".join([str(c) for c in obj.countries]),
+            "seasons": "|".join([str(s) for s in obj.seasons])
+        }, self._expires_at(expired, expiration))
 
     def query_anime_map(self, anime_id, id_type):
+        start = time.perf_counter()
         ids = None
         expired = None
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute(f"SELECT * FROM anime_map WHERE {id_type} = ?", (anime_id, ))
-                row = cursor.fetchone()
-                if row and row["anidb"]:
-                    datetime_object = datetime.strptime(row["expiration_date"], "%Y-%m-%d")
-                    time_between_insertion = datetime.now() - datetime_object
-                    ids = {
-                        "anilist": int(row["anilist"]) if row["anilist"] else None,
-                        "anidb": int(row["anidb"]) if row["anidb"] else None,
-                        "myanimelist": int(row["myanimelist"]) if row["myanimelist"] else None,
-                        "kitsu": int(row["kitsu"]) if row["kitsu"] else None
-                    }
-                    expired = time_between_insertion.days > self.expiration
+        self._check_writes("anime_map", id_type, anime_id)
+        with self._cursor() as cursor:
+            cursor.execute(f"SELECT *, IFNULL(expires_at, 0) <= ? AS expired FROM anime_map WHERE {id_type} = ?", (int(time.time()), anime_id))
+            row = cursor.fetchone()
+            if row and row["anidb"]:
+                ids = {
+                    "anilist": int(row["anilist"]) if row["anilist"] else None,
+                    "anidb": int(row["anidb"]) if row["anidb"] else None,
+                    "myanimelist": int(row["myanimelist"]) if row["myanimelist"] else None,
+                    "kitsu": int(row["kitsu"]) if row["kitsu"] else None
+                }
+                expired = row["expired"] == 1
+        self._record("anime_map", start, bool(ids), expired=expired)
         return ids, expired
 
     def update_anime_map(self, expired, anime_ids):
-        expiration_date = datetime.now() if expired is True else (datetime.now() - timedelta(days=random.randint(1, self.expiration)))
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute("INSERT OR IGNORE INTO anime_map(anidb) VALUES(?)", (anime_ids["anidb"],))
-                cursor.execute("UPDATE anime_map SET anilist = ?, myanimelist = ?, kitsu = ?, expiration_date = ? WHERE anidb = ?", (anime_ids["anidb"], anime_ids["myanimelist"], anime_ids["kitsu"], expiration_date.strftime("%Y-%m-%d"), anime_ids["anidb"]))
+        expires_at = self._expires_at(expired)
+        self._queue_write("anime_map", [(k, anime_ids[k]) for k in ["anidb", "anilist", "myanimelist", "kitsu"]],
+                          "INSERT OR IGNORE INTO anime_map(anidb) VALUES(?)", (anime_ids["anidb"],),
+                          "UPDATE anime_map SET anilist = ?, myanimelist = ?, kitsu = ?, expires_at = ? WHERE anidb = ?",
+                          (anime_ids["anidb"], anime_ids["myanimelist"], anime_ids["kitsu"], expires_at, anime_ids["anidb"]))
 
     def get_image_table_name(self, library):
+        if library not in self._image_tables:
+            with self._cursor() as cursor:
+                self._image_tables[library] = self._image_table_name(cursor, library)
+        return self._image_tables[library]
+
+    def _image_table_name(self, cursor, library):
         table_name = None
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute(f"SELECT * FROM image_maps WHERE library = ?", (library,))
-                row = cursor.fetchone()
-                if row and row["key"]:
-                    table_name = f"image_map_{row['key']}"
-                else:
-                    cursor.execute("INSERT OR IGNORE INTO image_maps(library) VALUES(?)", (library,))
-                    cursor.execute(f"SELECT * FROM image_maps WHERE library = ?", (library,))
-                    row = cursor.fetchone()
-                    if row and row["key"]:
-                        table_name = f"image_map_{row['key']}"
-                        cursor.execute(
-                            f"""CREATE TABLE IF NOT EXISTS {table_name} (
-                            key INTEGER PRIMARY KEY,
-                            id TEXT UNIQUE,
-                            overlay TEXT,
-                            compare TEXT,
-                            location TEXT)"""
-                        )
-                        cursor.execute(
-                            f"""CREATE TABLE IF NOT EXISTS {table_name}_backgrounds (
-                            key INTEGER PRIMARY KEY,
-                            id TEXT UNIQUE,
-                            overlay TEXT,
-                            compare TEXT,
-                            location TEXT)"""
-                        )
+        cursor.execute(f"SELECT * FROM image_maps WHERE library = ?", (library,))
+        row = cursor.fetchone()
+        if row and row["key"]:
+            table_name = f"image_map_{row['key']}"
+        else:
+            cursor.execute("INSERT OR IGNORE INTO image_maps(library) VALUES(?)", (library,))
+            cursor.execute(f"SELECT * FROM image_maps WHERE library = ?", (library,))
+            row = cursor.fetchone()
+            if row and row["key"]:
+                table_name = f"image_map_{row['key']}"
+                cursor.execute(
+                    f"""CREATE TABLE IF NOT EXISTS {table_name} (
+                    key INTEGER PRIMARY KEY,
+                    id TEXT UNIQUE,
+                    overlay TEXT,
+                    compare TEXT,
+                    location TEXT)"""
+                )
+                cursor.execute(
+                    f"""CREATE TABLE IF NOT EXISTS {table_name}_backgrounds (
+                    key INTEGER PRIMARY KEY,
+                    id TEXT UNIQUE,
+                    overlay TEXT,
+                    compare TEXT,
+                    location TEXT)"""
+                )
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {table_name}_overlay ON {table_name}(overlay)")
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {table_name}_backgrounds_overlay ON {table_name}_backgrounds(overlay)")
         return table_name
 
     def query_image_map_overlay(self, table_name, overlay):
+        start = time.perf_counter()
         rks = []
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute(f"SELECT * FROM {table_name} WHERE overlay = ?", (overlay,))
-                rows = cursor.fetchall()
-                for row in rows:
-                    rks.append(int(row["id"]))
+        self._check_writes(table_name)
+        with self._cursor() as cursor:
+            cursor.execute(f"SELECT * FROM {table_name} WHERE overlay = ?", (overlay,))
+            rows = cursor.fetchall()
+            for row in rows:
+                rks.append(int(row["id"]))
+        self._record("image_map", start, len(rks) > 0)
         return rks
 
+    @retry(stop_max_attempt_number=6, wait_exponential_multiplier=250, wait_exponential_max=10000, wait_jitter_max=1000, retry_on_exception=retry_if_locked)
     def update_remove_overlay(self, table_name, overlay):
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute(f"UPDATE {table_name} SET overlay = ? WHERE overlay = ?", ("", overlay))
+        self._check_writes(table_name)
+        with self._cursor() as cursor:
+            cursor.execute(f"UPDATE {table_name} SET overlay = ? WHERE overlay = ?", ("", overlay))
+
+    def load_image_maps(self, table_name):
+        counts = {}
+        for table in [table_name, f"{table_name}_backgrounds"]:
+            self._check_writes(table)
+            with self._cursor() as cursor:
+                cursor.execute(f"SELECT id, location, compare FROM {table}")
+                self._image_maps[table] = {row["id"]: (row["location"], row["compare"]) for row in cursor.fetchall() if row["location"]}
+            counts[table] = len(self._image_maps[table])
+        return counts
 
     def query_image_map(self, id, table_name):
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute(f"SELECT * FROM {table_name} WHERE id = ?", (id,))
-                row = cursor.fetchone()
-                if row and row["location"]:
-                    return row["location"], row["compare"]
-        return None, None
+        start = time.perf_counter()
+        if table_name in self._image_maps:
+            location, compare = self._image_maps[table_name].get(str(id), (None, None))
+            self._record("image_map", start, location is not None)
+            return location, compare
+        location = None
+        compare = None
+        self._check_writes(table_name, "id", id)
+        with self._cursor() as cursor:
+            cursor.execute(f"SELECT * FROM {table_name} WHERE id = ?", (id,))
+            row = cursor.fetchone()
+            if row and row["location"]:
+                location = row["location"]
+                compare = row["compare"]
+        self._record("image_map", start, location is not None)
+        return location, compare
 
     def update_image_map(self, id, table_name, location, compare, overlay=""):
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute(f"INSERT OR IGNORE INTO {table_name}(id) VALUES(?)", (id,))
-                cursor.execute(f"UPDATE {table_name} SET location = ?, compare = ?, overlay = ? WHERE id = ?", (location, compare, overlay, id))
+        if table_name in self._image_maps:
+            if location:
+                self._image_maps[table_name][str(id)] = (location, compare)
+            else:
+                self._image_maps[table_name].pop(str(id), None)
+        self._queue_write(table_name, [("id", id)], f"INSERT OR IGNORE INTO {table_name}(id) VALUES(?)", (id,),
+                          f"UPDATE {table_name} SET location = ?, compare = ?, overlay = ? WHERE id = ?", (location, compare, overlay, id))
 
     def query_radarr_adds(self, tmdb_id, library):
         return self.query_arr_adds(tmdb_id, library, "radarr", "tmdb_id")
@@ -642,14 +1229,15 @@ class Cache:
         return self.query_arr_adds(tvdb_id, library, "sonarr", "tvdb_id")
 
     def query_arr_adds(self, t_id, library, arr, id_type):
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute(f"SELECT * FROM {arr}_adds WHERE {id_type} = ? AND library = ?", (t_id, library))
-                row = cursor.fetchone()
-                if row and row[id_type]:
-                    return int(row[id_type])
-        return None
+        start = time.perf_counter()
+        arr_id = None
+        with self._cursor() as cursor:
+            cursor.execute(f"SELECT * FROM {arr}_adds WHERE {id_type} = ? AND library = ?", (t_id, library))
+            row = cursor.fetchone()
+            if row and row[id_type]:
+                arr_id = int(row[id_type])
+        self._record(f"{arr}_adds", start, arr_id is not None)
+        return arr_id
 
     def update_radarr_adds(self, tmdb_id, library):
         return self.update_arr_adds(tmdb_id, library, "radarr", "tmdb_id")
@@ -657,124 +1245,164 @@ class Cache:
     def update_sonarr_adds(self, tvdb_id, library):
         return self.update_arr_adds(tvdb_id, library, "sonarr", "tvdb_id")
 
+    @retry(stop_max_attempt_number=6, wait_exponential_multiplier=250, wait_exponential_max=10000, wait_jitter_max=1000, retry_on_exception=retry_if_locked)
     def update_arr_adds(self, t_id, library, arr, id_type):
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute(f"INSERT OR IGNORE INTO {arr}_adds({id_type}, library) VALUES(?, ?)", (t_id, library))
+        with self._cursor() as cursor:
+            cursor.execute(f"INSERT OR IGNORE INTO {arr}_adds({id_type}, library) VALUES(?, ?)", (t_id, library))
 
+    def _list_positions(self, order, existing):
+        kept = []
+        tails = []
+        tail_positions = []
+        previous = {}
+        for i, key in enumerate(order):
+            if key in existing:
+                j = bisect.bisect_left(tail_positions, existing[key])
+                previous[i] = tails[j - 1] if j > 0 else None
+                if j == len(tails):
+                    tails.append(i)
+                    tail_positions.append(existing[key])
+                else:
+                    tails[j] = i
+                    tail_positions[j] = existing[key]
+        i = tails[-1] if tails else None
+        while i is not None:
+            kept.append(i)
+            i = previous[i]
+        kept = set(kept)
+        positions = {}
+        pending = []
+        last = None
+        for i, key in enumerate(order + [None]):
+            if key is not None and i not in kept:
+                pending.append(key)
+                continue
+            high = existing[key] if key is not None else None
+            if pending:
+                if last is None and high is None:
+                    steps = [(j + 1) * list_gap for j in range(len(pending))]
+                elif last is None:
+                    steps = [high - (len(pending) - j) * list_gap for j in range(len(pending))]
+                elif high is None:
+                    steps = [last + (j + 1) * list_gap for j in range(len(pending))]
+                elif high - last > len(pending):
+                    steps = [last + (j + 1) * (high - last) // (len(pending) + 1) for j in range(len(pending))]
+                else:
+                    return {k: (j + 1) * list_gap for j, k in enumerate(order)}
+                positions.update(zip(pending, steps))
+                pending = []
+            if key is not None:
+                positions[key] = high
+                last = high
+        return positions
+
+    @retry(stop_max_attempt_number=6, wait_exponential_multiplier=250, wait_exponential_max=10000, wait_jitter_max=1000, retry_on_exception=retry_if_locked)
     def update_list_ids(self, list_key, media_ids):
-        final_ids = []
-        for media_id, media_type in media_ids:
-            final_ids.append((list_key, media_id, media_type))
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.executemany(f"INSERT OR IGNORE INTO list_ids(list_key, media_id, media_type) VALUES(?, ?, ?)", final_ids)
+        order = list(dict.fromkeys([(str(media_id), media_type) for media_id, media_type in media_ids]))
+        with self._cursor() as cursor:
+            cursor.execute("SELECT media_id, media_type, position FROM list_ids WHERE list_key = ?", (list_key,))
+            existing = {(row["media_id"], row["media_type"]): row["position"] for row in cursor.fetchall()}
+            positions = self._list_positions(order, existing)
+            cursor.executemany("DELETE FROM list_ids WHERE list_key = ? AND media_id = ? AND media_type = ?",
+                               [(list_key, media_id, media_type) for media_id, media_type in existing if (media_id, media_type) not in positions])
+            cursor.executemany("INSERT INTO list_ids(list_key, media_id, media_type, position) VALUES(?, ?, ?, ?)",
+                               [(list_key, media_id, media_type, position) for (media_id, media_type), position in positions.items() if (media_id, media_type) not in existing])
+            cursor.executemany("UPDATE list_ids SET position = ? WHERE list_key = ? AND media_id = ? AND media_type = ?",
+                               [(position, list_key, media_id, media_type) for (media_id, media_type), position in positions.items()
+                                if (media_id, media_type) in existing and existing[(media_id, media_type)] != position])
 
+    @retry(stop_max_attempt_number=6, wait_exponential_multiplier=250, wait_exponential_max=10000, wait_jitter_max=1000, retry_on_exception=retry_if_locked)
     def update_list_cache(self, list_type, list_data, expired, expiration):
         list_key = None
-        expiration_date = datetime.now() if expired is True else (datetime.now() - timedelta(days=expiration))
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute(f"INSERT OR IGNORE INTO list_cache(list_type, list_data) VALUES(?, ?)", (list_type, list_data))
-                cursor.execute(f"UPDATE list_cache SET expiration_date = ? WHERE list_type = ? AND list_data = ?", (expiration_date.strftime("%Y-%m-%d"), list_type, list_data))
-                cursor.execute(f"SELECT * FROM list_cache WHERE list_type = ? AND list_data = ?", (list_type, list_data))
-                row = cursor.fetchone()
-                if row and row["key"]:
-                    list_key = row["key"]
+        expires_at = self._expires_at(expired, expiration, jitter=False)
+        with self._cursor() as cursor:
+            cursor.execute(f"INSERT OR IGNORE INTO list_cache(list_type, list_data) VALUES(?, ?)", (list_type, list_data))
+            cursor.execute(f"UPDATE list_cache SET expires_at = ? WHERE list_type = ? AND list_data = ?", (expires_at, list_type, list_data))
+            cursor.execute(f"SELECT * FROM list_cache WHERE list_type = ? AND list_data = ?", (list_type, list_data))
+            row = cursor.fetchone()
+            if row and row["key"]:
+                list_key = row["key"]
         return list_key
 
     def query_list_cache(self, list_type, list_data, expiration):
+        start = time.perf_counter()
         list_key = None
         expired = None
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute(f"SELECT * FROM list_cache WHERE list_type = ? AND list_data = ?", (list_type, list_data))
-                row = cursor.fetchone()
-                if row and row["key"]:
-                    datetime_object = datetime.strptime(row["expiration_date"], "%Y-%m-%d")
-                    time_between_insertion = datetime.now() - datetime_object
-                    list_key = row["key"]
-                    expired = time_between_insertion.days > expiration
+        with self._cursor() as cursor:
+            cursor.execute(f"SELECT *, IFNULL(expires_at, 0) <= ? AS expired FROM list_cache WHERE list_type = ? AND list_data = ?", (int(time.time()), list_type, list_data))
+            row = cursor.fetchone()
+            if row and row["key"]:
+                list_key = row["key"]
+                expired = row["expired"] == 1
+        self._record("list_cache", start, list_key is not None, expired=expired)
         return list_key, expired
 
     def query_list_ids(self, list_key):
+        start = time.perf_counter()
         ids = []
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute(f"SELECT * FROM list_ids WHERE list_key = ?", (list_key,))
-                for row in cursor:
-                    ids.append((row["media_id"], row["media_type"]))
+        with self._cursor() as cursor:
+            cursor.execute(f"SELECT * FROM list_ids WHERE list_key = ? ORDER BY position", (list_key,))
+            for row in cursor:
+                ids.append((row["media_id"], row["media_type"]))
+        self._record("list_ids", start, len(ids) > 0)
         return ids
 
+    @retry(stop_max_attempt_number=6, wait_exponential_multiplier=250, wait_exponential_max=10000, wait_jitter_max=1000, retry_on_exception=retry_if_locked)
     def delete_list_ids(self, list_key):
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute(f"DELETE FROM list_ids WHERE list_key = ?", (list_key,))
+        with self._cursor() as cursor:
+            cursor.execute(f"DELETE FROM list_ids WHERE list_key = ?", (list_key,))
 
     def query_imdb_parental(self, imdb_id, expiration):
+        start = time.perf_counter()
         imdb_dict = {}
         expired = None
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute("SELECT * FROM imdb_parental WHERE imdb_id = ?", (imdb_id,))
-                row = cursor.fetchone()
-                if row:
-                    imdb_dict["nudity"] = row["nudity"] if row["nudity"] else "None"
-                    imdb_dict["violence"] = row["violence"] if row["violence"] else "None"
-                    imdb_dict["profanity"] = row["profanity"] if row["profanity"] else "None"
-                    imdb_dict["alcohol"] = row["alcohol"] if row["alcohol"] else "None"
-                    imdb_dict["frightening"] = row["frightening"] if row["frightening"] else "None"
-                    datetime_object = datetime.strptime(row["expiration_date"], "%Y-%m-%d")
-                    time_between_insertion = datetime.now() - datetime_object
-                    expired = time_between_insertion.days > expiration
+        self._check_writes("imdb_parental", "imdb_id", imdb_id)
+        with self._cursor() as cursor:
+            cursor.execute("SELECT *, IFNULL(expires_at, 0) <= ? AS expired FROM imdb_parental WHERE imdb_id = ?", (int(time.time()), imdb_id))
+            row = cursor.fetchone()
+            if row:
+                imdb_dict["nudity"] = row["nudity"] if row["nudity"] else "None"
+                imdb_dict["violence"] = row["violence"] if row["violence"] else "None"
+                imdb_dict["profanity"] = row["profanity"] if row["profanity"] else "None"
+                imdb_dict["alcohol"] = row["alcohol"] if row["alcohol"] else "None"
+                imdb_dict["frightening"] = row["frightening"] if row["frightening"] else "None"
+                expired = row["expired"] == 1
+        self._record("imdb_parental", start, bool(imdb_dict), expired=expired)
         return imdb_dict, expired
 
     def update_imdb_parental(self, expired, imdb_id, parental, expiration):
-        expiration_date = datetime.now() if expired is True else (datetime.now() - timedelta(days=random.randint(1, expiration)))
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute("INSERT OR IGNORE INTO imdb_parental(imdb_id) VALUES(?)", (imdb_id,))
-                update_sql = "UPDATE imdb_parental SET nudity = ?, violence = ?, profanity = ?, alcohol = ?, " \
-                             "frightening = ?, expiration_date = ? WHERE imdb_id = ?"
-                cursor.execute(update_sql, (parental["nudity"], parental["violence"], parental["profanity"], parental["alcohol"],
-                                            parental["frightening"], expiration_date.strftime("%Y-%m-%d"), imdb_id))
+        expires_at = self._expires_at(expired, expiration)
+        update_sql = "UPDATE imdb_parental SET nudity = ?, violence = ?, profanity = ?, alcohol = ?, " \
+                     "frightening = ?, expires_at = ? WHERE imdb_id = ?"
+        self._queue_write("imdb_parental", [("imdb_id", imdb_id)], "INSERT OR IGNORE INTO imdb_parental(imdb_id) VALUES(?)", (imdb_id,), update_sql,
+                          (parental["nudity"], parental["violence"], parental["profanity"], parental["alcohol"],
+                           parental["frightening"], expires_at, imdb_id))
 
     def query_ergast(self, year, expiration):
+        start = time.perf_counter()
         ergast_list = []
         expired = None
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute("SELECT * FROM ergast_race WHERE season = ?", (year,))
-                for row in cursor.fetchall():
-                    if row:
-                        ergast_list.append({
-                            "season": row["season"] if row["season"] else None,
-                            "round": row["round"] if row["round"] else None,
-                            "raceName": row["name"] if row["name"] else None,
-                            "date": row["date"] if row["date"] else None
-                        })
-                        if not expired:
-                            datetime_object = datetime.strptime(row["expiration_date"], "%Y-%m-%d")
-                            time_between_insertion = datetime.now() - datetime_object
-                            expired = time_between_insertion.days > expiration
+        with self._cursor() as cursor:
+            cursor.execute("SELECT *, IFNULL(expires_at, 0) <= ? AS expired FROM ergast_race WHERE season = ?", (int(time.time()), year))
+            for row in cursor.fetchall():
+                if row:
+                    ergast_list.append({
+                        "season": row["season"] if row["season"] else None,
+                        "round": row["round"] if row["round"] else None,
+                        "raceName": row["name"] if row["name"] else None,
+                        "date": row["date"] if row["date"] else None
+                    })
+                    if not expired:
+                        expired = row["expired"] == 1
+        self._record("ergast_race", start, bool(ergast_list), expired=expired)
         return ergast_list, expired
 
+    @retry(stop_max_attempt_number=6, wait_exponential_multiplier=250, wait_exponential_max=10000, wait_jitter_max=1000, retry_on_exception=retry_if_locked)
     def update_ergast(self, expired, season, races, expiration):
-        expiration_date = datetime.now() if expired is True else (datetime.now() - timedelta(days=random.randint(1, expiration)))
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.row_factory = sqlite3.Row
-            with closing(connection.cursor()) as cursor:
-                cursor.execute("DELETE FROM ergast_race WHERE season = ?", (season,))
-                cursor.executemany("INSERT OR IGNORE INTO ergast_race(season, round) VALUES(?, ?)", [(r.season, r.round) for r in races])
-                cursor.executemany("UPDATE ergast_race SET name = ?, date = ?, expiration_date = ? WHERE season = ? AND round = ?",
-                                   [(r.name, r.date.strftime("%Y-%m-%d") if r.date else None,
-                                     expiration_date.strftime("%Y-%m-%d"), r.season, r.round) for r in races])
+        expires_at = self._expires_at(expired, expiration)
+        with self._cursor() as cursor:
+            cursor.execute("DELETE FROM ergast_race WHERE season = ?", (season,))
+            cursor.executemany("INSERT OR IGNORE INTO ergast_race(season, round) VALUES(?, ?)", [(r.season, r.round) for r in races])
+            cursor.executemany("UPDATE ergast_race SET name = ?, date = ?, expires_at = ? WHERE season = ? AND round = ?",
+                               [(r.name, r.date.strftime("%Y-%m-%d") if r.date else None,
+                                 expires_at, r.season, r.round) for r in races])
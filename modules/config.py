@@ -4,7 +4,7 @@ from lxml import html
 from modules import util, radarr, sonarr
 from modules.anidb import AniDB
 from modules.anilist import AniList
-from modules.cache import Cache
+from modules.cache import Cache, journal_modes
 from modules.convert import Convert
 from modules.emby import Emby
 from modules.ergast import Ergast
@@ -79,6 +79,12 @@ class ConfigFile:
         self.requested_libraries = util.get_list(attrs["libraries"]) if "libraries" in attrs else None
         self.requested_metadata_files = util.get_list(attrs["metadata_files"]) if "metadata_files" in attrs else None
         self.resume_from = attrs["resume"] if "resume" in attrs else None
+        self.cache_maintenance = attrs["cache_maintenance"] if "cache_maintenance" in attrs else False
+        self.cache_import = attrs["cache_import"] if "cache_import" in attrs else None
+        self.cache_export = attrs["cache_export"] if "cache_export" in attrs else None
+        self.cache_tables = util.get_list(attrs["cache_tables"]) if "cache_tables" in attrs and attrs["cache_tables"] else None
+        self.mapping_import = util.get_list(attrs["mapping_import"]) if "mapping_import" in attrs and attrs["mapping_import"] else None
+        self.mapping_static = attrs["mapping_static"] if "mapping_static" in attrs else False
 
         yaml.YAML().allow_duplicate_keys = True
         try:
@@ -301,6 +307,16 @@ class ConfigFile:
         self.general = {
             "cache": check_for_attribute(self.data, "cache", parent="settings", var_type="bool", default=True),
             "cache_expiration": check_for_attribute(self.data, "cache_expiration", parent="settings", var_type="int", default=60),
+            "cache_busy_timeout": check_for_attribute(self.data, "cache_busy_timeout", parent="settings", var_type="int", default=30, save=False, do_print=False),
+            "cache_batch_size": check_for_attribute(self.data, "cache_batch_size", parent="settings", var_type="int", default=500, save=False, do_print=False),
+            "cache_batch_seconds": check_for_attribute(self.data, "cache_batch_seconds", parent="settings", var_type="int", default=30, save=False, do_print=False),
+            "cache_maintenance": check_for_attribute(self.data, "cache_maintenance", parent="settings", default_is_none=True, save=False, do_print=False),
+            "cache_retention": check_for_attribute(self.data, "cache_retention", parent="settings", var_type="int", default=3, save=False, do_print=False),
+            "cache_max_rows": check_for_attribute(self.data, "cache_max_rows", parent="settings", var_type="int", default=0, save=False, do_print=False),
+            "cache_failed_expiration": check_for_attribute(self.data, "cache_failed_expiration", parent="settings", var_type="int", default=1, save=False, do_print=False),
+            "cache_refresh_ahead": check_for_attribute(self.data, "cache_refresh_ahead", parent="settings", var_type="int", default=0, save=False, do_print=False),
+            "cache_compress": check_for_attribute(self.data, "cache_compress", parent="settings", var_type="bool", default=False, save=False, do_print=False),
+            "cache_journal_mode": check_for_attribute(self.data, "cache_journal_mode", parent="settings", test_list=journal_modes, default="wal", save=False, do_print=False),
             "asset_directory": check_for_attribute(self.data, "asset_directory", parent="settings", var_type="list_path", default=[os.path.join(default_dir, "assets")], default_is_none=True),
             "asset_folders": check_for_attribute(self.data, "asset_folders", parent="settings", var_type="bool", default=True),
             "asset_depth": check_for_attribute(self.data, "asset_depth", parent="settings", var_type="int", default=0),
@@ -344,9 +360,23 @@ class ConfigFile:
 
         if self.general["cache"]:
             logger.separator()
-            self.Cache = Cache(self.config_path, self.general["cache_expiration"])
+            self.Cache = Cache(self.config_path, {
+                "expiration": self.general["cache_expiration"],
+                "busy_timeout": self.general["cache_busy_timeout"],
+                "batch_size": self.general["cache_batch_size"],
+                "batch_seconds": self.general["cache_batch_seconds"],
+                "failed_expiration": self.general["cache_failed_expiration"],
+                "compress": self.general["cache_compress"],
+                "journal_mode": self.general["cache_journal_mode"]
+            })
         else:
             self.Cache = None
+        if self.Cache and not self.cache_maintenance and self.general["cache_maintenance"]:
+            try:
+                util.schedule_check("cache_maintenance", self.general["cache_maintenance"], self.start_time, self.run_hour)
+                self.cache_maintenance = True
+            except NotScheduled:
+                pass
         self.GitHub = GitHub(self)
 
         logger.separator()
@@ -394,7 +424,8 @@ class ConfigFile:
                 self.TMDb = TMDb(self, {
                     "apikey": check_for_attribute(self.data, "apikey", parent="tmdb", throw=True),
                     "language": check_for_attribute(self.data, "language", parent="tmdb", default="en"),
-                    "expiration": check_for_attribute(self.data, "cache_expiration", parent="tmdb", var_type="int", default=60)
+                    "expiration": check_for_attribute(self.data, "cache_expiration", parent="tmdb", var_type="int", default=60),
+                    "cache_size": check_for_attribute(self.data, "cache_size", parent="tmdb", var_type="int", default=5000, save=False, do_print=False)
                 })
                 region = check_for_attribute(self.data, "region", parent="tmdb", test_list=self.TMDb.iso_3166_1, default_is_none=True)
                 self.TMDb.region = str(region).upper() if region else region
@@ -571,7 +602,12 @@ class ConfigFile:
                 "url": check_for_attribute(self.data, "url", parent="emby", var_type="url", default_is_none=True),
                 "api_key": check_for_attribute(self.data, "api_key", parent="emby", default_is_none=True),
                 "user_name": check_for_attribute(self.data, "user_name", parent="emby", default_is_none=True),
-                "password": check_for_attribute(self.data, "password", parent="emby", default_is_none=True)
+                "password": check_for_attribute(self.data, "password", parent="emby", default_is_none=True),
+                "page_size": check_for_attribute(self.data, "page_size", parent="emby", var_type="int", default=1000, save=False, do_print=False),
+                "pool_maxsize": check_for_attribute(self.data, "pool_maxsize", parent="emby", var_type="int", default=10, save=False, do_print=False),
+                "keep_alive": check_for_attribute(self.data, "keep_alive", parent="emby", var_type="bool", default=True, save=False, do_print=False),
+                "connect_timeout": check_for_attribute(self.data, "connect_timeout", parent="emby", var_type="int", default=10, save=False, do_print=False),
+                "read_timeout": check_for_attribute(self.data, "read_timeout", parent="emby", var_type="int", default=60, save=False, do_print=False)
             }
             # emby_password = check_for_attribute(self.data, "password", parent="emby", default_is_none=True)
             #  region = check_for_attribute(self.data, "region", parent="tmdb", test_list=self.TMDb.iso_3166_1, default_is_none=True)
@@ -886,7 +922,12 @@ class ConfigFile:
                         "url": check_for_attribute(lib, "url", parent="emby", var_type="url", default=self.general["emby"]["url"], req_default=True, save=False),
                         "api_key": check_for_attribute(lib, "api_key", parent="emby", default=self.general["emby"]["api_key"], req_default=True, save=False),
                         "user_name": check_for_attribute(lib, "user_name", parent="emby", default=self.general["emby"]["user_name"], req_default=True, save=False),
-                        "password": check_for_attribute(lib, "password", parent="emby", default=self.general["emby"]["password"], req_default=True, save=False)
+                        "password": check_for_attribute(lib, "password", parent="emby", default=self.general["emby"]["password"], req_default=True, save=False),
+                        "page_size": check_for_attribute(lib, "page_size", parent="emby", var_type="int", default=self.general["emby"]["page_size"], save=False, do_print=False),
+                        "pool_maxsize": check_for_attribute(lib, "pool_maxsize", parent="emby", var_type="int", default=self.general["emby"]["pool_maxsize"], save=False, do_print=False),
+                        "keep_alive": check_for_attribute(lib, "keep_alive", parent="emby", var_type="bool", default=self.general["emby"]["keep_alive"], save=False, do_print=False),
+                        "connect_timeout": check_for_attribute(lib, "connect_timeout", parent="emby", var_type="int", default=self.general["emby"]["connect_timeout"], save=False, do_print=False),
+                        "read_timeout": check_for_attribute(lib, "read_timeout", parent="emby", var_type="int", default=self.general["emby"]["read_timeout"], save=False, do_print=False)
                     }
                     # params["plex"] = {
                     #     "url": check_for_attribute(lib, "url", parent="plex", var_type="url", default=self.general["plex"]["url"], req_default=True, save=False),
@@ -923,7 +964,12 @@ class ConfigFile:
                         "url": check_for_attribute(lib, "url", parent="emby", var_type="url", default=self.general["emby"]["url"], req_default=True, save=False),
                         "api_key": check_for_attribute(lib, "api_key", parent="emby", default=self.general["emby"]["api_key"], req_default=True, save=False),
                         "user_name": check_for_attribute(lib, "user_name", parent="emby", default=self.general["emby"]["user_name"], req_default=True, save=False),
-                        "password": check_for_attribute(lib, "password", parent="emby", default=self.general["emby"]["password"], req_default=True, save=False)
+                        "password": check_for_attribute(lib, "password", parent="emby", default=self.general["emby"]["password"], req_default=True, save=False),
+                        "page_size": check_for_attribute(lib, "page_size", parent="emby", var_type="int", default=self.general["emby"]["page_size"], save=False, do_print=False),
+                        "pool_maxsize": check_for_attribute(lib, "pool_maxsize", parent="emby", var_type="int", default=self.general["emby"]["pool_maxsize"], save=False, do_print=False),
+                        "keep_alive": check_for_attribute(lib, "keep_alive", parent="emby", var_type="bool", default=self.general["emby"]["keep_alive"], save=False, do_print=False),
+                        "connect_timeout": check_for_attribute(lib, "connect_timeout", parent="emby", var_type="int", default=self.general["emby"]["connect_timeout"], save=False, do_print=False),
+                        "read_timeout": check_for_attribute(lib, "read_timeout", parent="emby", var_type="int", default=self.general["emby"]["read_timeout"], save=False, do_print=False)
                     }
                     embyLibrary = Emby(self, params)
                 if self.general["radarr"]["url"] or (lib and "radarr" in lib):
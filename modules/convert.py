@@ -1,4 +1,7 @@
-import re, requests
+import json, os, re, requests, threading, time
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from modules import util
 from modules.util import Failed
 from plexapi.exceptions import BadRequest
@@ -6,45 +9,227 @@ from plexapi.exceptions import BadRequest
 logger = util.logger
 
 anime_lists_url = "https://raw.githubusercontent.com/Fribb/anime-lists/master/anime-list-full.json"
+convert_workers = 8
+tmdb_digits = re.compile(r"\d+")
+
+class IdMap:
+    def __init__(self, pairs):
+        items = sorted(dict(pairs).items())
+        self._keys = array("q", [k for k, _ in items])
+        self._values = array("q", [v for _, v in items])
+
+    def _index(self, key):
+        try:
+            key = int(key)
+        except (TypeError, ValueError):
+            return None
+        i = bisect_left(self._keys, key)
+        return i if i < len(self._keys) and self._keys[i] == key else None
+
+    def __contains__(self, key):
+        return self._index(key) is not None
+
+    def __getitem__(self, key):
+        i = self._index(key)
+        if i is None:
+            raise KeyError(key)
+        return self._values[i]
+
+    def __len__(self):
+        return len(self._keys)
+
+class IdIndex:
+    str_types = ["imdb", "tmdb_episode"]
+
+    def __init__(self):
+        self._parent = {}
+        self._members = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._parent)
+
+    def _find(self, node):
+        root = node
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[node] != root:
+            self._parent[node], node = root, self._parent[node]
+        return root
+
+    def add(self, type1, id1, type2, id2):
+        if not id1 or not id2:
+            return
+        with self._lock:
+            self._union(f"{type1}:{id1}", f"{type2}:{id2}")
+
+    def _union(self, node1, node2):
+        roots = []
+        for node in [node1, node2]:
+            if node not in self._parent:
+                self._parent[node] = node
+                self._members[node] = [node]
+            roots.append(self._find(node))
+        root, other = roots
+        if root == other:
+            return
+        if len(self._members[root]) < len(self._members[other]):
+            root, other = other, root
+        self._parent[other] = root
+        self._members[root].extend(self._members.pop(other))
+
+    def get(self, from_type, _id, to_type):
+        # only answer when the component pairs one from_type ID with one to_type ID, otherwise fall back to the maps
+        node = f"{from_type}:{_id}"
+        with self._lock:
+            if node not in self._parent:
+                return None
+            members = list(self._members[self._find(node)])
+        found = None
+        from_count = 0
+        for member in members:
+            id_type, value = member.split(":", 1)
+            if id_type == from_type:
+                from_count += 1
+            elif id_type == to_type:
+                if found is not None:
+                    return None
+                found = value
+        if from_count != 1 or found is None:
+            return None
+        return found if to_type in self.str_types else int(found)
 
 class Convert:
     def __init__(self, config):
         self.config = config
-        self._anidb_ids = {}
-        self._mal_to_anidb = {}
-        self._anilist_to_anidb = {}
+        self.anime_lists_path = os.path.join(self.config.default_dir, "anime-list-full.json")
+        self._id_index = IdIndex()
+        self._id_index_loaded = False
+        self._anime_loaded = False
+        self._anidb_ids = None
+        self._mal_to_anidb = None
+        self._anilist_to_anidb = None
+        self._anidb_to_imdb = None
+        self._anidb_to_tvdb = None
+        self._imdb_to_anidb = None
+        self._tvdb_to_anidb = None
+
+    def _anime_lists(self):
+        headers_path = f"{self.anime_lists_path}.headers"
+        cached = {}
+        if os.path.exists(self.anime_lists_path) and os.path.exists(headers_path):
+            try:
+                with open(headers_path, encoding="utf-8") as f:
+                    cached = json.load(f)
+            except (OSError, ValueError):
+                cached = {}
+        headers = {}
+        if "etag" in cached and cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if "last_modified" in cached and cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+        try:
+            response = self.config.get(anime_lists_url, headers=headers)
+            if response.status_code == 304:
+                logger.debug(f"Anime Lists: Using cached {self.anime_lists_path}")
+            elif response.status_code >= 400:
+                raise Failed(f"Anime Lists Error: {response.status_code} {response.reason}")
+            else:
+                content = response.json()
+                with open(self.anime_lists_path, "w", encoding="utf-8") as f:
+                    json.dump(content, f)
+                with open(headers_path, "w", encoding="utf-8") as f:
+                    json.dump({"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}, f)
+                return content
+        except (Failed, ValueError, requests.exceptions.RequestException) as e:
+            if not os.path.exists(self.anime_lists_path):
+                logger.error(e)
+                return []
+            logger.warning(f"{e}; Using cached {self.anime_lists_path}")
+        with open(self.anime_lists_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _load_anime_ids(self):
+        if self._anime_loaded:
+            return
+        anidb_ids = []
+        mal_to_anidb = []
+        anilist_to_anidb = []
+        anidb_to_tvdb = []
         self._anidb_to_imdb = {}
-        self._anidb_to_tvdb = {}
         self._imdb_to_anidb = {}
-        self._tvdb_to_anidb = {}
-        for anime_id in self.config.get_json(anime_lists_url):
+        for anime_id in self._anime_lists():
             if "anidb_id" in anime_id:
-                self._anidb_ids[anime_id["anidb_id"]] = anime_id
+                anidb_id = int(anime_id["anidb_id"])
+                anidb_ids.append((anidb_id, 0))
                 if "mal_id" in anime_id:
-                    self._mal_to_anidb[int(anime_id["mal_id"])] = int(anime_id["anidb_id"])
+                    mal_to_anidb.append((int(anime_id["mal_id"]), anidb_id))
                 if "anilist_id" in anime_id:
-                    self._anilist_to_anidb[int(anime_id["anilist_id"])] = int(anime_id["anidb_id"])
+                    anilist_to_anidb.append((int(anime_id["anilist_id"]), anidb_id))
                 if "imdb_id" in anime_id and str(anime_id["imdb_id"]).startswith("tt"):
-                    self._anidb_to_imdb[int(anime_id["anidb_id"])] = util.get_list(anime_id["imdb_id"])
-                    for im_id in util.get_list(anime_id["imdb_id"]):
-                        self._imdb_to_anidb[im_id] = int(anime_id["anidb_id"])
+                    self._anidb_to_imdb[anidb_id] = util.get_list(anime_id["imdb_id"])
+                    for im_id in self._anidb_to_imdb[anidb_id]:
+                        self._imdb_to_anidb[im_id] = anidb_id
                 if "thetvdb_id" in anime_id:
-                    self._anidb_to_tvdb[int(anime_id["anidb_id"])] = int(anime_id["thetvdb_id"])
-                    self._tvdb_to_anidb[int(anime_id["thetvdb_id"])] = int(anime_id["anidb_id"])
+                    anidb_to_tvdb.append((anidb_id, int(anime_id["thetvdb_id"])))
+        self._anidb_ids = IdMap(anidb_ids)
+        self._mal_to_anidb = IdMap(mal_to_anidb)
+        self._anilist_to_anidb = IdMap(anilist_to_anidb)
+        self._anidb_to_tvdb = IdMap(anidb_to_tvdb)
+        self._tvdb_to_anidb = IdMap([(v, k) for k, v in anidb_to_tvdb])
+        for mal_id, anidb_id in mal_to_anidb:
+            self._id_index.add("mal", mal_id, "anidb", anidb_id)
+        for anilist_id, anidb_id in anilist_to_anidb:
+            self._id_index.add("anilist", anilist_id, "anidb", anidb_id)
+        for anidb_id, imdb_ids in self._anidb_to_imdb.items():
+            for imdb_id in imdb_ids:
+                self._id_index.add("imdb", imdb_id, "anidb", anidb_id)
+        self._anime_loaded = True
+        logger.debug(f"Anime Lists: {len(self._anidb_ids)} AniDB IDs Loaded")
+
+    def _get_index(self):
+        if not self._id_index_loaded:
+            if self.config.Cache:
+                for pair in self.config.Cache.query_id_pairs():
+                    self._id_index.add(*pair)
+            self._id_index_loaded = True
+            logger.debug(f"ID Index: {len(self._id_index)} IDs Loaded")
+        return self._id_index
+
+    def resolve(self, from_type, _id, to_type):
+        return self._get_index().get(from_type, _id, to_type)
+
+    def _index_imdb_to_tmdb(self, imdb_id):
+        for tmdb_type in ["movie", "show", "episode"]:
+            tmdb_id = self.resolve("imdb", imdb_id, f"tmdb_{tmdb_type}")
+            if tmdb_id:
+                return tmdb_id, tmdb_type
+        return None, None
 
     def imdb_to_anidb(self, imdb_id):
+        self._load_anime_ids()
         if imdb_id in self._imdb_to_anidb:
             return self._imdb_to_anidb[imdb_id]
         else:
             raise Failed(f"AniDB ID not found for IMDb ID: {imdb_id}")
 
     def tvdb_to_anidb(self, tvdb_id):
-        if int(tvdb_id) in self._tvdb_to_anidb:
-            return self._tvdb_to_anidb[int(tvdb_id)]
+        self._load_anime_ids()
+        if tvdb_id in self._tvdb_to_anidb:
+            return self._tvdb_to_anidb[tvdb_id]
         else:
             raise Failed(f"AniDB ID not found for TVDb ID: {tvdb_id}")
 
+    def ids_to_anidb(self, tvdb_id=None, imdb_id=None):
+        self._load_anime_ids()
+        if tvdb_id and tvdb_id in self._tvdb_to_anidb:
+            return self._tvdb_to_anidb[tvdb_id]
+        elif imdb_id and imdb_id in self._imdb_to_anidb:
+            return self._imdb_to_anidb[imdb_id]
+        return None
+
     def anidb_to_ids(self, anidb_ids, library):
+        self._load_anime_ids()
         ids = []
         anidb_list = anidb_ids if isinstance(anidb_ids, list) else [anidb_ids]
         for anidb_id in anidb_list:
@@ -68,6 +253,7 @@ class Convert:
         return ids
 
     def anilist_to_ids(self, anilist_ids, library):
+        self._load_anime_ids()
         anidb_ids = []
         for anilist_id in anilist_ids:
             if anilist_id in self._anilist_to_anidb:
@@ -77,6 +263,7 @@ class Convert:
         return self.anidb_to_ids(anidb_ids, library)
 
     def myanimelist_to_ids(self, mal_ids, library):
+        self._load_anime_ids()
         ids = []
         for mal_id in mal_ids:
             if int(mal_id) in library.mal_map:
@@ -89,6 +276,9 @@ class Convert:
 
     def tmdb_to_imdb(self, tmdb_id, is_movie=True, fail=False):
         media_type = "movie" if is_movie else "show"
+        imdb_id = self.resolve(f"tmdb_{media_type}", tmdb_id, "imdb")
+        if imdb_id:
+            return imdb_id
         expired = False
         if self.config.Cache and is_movie:
             cache_id, expired = self.config.Cache.query_imdb_to_tmdb_map(tmdb_id, imdb=False, media_type=media_type)
@@ -97,6 +287,7 @@ class Convert:
         try:
             imdb_id = self.config.TMDb.convert_from(tmdb_id, "imdb_id", is_movie)
             if imdb_id:
+                self._id_index.add("imdb", imdb_id, f"tmdb_{media_type}", tmdb_id)
                 if self.config.Cache:
                     self.config.Cache.update_imdb_to_tmdb_map(media_type, expired, imdb_id, tmdb_id)
                 return imdb_id
@@ -108,6 +299,9 @@ class Convert:
             return None
 
     def imdb_to_tmdb(self, imdb_id, fail=False):
+        tmdb_id, tmdb_type = self._index_imdb_to_tmdb(imdb_id)
+        if tmdb_id:
+            return tmdb_id, tmdb_type
         expired = False
         if self.config.Cache:
             cache_id, cache_type, expired = self.config.Cache.query_imdb_to_tmdb_map(imdb_id, imdb=True, return_type=True)
@@ -116,6 +310,7 @@ class Convert:
         try:
             tmdb_id, tmdb_type = self.config.TMDb.convert_imdb_to(imdb_id)
             if tmdb_id:
+                self._id_index.add("imdb", imdb_id, f"tmdb_{tmdb_type}", tmdb_id)
                 if self.config.Cache:
                     self.config.Cache.update_imdb_to_tmdb_map(tmdb_type, expired, imdb_id, tmdb_id)
                 return tmdb_id, tmdb_type
@@ -127,6 +322,9 @@ class Convert:
             return None, None
 
     def tmdb_to_tvdb(self, tmdb_id, fail=False):
+        tvdb_id = self.resolve("tmdb_show", tmdb_id, "tvdb")
+        if tvdb_id:
+            return tvdb_id
         expired = False
         if self.config.Cache:
             cache_id, expired = self.config.Cache.query_tmdb_to_tvdb_map(tmdb_id, tmdb=True)
@@ -135,6 +333,7 @@ class Convert:
         try:
             tvdb_id = self.config.TMDb.convert_from(tmdb_id, "tvdb_id", False)
             if tvdb_id:
+                self._id_index.add("tmdb_show", tmdb_id, "tvdb", tvdb_id)
                 if self.config.Cache:
                     self.config.Cache.update_tmdb_to_tvdb_map(expired, tmdb_id, tvdb_id)
                 return tvdb_id
@@ -146,6 +345,9 @@ class Convert:
             return None
 
     def tvdb_to_tmdb(self, tvdb_id, fail=False):
+        tmdb_id = self.resolve("tvdb", tvdb_id, "tmdb_show")
+        if tmdb_id:
+            return tmdb_id
         expired = False
         if self.config.Cache:
             cache_id, expired = self.config.Cache.query_tmdb_to_tvdb_map(tvdb_id, tmdb=False)
@@ -154,6 +356,7 @@ class Convert:
         try:
             tmdb_id = self.config.TMDb.convert_tvdb_to(tvdb_id)
             if tmdb_id:
+                self._id_index.add("tmdb_show", tmdb_id, "tvdb", tvdb_id)
                 if self.config.Cache:
                     self.config.Cache.update_tmdb_to_tvdb_map(expired, tmdb_id, tvdb_id)
                 return tmdb_id
@@ -165,6 +368,9 @@ class Convert:
             return None
 
     def tvdb_to_imdb(self, tvdb_id, fail=False):
+        imdb_id = self.resolve("tvdb", tvdb_id, "imdb")
+        if imdb_id:
+            return imdb_id
         expired = False
         if self.config.Cache:
             cache_id, expired = self.config.Cache.query_imdb_to_tvdb_map(tvdb_id, imdb=False)
@@ -173,6 +379,7 @@ class Convert:
         try:
             imdb_id = self.tmdb_to_imdb(self.tvdb_to_tmdb(tvdb_id, fail=True), is_movie=False, fail=True)
             if imdb_id:
+                self._id_index.add("imdb", imdb_id, "tvdb", tvdb_id)
                 if self.config.Cache:
                     self.config.Cache.update_imdb_to_tvdb_map(expired, imdb_id, tvdb_id)
                 return imdb_id
@@ -184,6 +391,9 @@ class Convert:
             return None
 
     def imdb_to_tvdb(self, imdb_id, fail=False):
+        tvdb_id = self.resolve("imdb", imdb_id, "tvdb")
+        if tvdb_id:
+            return tvdb_id
         expired = False
         if self.config.Cache:
             cache_id, expired = self.config.Cache.query_imdb_to_tvdb_map(imdb_id, imdb=True)
@@ -194,6 +404,7 @@ class Convert:
             if tmdb_type == "show":
                 tvdb_id = self.tmdb_to_tvdb(tmdb_id, fail=True)
                 if tvdb_id:
+                    self._id_index.add("imdb", imdb_id, "tvdb", tvdb_id)
                     if self.config.Cache:
                         self.config.Cache.update_imdb_to_tvdb_map(expired, imdb_id, tvdb_id)
                     return tvdb_id
@@ -204,16 +415,134 @@ class Convert:
         else:
             return None
 
-    def get_id(self, item, library):
-        expired = None
+    def _resolve_many(self, ids, func):
+        def resolve(_id):
+            try:
+                return _id, func(_id)
+            except Failed:
+                return _id, None
+        if len(ids) < 2:
+            return [resolve(_id) for _id in ids]
+        with ThreadPoolExecutor(max_workers=min(convert_workers, len(ids))) as executor:
+            return list(executor.map(resolve, ids))
+
+    def imdb_to_tmdb_many(self, imdb_ids, network=True):
+        imdb_ids = list(dict.fromkeys(imdb_ids))
+        results = {}
+        expired = {}
+        for imdb_id in imdb_ids:
+            tmdb_id, tmdb_type = self._index_imdb_to_tmdb(imdb_id)
+            if tmdb_id:
+                results[imdb_id] = (tmdb_id, tmdb_type)
+        if self.config.Cache and len(results) < len(imdb_ids):
+            for imdb_id, (cache_id, cache_type, cache_expired) in self.config.Cache.query_imdb_to_tmdb_maps([i for i in imdb_ids if i not in results]).items():
+                if cache_expired:
+                    expired[imdb_id] = True
+                else:
+                    results[imdb_id] = (cache_id, cache_type)
+        for imdb_id, converted in self._resolve_many([i for i in imdb_ids if i not in results] if network else [], self.config.TMDb.convert_imdb_to):
+            if converted and converted[0]:
+                self._id_index.add("imdb", imdb_id, f"tmdb_{converted[1]}", converted[0])
+                if self.config.Cache:
+                    self.config.Cache.update_imdb_to_tmdb_map(converted[1], imdb_id in expired, imdb_id, converted[0])
+                results[imdb_id] = converted
+        return {i: results[i] if i in results else (None, None) for i in imdb_ids}
+
+    def tmdb_to_tvdb_many(self, tmdb_ids, network=True):
+        tmdb_ids = list(dict.fromkeys([int(t) for t in tmdb_ids]))
+        results = {t: self.resolve("tmdb_show", t, "tvdb") for t in tmdb_ids}
+        results = {k: v for k, v in results.items() if v}
+        expired = {}
+        if self.config.Cache and len(results) < len(tmdb_ids):
+            for tmdb_id, (cache_id, _, cache_expired) in self.config.Cache.query_tmdb_to_tvdb_maps([t for t in tmdb_ids if t not in results]).items():
+                if cache_expired:
+                    expired[int(tmdb_id)] = True
+                else:
+                    results[int(tmdb_id)] = cache_id
+        for tmdb_id, tvdb_id in self._resolve_many([t for t in tmdb_ids if t not in results] if network else [], lambda t: self.config.TMDb.convert_from(t, "tvdb_id", False)):
+            if tvdb_id:
+                self._id_index.add("tmdb_show", tmdb_id, "tvdb", tvdb_id)
+                if self.config.Cache:
+                    self.config.Cache.update_tmdb_to_tvdb_map(tmdb_id in expired, tmdb_id, tvdb_id)
+                results[tmdb_id] = tvdb_id
+        return {t: results[t] if t in results else None for t in tmdb_ids}
+
+    def tmdb_to_imdb_many(self, tmdb_ids, is_movie=True, network=True):
+        tmdb_ids = list(dict.fromkeys([int(t) for t in tmdb_ids]))
+        media_type = "movie" if is_movie else "show"
+        results = {t: self.resolve(f"tmdb_{media_type}", t, "imdb") for t in tmdb_ids}
+        results = {k: v for k, v in results.items() if v}
+        expired = {}
+        if self.config.Cache and is_movie and len(results) < len(tmdb_ids):
+            for tmdb_id, (cache_id, _, cache_expired) in self.config.Cache.query_imdb_to_tmdb_maps([t for t in tmdb_ids if t not in results], imdb=False, media_type=media_type).items():
+                if cache_expired:
+                    expired[int(tmdb_id)] = True
+                else:
+                    results[int(tmdb_id)] = cache_id
+        for tmdb_id, imdb_id in self._resolve_many([t for t in tmdb_ids if t not in results] if network else [], lambda t: self.config.TMDb.convert_from(t, "imdb_id", is_movie)):
+            if imdb_id:
+                self._id_index.add("imdb", imdb_id, f"tmdb_{media_type}", tmdb_id)
+                if self.config.Cache:
+                    self.config.Cache.update_imdb_to_tmdb_map(media_type, tmdb_id in expired, imdb_id, tmdb_id)
+                results[tmdb_id] = imdb_id
+        return {t: results[t] if t in results else None for t in tmdb_ids}
+
+    def tvdb_to_tmdb_many(self, tvdb_ids, network=True):
+        tvdb_ids = list(dict.fromkeys([int(t) for t in tvdb_ids]))
+        results = {t: self.resolve("tvdb", t, "tmdb_show") for t in tvdb_ids}
+        results = {k: v for k, v in results.items() if v}
+        expired = {}
+        if self.config.Cache and len(results) < len(tvdb_ids):
+            for tvdb_id, (cache_id, _, cache_expired) in self.config.Cache.query_tmdb_to_tvdb_maps([t for t in tvdb_ids if t not in results], tmdb=False).items():
+                if cache_expired:
+                    expired[int(tvdb_id)] = True
+                else:
+                    results[int(tvdb_id)] = cache_id
+        for tvdb_id, tmdb_id in self._resolve_many([t for t in tvdb_ids if t not in results] if network else [], self.config.TMDb.convert_tvdb_to):
+            if tmdb_id:
+                self._id_index.add("tmdb_show", tmdb_id, "tvdb", tvdb_id)
+                if self.config.Cache:
+                    self.config.Cache.update_tmdb_to_tvdb_map(tvdb_id in expired, tmdb_id, tvdb_id)
+                results[tvdb_id] = tmdb_id
+        return {t: results[t] if t in results else None for t in tvdb_ids}
+
+    def tvdb_to_imdb_many(self, tvdb_ids, network=True):
+        tvdb_ids = list(dict.fromkeys([int(t) for t in tvdb_ids]))
+        results = {t: self.resolve("tvdb", t, "imdb") for t in tvdb_ids}
+        results = {k: v for k, v in results.items() if v}
+        expired = {}
+        if self.config.Cache and len(results) < len(tvdb_ids):
+            for tvdb_id, (cache_id, _, cache_expired) in self.config.Cache.query_imdb_to_tvdb_maps([t for t in tvdb_ids if t not in results], imdb=False).items():
+                if cache_expired:
+                    expired[int(tvdb_id)] = True
+                else:
+                    results[int(tvdb_id)] = cache_id
+        tmdb_ids = {t: tmdb_id for t, tmdb_id in self.tvdb_to_tmdb_many([t for t in tvdb_ids if t not in results], network=network).items() if tmdb_id}
+        imdb_ids = self.tmdb_to_imdb_many(tmdb_ids.values(), is_movie=False, network=network)
+        for tvdb_id, tmdb_id in tmdb_ids.items():
+            imdb_id = imdb_ids[int(tmdb_id)]
+            if imdb_id:
+                self._id_index.add("imdb", imdb_id, "tvdb", tvdb_id)
+                if self.config.Cache:
+                    self.config.Cache.update_imdb_to_tvdb_map(tvdb_id in expired, imdb_id, tvdb_id)
+                results[tvdb_id] = imdb_id
+        return {t: results[t] if t in results else None for t in tvdb_ids}
+
+    def _provider_ids(self, item):
         tmdb_id = []
-        tmdb_id_v2 = []
-        tvdb_id = []
         imdb_id = []
-        anidb_id = None
-        guid = item.id
-        item_type = item.type
-        
+        for provider_id, value in item.provider_ids.items():
+            if provider_id.lower() == "imdb":
+                imdb_id.append(value)
+            elif provider_id.lower() == "tmdb":
+                id_to_add = tmdb_digits.search(value)
+                if id_to_add:
+                    tmdb_id.append(int(id_to_add.group(0)))
+                else:
+                    logger.debug("Unable to append value to tmdb_id")
+        return tmdb_id, imdb_id
+
+    def _map_result(self, item, library, expired, tmdb_id, tvdb_id, imdb_id):
         def update_cache(cache_ids, id_type, imdb_in, guid_type):
             if self.config.Cache:
                 cache_ids = ",".join([str(c) for c in cache_ids])
@@ -222,77 +551,59 @@ class Convert:
                 logger.info(f" Cache  |  {'^' if expired else '+'}  | {ids} | {item.name}")
                 self.config.Cache.update_guid_map(item.id, cache_ids, imdb_in, expired, guid_type)
 
-        if self.config.Cache:
-            cache_id, imdb_check, media_type, expired = self.config.Cache.query_guid_map(item.id)
-            if (cache_id or imdb_check) and not expired:
-                media_id_type = "movie" if "movie" in media_type else "show"
-                if item_type == "hama" and check_id.startswith("anidb"):
-                    anidb_id = int(re.search("-(.*)", check_id).group(1))
-                    library.anidb_map[anidb_id] = item.id
-                elif item_type == "myanimelist":
-                    library.mal_map[int(check_id)] = item.id
-                return media_id_type, cache_id, imdb_check
+        if (tmdb_id or imdb_id) and library.is_movie:
+            update_cache(tmdb_id, "TMDb", imdb_id, "movie")
+            return "movie", tmdb_id, imdb_id
+        elif (tvdb_id or imdb_id) and library.is_show:
+            update_cache(tvdb_id, "TVDb", imdb_id, "show")
+            return "show", tvdb_id, imdb_id
+        else:
+            logger.debug(f"TMDb: {tmdb_id}, IMDb: {imdb_id}, TVDb: {tvdb_id}")
+            raise Failed(f"No ID to convert")
+
+    def _convert_entries(self, entries, library, network):
+        unresolved = set()
 
+        def run_step(check, convert, apply):
+            todo = [e for e in entries if id(e) not in unresolved and "error" not in e and check(e)]
+            if not todo:
+                return
+            found = convert(todo)
+            for e in todo:
+                values = apply(e, found)
+                if not network and not all(values):
+                    unresolved.add(id(e))
+                    continue
+                yield e, values
+
+        for e, values in run_step(lambda e: not e["tmdb"] and e["imdb"],
+                                  lambda todo: self.imdb_to_tmdb_many([i for e in todo for i in e["imdb"]], network=network),
+                                  lambda e, found: [found[i] if found[i][0] else None for i in e["imdb"]]):
+            e["tmdb"] = [v[0] for v in values if v and ((v[1] == "movie" and library.is_movie) or (v[1] == "show" and library.is_show))]
+        if library.is_movie:
+            for e, values in run_step(lambda e: not e["imdb"] and e["tmdb"],
+                                      lambda todo: self.tmdb_to_imdb_many([t for e in todo for t in e["tmdb"]], network=network),
+                                      lambda e, found: [found[int(t)] for t in e["tmdb"]]):
+                e["imdb"] = [i for i in values if i]
+        if library.is_show:
+            for e, values in run_step(lambda e: not e["tvdb"] and e["tmdb"],
+                                      lambda todo: self.tmdb_to_tvdb_many([t for e in todo for t in e["tmdb"]], network=network),
+                                      lambda e, found: [found[int(t)] for t in e["tmdb"]]):
+                e["tvdb"] = [t for t in values if t]
+                if not e["tvdb"]:
+                    e["error"] = f"Unable to convert TMDb ID: {', '.join([str(t) for t in e['tmdb']])} to TVDb ID"
+        for e, values in run_step(lambda e: not e["imdb"] and e["tvdb"],
+                                  lambda todo: self.tvdb_to_imdb_many([t for e in todo for t in e["tvdb"]], network=network),
+                                  lambda e, found: [found[int(t)] for t in e["tvdb"]]):
+            e["imdb"] = [i for i in values if i]
+        return unresolved
+
+    def _map_entry(self, entry, library):
+        item = entry["item"]
         try:
-            i = 1
-            for provider_id in item.provider_ids:
-                i += 1
-                if provider_id.lower() == 'imdb':
-                    imdb_id.append(item.provider_ids[provider_id])
-                if provider_id.lower() == 'tmdb':
-                    #Check if provider_id value is not all numbers first?
-                    #Only grab numbers from the tmbd ID
-                    id_to_add = re.findall('\d+',item.provider_ids[provider_id])
-                    #Sometimes a list is returned..
-                    if isinstance(id_to_add, list):
-                        #Make sure list isn't empty though
-                        if len(id_to_add) > 0:
-                            tmdb_id.append(id_to_add[0])
-                        else:
-                            logger.debug("Unable to append value to tmdb_id")
-                    elif id_to_add is not None:
-                        #should be a string if we get here..
-                        #TODO: Error check some shit.
-                        tmdb_id.append(id_to_add)
-
-            if not tmdb_id and imdb_id:
-                for imdb in imdb_id:
-                    tmdb, tmdb_type = self.imdb_to_tmdb(imdb)
-                    if tmdb and ((tmdb_type == "movie" and library.is_movie) or (tmdb_type == "show" and library.is_show)):
-                        tmdb_id.append(tmdb)
-
-            if not imdb_id and tmdb_id and library.is_movie:
-                for tmdb in tmdb_id:
-                    imdb = self.tmdb_to_imdb(tmdb)
-                    if imdb:
-                        imdb_id.append(imdb)
-
-            if not tvdb_id and tmdb_id and library.is_show:
-                for tmdb in tmdb_id:
-                    tvdb = self.tmdb_to_tvdb(tmdb)
-                    if tvdb:
-                        tvdb_id.append(tvdb)
-                    if not tvdb_id:
-                        raise Failed(f"Unable to convert TMDb ID: {', '.join([str(t) for t in tmdb_id])} to TVDb ID")
-
-            if not imdb_id and tvdb_id:
-                for tvdb in tvdb_id:
-                    imdb = self.tvdb_to_imdb(tvdb)
-                    if imdb:
-                        imdb_id.append(imdb)
-
-            if (tmdb_id or imdb_id) and library.is_movie:
-                update_cache(tmdb_id, "TMDb", imdb_id, "movie")
-                return "movie", tmdb_id, imdb_id
-            elif (tvdb_id or imdb_id) and library.is_show:
-                update_cache(tvdb_id, "TVDb", imdb_id, "show")
-                return "show", tvdb_id, imdb_id
-            elif anidb_id and (tmdb_id or imdb_id) and library.is_show:
-                update_cache(tmdb_id, "TMDb", imdb_id, "show_movie")
-                return "movie", tmdb_id, imdb_id
-            else:
-                logger.debug(f"TMDb: {tmdb_id}, IMDb: {imdb_id}, TVDb: {tvdb_id}")
-                raise Failed(f"No ID to convert")
+            if "error" in entry:
+                raise Failed(entry["error"])
+            return self._map_result(item, library, entry["expired"], entry["tmdb"], entry["tvdb"], entry["imdb"])
         except Failed as e:
             logger.info(f'Mapping Error | {item.id:<46} | {e} for "{item.name}"')
         except BadRequest:
@@ -300,7 +611,34 @@ class Convert:
             logger.info(f'Mapping Error | {item.id:<46} | Bad Request for "{item.name}"')
         return None, None, None
 
-        
+    def get_ids(self, items, library):
+        results = {}
+        report = {}
+        start = time.perf_counter()
+        entries = []
+        for item in items:
+            expired = None
+            if self.config.Cache:
+                cache_id, imdb_check, media_type, expired = self.config.Cache.query_guid_map(item.id)
+                if (cache_id or imdb_check) and not expired:
+                    results[item.id] = ("movie" if "movie" in media_type else "show", cache_id, imdb_check)
+                    continue
+            tmdb_id, imdb_id = self._provider_ids(item)
+            entries.append({"item": item, "expired": expired, "tmdb": tmdb_id, "imdb": imdb_id, "tvdb": []})
+        report["cached"] = (len(results), time.perf_counter() - start)
+        for bucket, network in [("local", False), ("network", True)]:
+            start = time.perf_counter()
+            unresolved = self._convert_entries(entries, library, network) if entries else set()
+            for entry in entries:
+                if id(entry) not in unresolved:
+                    results[entry["item"].id] = self._map_entry(entry, library)
+            report[bucket] = (len(entries) - len(unresolved), time.perf_counter() - start)
+            entries = [e for e in entries if id(e) in unresolved]
+        return results, report
+
+    def get_id(self, item, library):
+        results, _ = self.get_ids([item], library)
+        return results[item.id]
 
         #item_type = guid.scheme.split(".")[-1]
         #check_id = guid.netloc
@@ -1,10 +1,11 @@
 import base64
 import os, plexapi, requests, embyapi
 import re
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from embyapi import ApiClient
 from embyapi import Configuration
-from embyapi.rest import ApiException
+from embyapi.rest import ApiException, RESTClientObject
 from modules import builder, util
 from modules.library import Library
 from modules.util import Failed, ImageData
@@ -121,6 +122,69 @@ modifier_translation = {
     "": "", ".not": "!", ".is": "%3D", ".isnot": "!%3D", ".gt": "%3E%3E", ".gte": "%3E", ".lt": "%3C%3C", ".lte": "%3C",
     ".before": "%3C%3C", ".after": "%3E%3E", ".begins": "%3C", ".ends": "%3E"
 }
+field_profiles = {
+    "mapping": ["ProviderIds"],
+    "assets": ["Path", "ImageTags"],
+    "operations": ["Path", "ImageTags", "ProviderIds"],
+    "collections": ["ChildCount"],
+    "genres": ["Genres"],
+    "filtering": ["Path"],
+    "details": [
+        "Budget", "CanDelete", "Chapters", "ChildCount", "DateCreated", "DisplayOrder", "ExternalUrls", "ForcedSortName", "Genres",
+        "HomePageUrl", "IndexOptions", "MediaStreams", "OfficialRating", "Overview", "ParentId", "Path", "People", "ProviderIds",
+        "PrimaryImageAspectRatio", "Revenue", "SortName", "Studios", "Taglines"
+    ]
+}
+filter_fields = {
+    "summary": ["Overview"],
+    "studio": ["Studios"],
+    "record_label": ["Studios"],
+    "network": ["Studios"],
+    "filepath": ["Path"],
+    "audio_track_title": ["MediaStreams"],
+    "audio_language": ["MediaStreams"],
+    "subtitle_language": ["MediaStreams"],
+    "resolution": ["MediaStreams"],
+    "has_dolby_vision": ["MediaStreams"],
+    "actor": ["People"],
+    "director": ["People"],
+    "producer": ["People"],
+    "writer": ["People"],
+    "genre": ["Genres"],
+    "label": ["Tags"],
+    "has_overlay": ["Tags"],
+    "content_rating": ["OfficialRating"],
+    "year": ["ProductionYear"],
+    "country": ["ProductionLocations"],
+    "audience_rating": ["CommunityRating"],
+    "critic_rating": ["CriticRating"],
+    "release": ["PremiereDate"],
+    "history": ["PremiereDate"],
+    "added": ["DateCreated"],
+    "duration": ["RunTimeTicks"]
+}
+fetch_chunk_size = 100
+search_params = {
+    "genre": "genres",
+    "label": "tags",
+    "studio": "studios",
+    "network": "studios",
+    "content_rating": "official_ratings",
+    "year": "years"
+}
+search_attribute_alias = {"rating": "critic_rating"}
+search_tag_attributes = ["genre", "label", "studio", "network", "content_rating", "year"]
+search_multi_attributes = ["genre", "label", "studio", "network"]
+search_string_attributes = ["title", "summary"]
+search_number_attributes = ["year", "critic_rating", "audience_rating", "user_rating", "plays", "duration"]
+search_date_attributes = ["release", "added", "last_played"]
+search_boolean_attributes = ["unplayed"]
+search_options = ["sort_by", "limit", "type", "validate"]
+search_sorts = {
+    "title": "SortName", "year": "ProductionYear", "release": "PremiereDate", "critic_rating": "CriticRating",
+    "audience_rating": "CommunityRating", "added": "DateCreated", "plays": "PlayCount", "last_played": "DatePlayed",
+    "duration": "Runtime", "random": "Random"
+}
 album_sorting_options = {"default": -1, "newest": 0, "oldest": 1, "name": 2}
 episode_sorting_options = {"default": -1, "oldest": 0, "newest": 1}
 keep_episodes_options = {"all": 0, "5_latest": 5, "3_latest": 3, "latest": 1, "past_3": -3, "past_7": -7, "past_30": -30}
@@ -392,9 +456,39 @@ sort_types = {
 LOG_DIR = "logs"
 DEBUG_LOG = "debug.log"
 
+emby_pools = {}
+emby_clients = {}
+emby_admin_clients = {}
+
+class EmbyClient(ApiClient):
+    def __init__(self, configuration, rest_client=None, timeout=None):
+        super().__init__(configuration)
+        if rest_client:
+            self.rest_client = rest_client
+        self.timeout = timeout
+
+    def request(self, method, url, query_params=None, headers=None, post_params=None, body=None, _preload_content=True, _request_timeout=None):
+        return super().request(method, url, query_params=query_params, headers=headers, post_params=post_params, body=body,
+                               _preload_content=_preload_content, _request_timeout=_request_timeout if _request_timeout else self.timeout)
+
+def get_client(configuration, params):
+    timeout = (params["connect_timeout"], params["read_timeout"])
+    client_key = (configuration.host, configuration.api_key["api_key"], params["keep_alive"], timeout)
+    if client_key not in emby_clients:
+        configuration.connection_pool_maxsize = params["pool_maxsize"]
+        pool_key = (configuration.host, params["pool_maxsize"])
+        if pool_key not in emby_pools:
+            emby_pools[pool_key] = RESTClientObject(configuration)
+        client = EmbyClient(configuration, rest_client=emby_pools[pool_key], timeout=timeout)
+        if not params["keep_alive"]:
+            client.set_default_header("Connection", "close")
+        emby_clients[client_key] = client
+    return emby_clients[client_key]
+
 class Emby(Library):
     def __init__(self, config, params):
         super().__init__(config, params)
+        self._services = {}
         self.configuration = embyapi.Configuration()
         self.configuration.host = params["emby"]["url"]
         self.configuration.api_key['api_key'] = params["emby"]["api_key"]
@@ -403,6 +497,7 @@ class Emby(Library):
         self.configuration.access_token = None
         if params["emby"]["password"] != None:
             self.configuration.password = params["emby"]["password"]
+        self.page_size = params["emby"]["page_size"]
         #self.configuration.debug = True
         #self.log_dir = os.path.join('/workspaces/Emby-Meta-Manager/config', LOG_DIR)
         
@@ -412,7 +507,7 @@ class Emby(Library):
         logger.secret(self.configuration.host)
         logger.secret(self.configuration.api_key['api_key'])
         try:
-            self.EmbyServer = ApiClient(self.configuration)
+            self.EmbyServer = get_client(self.configuration, params["emby"])
         except Unauthorized:
             raise Failed("Emby Error: Emby API Key is invalid")
         except ValueError as e:
@@ -423,7 +518,7 @@ class Emby(Library):
         self.Emby = None
         self.library_id = None
         library_names = []
-        library_results = embyapi.LibraryServiceApi(self.EmbyServer).get_library_mediafolders()
+        library_results = self.service(embyapi.LibraryServiceApi).get_library_mediafolders()
         for s in library_results.items:
             library_names.append(s.name)
             if s.name.strip() == params["name"].strip():
@@ -438,26 +533,30 @@ class Emby(Library):
             raise Failed(f"Emby Error: Emby Library must be a Movies or TV Shows library")
 
         self.user_id = None
-        users = embyapi.UserServiceApi(self.EmbyServer).get_users_public()
+        users = self.service(embyapi.UserServiceApi).get_users_public()
         for user in users:
             if user.name == self.configuration.user_name: 
                 self.user_id = user.id
                 break
         
-        if self.configuration.password:
+        admin_key = (params["emby"]["url"], self.configuration.user_name)
+        if self.configuration.password and admin_key in emby_admin_clients:
+            self.EmbyAdminServer = emby_admin_clients[admin_key]
+        elif self.configuration.password:
             self.adminConfiguration = embyapi.Configuration()
             body = {
                  "Username": f"{self.configuration.user_name}",
                  "Pw": f"{self.configuration.password}"
             }
             x_emby_authorization = f"Emby UserId={self.user_id},Client=Emby-Meta-Manager,Device=Swagger-Codegen,DeviceId=123456,Version=1.1.0"
-            userAuth = embyapi.UserServiceApi(self.EmbyServer).post_users_authenticatebyname(body, x_emby_authorization)
+            userAuth = self.service(embyapi.UserServiceApi).post_users_authenticatebyname(body, x_emby_authorization)
             self.adminConfiguration.access_token = userAuth.access_token
 
             self.adminConfiguration.host = params["emby"]["url"]
             self.adminConfiguration.api_key['api_key'] = self.adminConfiguration.access_token
             try:
-                self.EmbyAdminServer = ApiClient(self.adminConfiguration)
+                self.EmbyAdminServer = get_client(self.adminConfiguration, params["emby"])
+                emby_admin_clients[admin_key] = self.EmbyAdminServer
             except Unauthorized:
                 raise Failed("Emby Error: Emby API Key is invalid")
             except ValueError as e:
@@ -468,6 +567,8 @@ class Emby(Library):
 
         self._users = users
         self._all_items = []
+        self._all_fields = set()
+        self._all_by_id = {}
         self.is_movie = self.type == "Movies"
         self.is_show = self.type == "Tvshows"
         self.item_types = None
@@ -482,7 +583,6 @@ class Emby(Library):
         #if not self.is_music and self.update_blank_track_titles:
         #    self.update_blank_track_titles = False
         #    logger.error(f"update_blank_track_titles library operation only works with music libraries")
-        self.fields = 'Budget,CanDelete,Chapters,ChildCount,DateCreated,DisplayOrder,ExternalUrls,ForcedSortName,Genres,HomePageUrl,IndexOptions,MediaStreams,OfficialRating,Overview,ParentId,Path,People,ProviderIds,PrimaryImageAspectRatio,Revenue,SortName,Studios,Taglines'
 
         if self.tmdb_collections and self.is_show:
             self.tmdb_collections = None
@@ -496,9 +596,23 @@ class Emby(Library):
         self.PlexServer.settings.get('cinemaTrailersPrerollID').set(preroll)
         self.PlexServer.settings.save()
 
+    def service(self, api, admin=False):
+        if (api, admin) not in self._services:
+            self._services[(api, admin)] = api(self.EmbyAdminServer if admin else self.EmbyServer)
+        return self._services[(api, admin)]
+
+    def get_fields(self, profile, filters=None):
+        fields = list(field_profiles[profile])
+        if filters:
+            for filter_method, _ in filters:
+                filter_attr = filter_method.split(".")[0]
+                if filter_attr in filter_fields:
+                    fields.extend([f for f in filter_fields[filter_attr] if f not in fields])
+        return ",".join(fields)
+
     def get_all_collections(self):
-        fields = 'ChildCount'
-        collections = embyapi.ItemsServiceApi(self.EmbyServer).get_users_by_userid_items(user_id=self.user_id,
+        fields = self.get_fields("collections")
+        collections = self.service(embyapi.ItemsServiceApi).get_users_by_userid_items(user_id=self.user_id,
                     parent_id=self.library_id, recursive=True, include_item_types='BoxSet', fields=fields)
         collections = collections.items
         return collections
@@ -510,14 +624,41 @@ class Emby(Library):
     @retry(stop_max_attempt_number=6, wait_fixed=10000, retry_on_exception=util.retry_if_not_plex)
     def fetch_item(self, data):
         results = []
-        results = embyapi.UserLibraryServiceApi(self.EmbyServer).get_users_by_userid_items_by_id(user_id=self.user_id,
+        results = self.service(embyapi.UserLibraryServiceApi).get_users_by_userid_items_by_id(user_id=self.user_id,
             id=data)
         return results
 
+    @retry(stop_max_attempt_number=6, wait_fixed=10000, retry_on_exception=util.retry_if_not_plex)
+    def get_items_by_ids(self, ids, fields):
+        return self.service(embyapi.ItemsServiceApi).get_users_by_userid_items(user_id=self.user_id,
+            ids=",".join(ids), fields=fields)
+
+    def fetch_items(self, ids, profile="filtering", filters=None):
+        fields = self.get_fields(profile, filters=filters)
+        requested = set(fields.split(",")) if fields else set()
+        found = {}
+        missing = []
+        for item_id in dict.fromkeys(str(i) for i in ids):
+            if item_id in self._all_by_id and requested <= self._all_fields:
+                found[item_id] = self._all_by_id[item_id]
+            else:
+                missing.append(item_id)
+        reused = len(found)
+        for start in range(0, len(missing), fetch_chunk_size):
+            try:
+                results = self.get_items_by_ids(missing[start:start + fetch_chunk_size], fields)
+            except ApiException as e:
+                logger.stacktrace()
+                raise Failed(f"Items Failed to Load: {e}")
+            for item in results.items:
+                found[item.id] = item
+        logger.debug(f"Loaded {len(found)} Items: {reused} Reused, {len(missing)} Requested")
+        return found
+
     def get_all_favorites(self):
-        fields = self.fields
+        fields = self.get_fields("details")
         results = []
-        results = embyapi.ItemsServiceApi(self.EmbyServer).get_users_by_userid_items(user_id=self.user_id,
+        results = self.service(embyapi.ItemsServiceApi).get_users_by_userid_items(user_id=self.user_id,
                 filters='IsFavorite', recursive=True, fields=fields)
         return results
 
@@ -531,7 +672,7 @@ class Emby(Library):
 
     def favorite_item(self, item):
         if item is not None:
-            response = embyapi.UserLibraryServiceApi(self.EmbyServer).post_users_by_userid_favoriteitems_by_id(user_id=self.user_id, 
+            response = self.service(embyapi.UserLibraryServiceApi).post_users_by_userid_favoriteitems_by_id(user_id=self.user_id, 
                                                                                                                id=item.id)
         else:
             return None
@@ -541,15 +682,15 @@ class Emby(Library):
         if collection_items:
             #if collection_items is true - favorite all items - then collection itself.
             for item in collection_items:
-               embyapi.UserLibraryServiceApi(self.EmbyServer).post_users_by_userid_favoriteitems_by_id(user_id=self.user_id, id=item.id)
-        embyapi.UserLibraryServiceApi(self.EmbyServer).post_users_by_userid_favoriteitems_by_id(user_id=self.user_id, id=collection_id)
+               self.service(embyapi.UserLibraryServiceApi).post_users_by_userid_favoriteitems_by_id(user_id=self.user_id, id=item.id)
+        self.service(embyapi.UserLibraryServiceApi).post_users_by_userid_favoriteitems_by_id(user_id=self.user_id, id=collection_id)
 
     def update_user_rating(self, id, updates=None):
         #TODO: This doesn't seem to stick - opened message on Emby dev forums.
         #https://emby.media/community/index.php?/topic/108429-setting-items-user_data-attributes/
         #/Users/{UserId}/Items/{ItemId}/UserData - but this does not work either.
         try:
-            response = embyapi.UserLibraryServiceApi(self.EmbyServer).post_users_by_userid_items_by_id_rating(user_id=self.user_id, id=id, likes=True)
+            response = self.service(embyapi.UserLibraryServiceApi).post_users_by_userid_items_by_id_rating(user_id=self.user_id, id=id, likes=True)
         except ApiException as ae:
             logger.error(ae)
         return response
@@ -560,7 +701,7 @@ class Emby(Library):
         # Build a new BaseItemDTO object and insert itemDict values into said object if values are not null.
         # Post newItem object with all existing data + new data.
         
-        response = embyapi.ItemUpdateServiceApi(self.EmbyServer).post_items_by_itemid(body, id)
+        response = self.service(embyapi.ItemUpdateServiceApi).post_items_by_itemid(body, id)
         #print(response)
         #itemResults = embyapi.UserLibraryServiceApi(self.EmbyAdminServer).get_users_by_userid_items_by_id(self.user_id, id)
         #itemDict = itemResults.to_dict()
@@ -572,25 +713,57 @@ class Emby(Library):
         #        setattr(newItem, item, itemDict[item])
         #embyapi.ItemUpdateServiceApi(self.EmbyAdminServer).post_items_by_itemid(newItem, id)
 
-    def get_all(self, collection_level=None, load=False, mapping=False):
-        results = []
-        if load and collection_level in [None, "Tvshows", "artist", "Movies", "movie"]:
-            self._all_items = []
-        if self._all_items and collection_level in [None, "Tvshows", "artist", "Movies", "movie"]:
-            return self._all_items
-        collection_type = collection_level if collection_level else self.type
+    @retry(stop_max_attempt_number=6, wait_fixed=10000, retry_on_exception=util.retry_if_not_plex)
+    def get_page(self, fields, start_index):
+        return self.service(embyapi.ItemsServiceApi, admin=True).get_users_by_userid_items(user_id=self.user_id,
+                    parent_id=self.library_id, recursive=True, include_item_types=self.item_types, fields=fields,
+                    sort_by="SortName,Id", sort_order="Ascending", start_index=start_index, limit=self.page_size)
+
+    def get_all_pages(self, collection_level=None, profile="mapping", filters=None):
         if not collection_level:
             collection_level = self.type
         logger.info(f"Loading All {collection_level.capitalize()} from Library: {self.name}")
-        #Only grab necessary fields when grabbing all items to map_guids
-        if mapping:
-            fields = 'ProviderIds'
-        else:
-            fields = 'ProviderIds'
-        results = embyapi.ItemsServiceApi(self.EmbyAdminServer).get_users_by_userid_items(user_id=self.user_id,
-                    parent_id=self.library_id, recursive=True, include_item_types=self.item_types, fields=fields)
-        logger.info(f"Loaded {len(results.items)} {collection_level.capitalize()}")
-        self._all_items = results
+        fields = self.get_fields(profile, filters=filters)
+        loaded = 0
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self.get_page, fields, 0)
+            while future:
+                results = future.result()
+                loaded += len(results.items)
+                if results.total_record_count is None:
+                    results.total_record_count = loaded if len(results.items) < self.page_size else loaded + self.page_size
+                future = executor.submit(self.get_page, fields, loaded) if results.items and loaded < results.total_record_count else None
+                yield results
+        logger.info(f"Loaded {loaded} {collection_level.capitalize()}")
+
+    def iter_all(self, collection_level=None, profile="mapping"):
+        i = 0
+        for page in self.get_all_pages(collection_level=collection_level, profile=profile):
+            for item in page.items:
+                i += 1
+                yield i, page.total_record_count, item
+
+    def get_all(self, collection_level=None, load=False, profile="mapping", filters=None):
+        fields = self.get_fields(profile, filters=filters)
+        requested = set(fields.split(",")) if fields else set()
+        library_level = collection_level in [None, "Tvshows", "artist", "Movies", "movie"]
+        if load and library_level:
+            self._all_items = []
+            self._all_by_id = {}
+        if self._all_items and library_level and requested <= self._all_fields:
+            return self._all_items
+        results = None
+        items = []
+        for page in self.get_all_pages(collection_level=collection_level, profile=profile, filters=filters):
+            if results is None:
+                results = page
+            items.extend(page.items)
+            logger.ghost(f"Loaded: {len(items)}/{page.total_record_count}")
+        results.items = items
+        if library_level:
+            self._all_items = results
+            self._all_fields = requested
+            self._all_by_id = {item.id: item for item in items}
         return results
 
     def upload_theme(self, collection, url=None, filepath=None):
@@ -606,9 +779,9 @@ class Emby(Library):
             id_string = ''
             for i in items:
                 id_string += i.id + ','
-            return embyapi.PlaylistServiceApi(self.EmbyServer).post_playlists(name=name, ids=id_string)
+            return self.service(embyapi.PlaylistServiceApi).post_playlists(name=name, ids=id_string)
         elif isinstance(items, int):
-            return embyapi.PlaylistServiceApi(self.EmbyServer).post_playlists(name=name, ids=items)
+            return self.service(embyapi.PlaylistServiceApi).post_playlists(name=name, ids=items)
 
     @retry(stop_max_attempt_number=6, wait_fixed=10000, retry_on_exception=util.retry_if_not_plex)
     def fetchItems(self, key, container_start, container_size):
@@ -646,7 +819,7 @@ class Emby(Library):
     @retry(stop_max_attempt_number=6, wait_fixed=10000, retry_on_exception=util.retry_if_not_plex)
     def reload(self, item):
         try:
-            results = embyapi.UserLibraryServiceApi(self.EmbyServer).get_users_by_userid_items_by_id(self.user_id, item.id)
+            results = self.service(embyapi.UserLibraryServiceApi).get_users_by_userid_items_by_id(self.user_id, item.id)
             return results
         except ApiException as e:
             logger.stacktrace()
@@ -665,24 +838,24 @@ class Emby(Library):
         try:
             if image.is_poster and image.is_url:
                 type_ = 'Primary'
-                embyapi.RemoteImageServiceApi(self.EmbyServer).post_items_by_id_remoteimages_download(
+                self.service(embyapi.RemoteImageServiceApi).post_items_by_id_remoteimages_download(
                     id=item.id, type=type_, image_url=image.location
                 )
             elif image.is_poster:
                 type_ = 'Primary'
                 with open(image.location, "rb") as image_:
                     b64string = str(base64.b64encode(image_.read())).strip("b'").rstrip("'")
-                embyapi.ImageServiceApi(self.EmbyServer).post_items_by_id_images_by_type(b64string, item.id, type_)
+                self.service(embyapi.ImageServiceApi).post_items_by_id_images_by_type(b64string, item.id, type_)
             elif image.is_url:
                 type_ = 'Backdrop'
-                embyapi.RemoteImageServiceApi(self.EmbyServer).post_items_by_id_remoteimages_download(
+                self.service(embyapi.RemoteImageServiceApi).post_items_by_id_remoteimages_download(
                     id=item.id, type=type_, image_url=image.location
                 )
             else:
                 type_ = 'Backdrop'
                 with open(image.location, "rb") as image_:
                     b64string = str(base64.b64encode(image_.read())).strip("b'").rstrip("'")
-                embyapi.ImageServiceApi(self.EmbyServer).post_items_by_id_images_by_type(b64string, item.id, type_)
+                self.service(embyapi.ImageServiceApi).post_items_by_id_images_by_type(b64string, item.id, type_)
         except BadRequest as e:
             item.refresh()
             raise Failed(e)
@@ -702,9 +875,9 @@ class Emby(Library):
             use_title = title and final_search not in ["contentRating", "audioLanguage", "subtitleLanguage", "resolution"]
             resultsList = None
             if final_search == 'genre':
-                fields = 'Genres'
+                fields = self.get_fields("genres")
                 genres = re.sub(',', '|', data)
-                resultsList = embyapi.ItemsServiceApi(self.EmbyServer).get_users_by_userid_items(user_id=self.user_id,
+                resultsList = self.service(embyapi.ItemsServiceApi).get_users_by_userid_items(user_id=self.user_id,
                             parent_id=self.library_id, recursive=True, include_item_types=self.item_types, genres=genres, fields=fields)
                 return resultsList.items
             for choice in self.Plex.listFilterChoices(final_search):
@@ -747,13 +920,13 @@ class Emby(Library):
             id_string = ''
             for i in item:
                 id_string += i.id + ','
-            embyapi.CollectionServiceApi(self.EmbyServer).post_collections(name=collection, ids=id_string)
+            self.service(embyapi.CollectionServiceApi).post_collections(name=collection, ids=id_string)
         elif isinstance(item, int):
-            embyapi.CollectionServiceApi(self.EmbyServer).post_collections(name=collection, ids=item)
+            self.service(embyapi.CollectionServiceApi).post_collections(name=collection, ids=item)
 
     def delete_collection(self, collection):
         try:
-            embyapi.LibraryServiceApi(self.EmbyAdminServer).delete_items_by_id(collection.id)
+            self.service(embyapi.LibraryServiceApi, admin=True).delete_items_by_id(collection.id)
         except ApiException as e:
             logger.error("Error while deleting collection %s", e)
             
@@ -765,13 +938,13 @@ class Emby(Library):
                 id_string += i.id + ','
             if not add:
                 try:
-                    embyapi.CollectionServiceApi(self.EmbyServer).delete_collections_by_id_items(id=collection_id, ids=id_string)
+                    self.service(embyapi.CollectionServiceApi).delete_collections_by_id_items(id=collection_id, ids=id_string)
                     return len(item)
                 except ApiException as e:
                     logger.error("Error removing item from collection %s", e)
             else:
                 try:
-                    embyapi.CollectionServiceApi(self.EmbyServer).post_collections_by_id_items(id=collection_id, ids=id_string)
+                    self.service(embyapi.CollectionServiceApi).post_collections_by_id_items(id=collection_id, ids=id_string)
                 except ApiException as e:
                     logger.error("Error adding item to collection %s", e)
         if isinstance(item, int):
@@ -788,9 +961,7 @@ class Emby(Library):
 
     def test_smart_filter(self, uri_args):
         logger.debug(f"Smart Collection Test: {uri_args}")
-        test_items = self.get_filter_items(uri_args)
-        if len(test_items) < 1:
-            raise Failed(f"Plex Error: No items for smart filter: {uri_args}")
+        raise Failed("Emby Error: Smart Collections are not supported by Emby")
 
     def create_smart_collection(self, title, smart_type, uri_args):
         self.test_smart_filter(uri_args)
@@ -866,7 +1037,7 @@ class Emby(Library):
 
     def get_episode(self, item, season=None, episode=None):
         if season and episode:
-            results = embyapi.TvShowsServiceApi(self.EmbyServer).get_shows_by_id_episodes(user_id=self.user_id,
+            results = self.service(embyapi.TvShowsServiceApi).get_shows_by_id_episodes(user_id=self.user_id,
                     id=item.id, season=season, min_index_number=episode, limit=1)
             if (results != None):
                 if len(results.items) > 0:
@@ -961,9 +1132,6 @@ class Emby(Library):
                     items.append(item.episode(season=1, episode=1))
                 except NotFound:
                     logger.warning(f"Plex Warning: {item.title} has no Season 1 Episode 1 ")
-        elif method == "plex_search":
-            logger.info(data[1])
-            items = self.get_filter_items(data[2])
         elif method == "plex_collectionless":
             good_collections = []
             logger.info(f"Processing Plex Collectionless")
@@ -1030,12 +1198,12 @@ class Emby(Library):
 
     def get_collection_id_and_items(self, collection, smart_label_collection):
         if collection:
-            collections = embyapi.ItemsServiceApi(self.EmbyServer).get_users_by_userid_items(user_id=self.user_id,
+            collections = self.service(embyapi.ItemsServiceApi).get_users_by_userid_items(user_id=self.user_id,
                 recursive=True, search_term=collection, include_item_types='boxset')
             for c in collections.items:
                 if c.name == collection:
                     collection_id = c.id
-                    results = embyapi.ItemsServiceApi(self.EmbyServer).get_users_by_userid_items(user_id=self.user_id,
+                    results = self.service(embyapi.ItemsServiceApi).get_users_by_userid_items(user_id=self.user_id,
                         parent_id=collection_id)
                     return collection_id, results.items
             else:
@@ -1050,7 +1218,7 @@ class Emby(Library):
 
     def get_collection_id(self, collection):
         if collection:
-            collections = embyapi.ItemsServiceApi(self.EmbyServer).get_users_by_userid_items(user_id=self.user_id,
+            collections = self.service(embyapi.ItemsServiceApi).get_users_by_userid_items(user_id=self.user_id,
                 recursive=True, search_term=collection, include_item_types='boxset')
             for c in collections.items:
                 if c.name == collection:
@@ -1060,53 +1228,184 @@ class Emby(Library):
             raise Failed("Emby Error: Unable to find Collection ID")
 
 
+    def build_search(self, data):
+        data_alias = {str(k).lower(): k for k in data}
+        if "any" in data_alias and "all" in data_alias:
+            raise Failed("Emby Error: Cannot have more then one base")
+        base_all = "any" not in data_alias
+        if "all" in data_alias or "any" in data_alias:
+            base = data[data_alias["all" if base_all else "any"]]
+            if not isinstance(base, dict):
+                raise Failed(f"Emby Error: {'all' if base_all else 'any'} must be a dictionary: {base}")
+        else:
+            base = {k: v for k, v in data.items() if str(k).lower() not in search_options}
+
+        predicates = []
+        for key, value in base.items():
+            attr, _, modifier = str(key).lower().partition(".")
+            attr = search_attribute_alias[attr] if attr in search_attribute_alias else attr
+            modifier = f".{modifier}" if modifier else ""
+            if value is None:
+                raise Failed(f"Emby Error: {key} emby_search attribute is blank")
+            if attr in search_boolean_attributes and modifier == "":
+                filter_data = util.parse("Emby", key, value, datatype="bool")
+            elif attr in search_date_attributes and modifier in ["", ".not"]:
+                filter_data = util.parse("Emby", key, value, datatype="int", minimum=1)
+            elif attr in search_date_attributes and modifier in [".before", ".after"]:
+                filter_data = util.validate_date(value, key)
+            elif attr in search_number_attributes and modifier in [".gt", ".gte", ".lt", ".lte"]:
+                filter_data = util.parse("Emby", key, value, datatype="float", minimum=0)
+            elif attr == "year" and modifier in ["", ".not"]:
+                filter_data = [util.parse("Emby", key, y, datatype="int") for y in util.get_list(value)]
+            elif (attr in search_tag_attributes and modifier in ["", ".not"]) \
+                    or (attr in search_string_attributes and modifier in ["", ".not", ".is", ".isnot", ".begins", ".ends", ".regex"]):
+                filter_data = util.get_list(value)
+            elif attr == "collection" and modifier == "":
+                filter_data = util.get_list(value)
+            else:
+                raise Failed(f"Emby Error: {key} is not a supported emby_search attribute")
+            predicates.append((attr, modifier, f"{attr}{modifier}", filter_data))
+        if not predicates:
+            raise Failed("Emby Error: No Filter Created")
+
+        params = {}
+        local = []
+        pushdown = base_all or len(predicates) == 1
+        for attr, modifier, final, filter_data in predicates:
+            exact = False
+            if not pushdown:
+                pass
+            elif attr in search_params and modifier == "" and search_params[attr] not in params:
+                params[search_params[attr]] = ("," if attr == "year" else "|").join([str(d) for d in filter_data])
+                exact = len(filter_data) == 1 or attr not in search_multi_attributes
+            elif attr == "audience_rating" and modifier == ".gte" and "min_community_rating" not in params:
+                params["min_community_rating"] = filter_data
+                exact = True
+            elif attr == "critic_rating" and modifier == ".gte" and "min_critic_rating" not in params:
+                params["min_critic_rating"] = filter_data * 10 if filter_data <= 10 else filter_data
+            elif attr == "release" and modifier == "" and "min_premiere_date" not in params:
+                params["min_premiere_date"] = (datetime.now(timezone.utc) - timedelta(days=filter_data)).strftime("%Y-%m-%d")
+            elif attr == "release" and modifier == ".after" and "min_premiere_date" not in params:
+                params["min_premiere_date"] = filter_data
+            elif attr == "release" and modifier == ".before" and "max_premiere_date" not in params:
+                params["max_premiere_date"] = filter_data
+            elif attr == "unplayed" and "is_played" not in params:
+                params["is_played"] = not filter_data
+                exact = True
+            elif attr == "collection" and len(filter_data) == 1 and "parent_id" not in params:
+                collection_id = self.get_collection_id(filter_data[0])
+                if not collection_id:
+                    raise Failed(f"Emby Error: Collection: {filter_data[0]} not found")
+                params["parent_id"] = collection_id
+                params["include_item_types"] = None
+                exact = True
+            if not exact and attr == "collection":
+                raise Failed("Emby Error: collection can only search one collection and cannot be combined with any")
+            elif not exact:
+                local.append((attr, modifier, final, filter_data))
+
+        if "sort_by" in data_alias and data[data_alias["sort_by"]]:
+            sort_attr, _, sort_order = str(data[data_alias["sort_by"]]).lower().partition(".")
+            if sort_attr not in search_sorts or sort_order not in ["", "asc", "desc"]:
+                raise Failed(f"Emby Error: sort_by: {data[data_alias['sort_by']]} is invalid")
+            params["sort_by"] = search_sorts[sort_attr] if sort_attr == "random" else f"{search_sorts[sort_attr]},Id"
+            params["sort_order"] = "Descending" if sort_order == "desc" else "Ascending"
+        else:
+            params["sort_by"] = "SortName,Id"
+            params["sort_order"] = "Ascending"
+
+        limit = None
+        if "limit" in data_alias and str(data[data_alias["limit"]]).lower() != "all":
+            limit = util.parse("Emby", "limit", data[data_alias["limit"]], datatype="int", minimum=1)
+        return params, local, base_all, limit
+
+    def check_search(self, item, local, base_all):
+        if not local:
+            return True
+        current_time = datetime.now(timezone.utc)
+        user_data = item.user_data
+        for attr, modifier, final, filter_data in local:
+            if attr in search_tag_attributes and modifier in ["", ".not"]:
+                if attr == "genre":
+                    values = item.genres or []
+                elif attr == "label":
+                    values = item.tags or []
+                elif attr in ["studio", "network"]:
+                    values = [s.name for s in item.studios] if item.studios else []
+                elif attr == "content_rating":
+                    values = [item.official_rating]
+                else:
+                    values = [item.production_year]
+                if modifier == ".not":
+                    failed = any(d in values for d in filter_data)
+                elif base_all and attr in search_multi_attributes:
+                    failed = not all(d in values for d in filter_data)
+                else:
+                    failed = not any(d in values for d in filter_data)
+            elif attr in search_string_attributes:
+                failed = util.is_string_filter([item.name if attr == "title" else item.overview or ""], modifier, filter_data)
+            elif attr in search_number_attributes:
+                if attr == "year":
+                    value = item.production_year
+                elif attr == "critic_rating":
+                    value = item.critic_rating / 10 if item.critic_rating is not None and item.critic_rating > 10 else item.critic_rating
+                elif attr == "audience_rating":
+                    value = item.community_rating
+                elif attr == "user_rating":
+                    value = user_data.rating if user_data else None
+                elif attr == "plays":
+                    value = user_data.play_count if user_data else None
+                else:
+                    value = item.run_time_ticks / 600000000 if item.run_time_ticks else None
+                failed = util.is_number_filter(value, modifier, filter_data)
+            elif attr in search_date_attributes:
+                if attr == "release":
+                    value = item.premiere_date
+                elif attr == "added":
+                    value = item.date_created
+                else:
+                    value = user_data.last_played_date if user_data else None
+                if value is not None and value.tzinfo is None:
+                    value = value.replace(tzinfo=timezone.utc)
+                if modifier in [".before", ".after"]:
+                    filter_date = datetime.fromisoformat(filter_data.replace("Z", "+00:00"))
+                    failed = value is None or (modifier == ".before" and value >= filter_date) or (modifier == ".after" and value <= filter_date)
+                else:
+                    failed = util.is_date_filter(value, modifier, filter_data, final, current_time)
+            else:
+                failed = util.is_boolean_filter(not user_data.played if user_data else True, filter_data)
+            if base_all and failed:
+                return False
+            elif not base_all and not failed:
+                return True
+        return base_all
+
+    @retry(stop_max_attempt_number=6, wait_fixed=10000, retry_on_exception=util.retry_if_not_plex)
+    def get_search_page(self, params, fields, start_index, limit):
+        params = {"parent_id": self.library_id, "include_item_types": self.item_types, **params}
+        return self.service(embyapi.ItemsServiceApi).get_users_by_userid_items(user_id=self.user_id,
+                    recursive=True, fields=fields, start_index=start_index, limit=limit, **params)
+
     def get_filter_items(self, data):
-        itemList = []
-        results = None
-        genresPulled = False
-        for key in data:
-            if key == 'all':
-                filters = list(data[key].items())
-                for f in filters:
-                    _filter = f[0]
-                    _value = f[1]
-                    if _filter.startswith('genre'):
-                        if _filter.find('.') != -1:
-                            fs = _filter.split('.')
-                            _filter = fs[0]
-                            _mod = fs[1]
-                        else:
-                            fields = 'Genres'
-                            genres = re.sub(',', '|', _value)
-                            #If genres contains a pipe, we have multiple genres and we need to search and
-                            #filter itemList down to only include movies with ALL supplied genres.
-                            #otherwise we will continue iterating through filters and "building" our URL.
-                            if genres.find('|') != -1:
-                                results.append(embyapi.ItemsServiceApi(self.EmbyServer).get_users_by_userid_items(user_id=self.user_id,
-                                    parent_id=self.library_id, recursive=True, include_item_types=self.item_types, genres=genres, fields=fields))
-                                #EmbyAPI returns movies with any of those genres - need to filter it down.
-                                for item in results.items:
-                                    if item.genres is not None:
-                                        split_genres = genres.split('|')
-                                        if all(x in item.genres for x in split_genres):
-                                            itemList.append(item)
-                                genresPulled = True
-                    elif _filter.startswith('rating'):
-                        if _filter.find('.') != -1:
-                            fs = _filter.split('.')
-                            _filter = fs[0]
-                            _mod = fs[1]
-                            if _mod == 'gte':
-                                min_critic_rating = _value
-                            elif _mod == 'lte':
-                                print("Not sure what next steps are.")
-                                
-
-                if genresPulled == False:
-                    print("Need to pull genres still.")
-            elif key == 'any':
-                filters = list(data[key].items())
-        return itemList
+        if not isinstance(data, dict):
+            raise Failed(f"Emby Error: Search must be an emby_search dictionary not a Plex search URI: {data}")
+        params, local, base_all, limit = self.build_search(data)
+        fields = self.get_fields("filtering", filters=[(final, filter_data) for _, _, final, filter_data in local])
+        logger.debug(f"Emby Search Query: {params}")
+        if local:
+            logger.debug(f"Emby Search Local Filters: {[final for _, _, final, _ in local]}")
+        items = []
+        scanned = 0
+        while True:
+            page_limit = min(self.page_size, limit - len(items)) if limit and not local else self.page_size
+            results = self.get_search_page(params, fields, scanned, page_limit)
+            scanned += len(results.items)
+            items.extend([item for item in results.items if self.check_search(item, local, base_all)])
+            if (limit and len(items) >= limit) or not results.items or len(results.items) < page_limit \
+                    or (results.total_record_count is not None and scanned >= results.total_record_count):
+                break
+        logger.debug(f"Emby Search: {scanned} Items Scanned, {len(items)} Matched")
+        return items[:limit] if limit else items
 
     def get_tmdb_from_map(self, item):
         return self.movie_rating_key_map[item.id] if item.id in self.movie_rating_key_map else None
@@ -1123,14 +1422,14 @@ class Emby(Library):
         results = []
         if libtype == 'collection':
             if title:
-                results = embyapi.ItemsServiceApi(self.EmbyServer).get_users_by_userid_items(user_id=self.user_id,
+                results = self.service(embyapi.ItemsServiceApi).get_users_by_userid_items(user_id=self.user_id,
                     recursive=True, search_term=title, include_item_types='boxset')
         elif libtype == 'Movies' or libtype == None:
             if title and not year:
-                results = embyapi.ItemsServiceApi(self.EmbyServer).get_users_by_userid_items(user_id=self.user_id,
+                results = self.service(embyapi.ItemsServiceApi).get_users_by_userid_items(user_id=self.user_id,
                     recursive=True, search_term=title, include_item_types=self.item_types)
             if title and year:
-                results = embyapi.ItemsServiceApi(self.EmbyServer).get_users_by_userid_items(user_id=self.user_id,
+                results = self.service(embyapi.ItemsServiceApi).get_users_by_userid_items(user_id=self.user_id,
                     recursive=True, search_term=title, years=year, include_item_types=self.item_types)
         return results
 
@@ -1262,7 +1561,7 @@ class Emby(Library):
                 missing_episodes = ""
                 found_season = False
                 found_episode = False
-                seasons = embyapi.TvShowsServiceApi(self.EmbyServer).get_shows_by_id_seasons(user_id=self.user_id,
+                seasons = self.service(embyapi.TvShowsServiceApi).get_shows_by_id_seasons(user_id=self.user_id,
                     id=item.id)
 
                 for season in seasons.items:
@@ -1287,7 +1586,7 @@ class Emby(Library):
                             season_background = ImageData("asset_directory", os.path.abspath(matches[0]), prefix=f"{item.title} Season {season.index_number}'s ", is_poster=False, is_url=False)
                         if season_poster or season_background:
                             self.upload_images(season, poster=season_poster, background=season_background)
-                        episodes = embyapi.TvShowsServiceApi(self.EmbyServer).get_shows_by_id_episodes(user_id=self.user_id,
+                        episodes = self.service(embyapi.TvShowsServiceApi).get_shows_by_id_episodes(user_id=self.user_id,
                             id=item.id, season=season.index_number)
                         if episodes is not None:
                             for episode in episodes.items:
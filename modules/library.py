@@ -263,14 +263,23 @@ class Library(ABC):
         except yaml.scanner.ScannerError as e:
             logger.error(f"YAML Error: {util.tab_new_lines(e)}")
 
+    def get_all_pages(self, collection_level=None, profile=None, filters=None):
+        yield self.get_all(collection_level=collection_level)
+
     def map_guids(self):
-        items = self.get_all(mapping=True)
         logger.info(f"Mapping {self.type} Library: {self.name}")
         logger.info("")
-        for i, item in enumerate(items.items, 1):
-            logger.ghost(f"Processing: {i}/{len(items.items)} {item.name}")
-            if item.id not in self.movie_rating_key_map and item.id not in self.show_rating_key_map:
-                id_type, main_id, imdb_id = self.config.Convert.get_id(item, self)
+        processed = 0
+        report = {}
+        for page in self.get_all_pages(profile="mapping"):
+            processed += len(page.items)
+            if self.config.Cache:
+                cached = self.config.Cache.load_guid_maps([item.id for item in page.items])
+                logger.debug(f"Preloaded {cached} cached mappings")
+            to_map = [item for item in page.items if item.id not in self.movie_rating_key_map and item.id not in self.show_rating_key_map]
+            mapped, page_report = self.config.Convert.get_ids(to_map, self)
+            for item in to_map:
+                id_type, main_id, imdb_id = mapped[item.id]
                 if main_id:
                     if id_type == "movie":
                         self.movie_rating_key_map[item.id] = main_id[0]
@@ -280,9 +289,14 @@ class Library(ABC):
                         util.add_dict_list(main_id, int(item.id), self.show_map)
                 if imdb_id:
                     util.add_dict_list(imdb_id, item.id, self.imdb_map)
+            for bucket, (count, seconds) in page_report.items():
+                total_count, total_seconds = report[bucket] if bucket in report else (0, 0)
+                report[bucket] = (total_count + count, total_seconds + seconds)
+            logger.ghost(f"Mapped: {processed}/{page.total_record_count}")
         logger.info("")
-        logger.info(f"Processed {len(items.items)} {self.type}s")
-        return items
+        for bucket, (count, seconds) in report.items():
+            logger.info(f"{bucket.capitalize():<8} | {count:>6} {self.type}s | {seconds:.2f}s")
+        logger.info(f"Processed {processed} {self.type}s")
 
 
 #OLD CODE for config.Convert.get_id function
@@ -78,7 +78,7 @@ class Mdblist:
     def has_key(self):
         return self.apikey is not None
 
-    def _request(self, imdb_id=None, tmdb_id=None, is_movie=True, ignore_cache=False):
+    def _request(self, imdb_id=None, tmdb_id=None, is_movie=True, ignore_cache=False, refresh=False):
         params = {"apikey": self.apikey}
         if imdb_id:
             params["i"] = imdb_id
@@ -89,8 +89,8 @@ class Mdblist:
             key = f"{'tm' if is_movie else 'ts'}{tmdb_id}"
         else:
             raise Failed("MdbList Error: Either IMDb ID or TMDb ID and TMDb Type Required")
-        expired = None
-        if self.config.Cache and not ignore_cache:
+        expired = True if refresh else None
+        if self.config.Cache and not ignore_cache and not refresh:
             mdb_dict, expired = self.config.Cache.query_mdb(key, self.expiration)
             if mdb_dict and expired is False:
                 return MDbObj(mdb_dict)
@@ -116,6 +116,11 @@ class Mdblist:
     def get_movie(self, tmdb_id):
         return self._request(tmdb_id=tmdb_id, is_movie=True)
 
+    def refresh(self, key):
+        if key.startswith(("tm", "ts")):
+            return self._request(tmdb_id=key[2:], is_movie=key.startswith("tm"), refresh=True)
+        return self._request(imdb_id=key, refresh=True)
+
     def validate_mdblist_lists(self, error_type, mdb_lists):
         valid_lists = []
         for mdb_dict in util.get_list(mdb_lists, split=False):
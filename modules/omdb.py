@@ -50,9 +50,9 @@ class OMDb:
         logger.secret(self.apikey)
         self.get_omdb("tt0080684", ignore_cache=True)
 
-    def get_omdb(self, imdb_id, ignore_cache=False):
-        expired = None
-        if self.config.Cache and not ignore_cache:
+    def get_omdb(self, imdb_id, ignore_cache=False, refresh=False):
+        expired = True if refresh else None
+        if self.config.Cache and not ignore_cache and not refresh:
             omdb_dict, expired = self.config.Cache.query_omdb(imdb_id, self.expiration)
             if omdb_dict and expired is False:
                 return OMDbObj(imdb_id, omdb_dict)
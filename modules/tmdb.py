@@ -1,3 +1,5 @@
+import threading
+from collections import OrderedDict
 from modules import util
 from modules.util import Failed
 from tmdbapis import TMDbAPIs, TMDbException, NotFound
@@ -99,13 +101,14 @@ class TMDBObj:
 
 
 class TMDbMovie(TMDBObj):
-    def __init__(self, tmdb, tmdb_id, ignore_cache=False):
+    def __init__(self, tmdb, tmdb_id, ignore_cache=False, refresh=False):
         super().__init__(tmdb, tmdb_id, ignore_cache=ignore_cache)
-        expired = None
+        expired = True if refresh else None
         data = None
-        if self._tmdb.config.Cache and not ignore_cache:
+        if self._tmdb.config.Cache and not ignore_cache and not refresh:
             data, expired = self._tmdb.config.Cache.query_tmdb_movie(tmdb_id, self._tmdb.expiration)
         if expired or not data:
+            self._tmdb.limit.wait()
             data = self._tmdb.TMDb.movie(self.tmdb_id, partial="external_ids,keywords")
         super()._load(data)
 
@@ -120,13 +123,14 @@ class TMDbMovie(TMDBObj):
 
 
 class TMDbShow(TMDBObj):
-    def __init__(self, tmdb, tmdb_id, ignore_cache=False):
+    def __init__(self, tmdb, tmdb_id, ignore_cache=False, refresh=False):
         super().__init__(tmdb, tmdb_id, ignore_cache=ignore_cache)
-        expired = None
+        expired = True if refresh else None
         data = None
-        if self._tmdb.config.Cache and not ignore_cache:
+        if self._tmdb.config.Cache and not ignore_cache and not refresh:
             data, expired = self._tmdb.config.Cache.query_tmdb_show(tmdb_id, self._tmdb.expiration)
         if expired or not data:
+            self._tmdb.limit.wait()
             data = self._tmdb.TMDb.tv_show(self.tmdb_id, partial="external_ids,keywords")
         super()._load(data)
 
@@ -153,6 +157,12 @@ class TMDb:
         self.language = params["language"]
         self.region = None
         self.expiration = params["expiration"]
+        self.cache_size = params["cache_size"]
+        self.item_hits = 0
+        self.item_misses = 0
+        self._items = OrderedDict()
+        self._items_lock = threading.Lock()
+        self.limit = util.RateLimiter(40)
         logger.secret(self.apikey)
         try:
             self.TMDb = TMDbAPIs(self.apikey, language=self.language, session=self.config.session)
@@ -160,24 +170,41 @@ class TMDb:
             raise Failed(f"TMDb Error: {e}")
         self.iso_3166_1 = {iso: i.name for iso, i in self.TMDb._iso_3166_1.items()}
 
+    def _check_failed_conversion(self, id_type, _id, to_type):
+        if self.config.Cache:
+            error = self.config.Cache.query_failed_conversion(id_type, _id, to_type)
+            if error:
+                raise Failed(error)
+
+    def _failed_conversion(self, id_type, _id, to_type, error):
+        if self.config.Cache:
+            self.config.Cache.update_failed_conversion(id_type, _id, to_type, error)
+        raise Failed(error)
+
     def convert_from(self, tmdb_id, convert_to, is_movie):
+        id_type = "tmdb_movie" if is_movie else "tmdb_show"
+        self._check_failed_conversion(id_type, tmdb_id, convert_to)
         item = self.get_movie(tmdb_id) if is_movie else self.get_show(tmdb_id)
         check_id = item.tvdb_id if convert_to == "tvdb_id" and not is_movie else item.imdb_id
         if not check_id:
-            raise Failed(f"TMDb Error: No {convert_to.upper().replace('B_', 'b ')} found for TMDb ID {tmdb_id}")
+            self._failed_conversion(id_type, tmdb_id, convert_to, f"TMDb Error: No {convert_to.upper().replace('B_', 'b ')} found for TMDb ID {tmdb_id}")
         return check_id
 
     def convert_tvdb_to(self, tvdb_id):
+        self._check_failed_conversion("tvdb_id", tvdb_id, "tmdb_id")
         try:
+            self.limit.wait()
             results = self.TMDb.find_by_id(tvdb_id=tvdb_id)
             if results.tv_results:
                 return results.tv_results[0].id
         except NotFound:
             pass
-        raise Failed(f"TMDb Error: No TMDb ID found for TVDb ID {tvdb_id}")
+        self._failed_conversion("tvdb_id", tvdb_id, "tmdb_id", f"TMDb Error: No TMDb ID found for TVDb ID {tvdb_id}")
 
     def convert_imdb_to(self, imdb_id):
+        self._check_failed_conversion("imdb_id", imdb_id, "tmdb_id")
         try:
+            self.limit.wait()
             results = self.TMDb.find_by_id(imdb_id=imdb_id)
             if results.movie_results:
                 return results.movie_results[0].id, "movie"
@@ -188,7 +215,7 @@ class TMDb:
                 return f"{item.tv_id}_{item.season_number}_{item.episode_number}", "episode"
         except NotFound:
             pass
-        raise Failed(f"TMDb Error: No TMDb ID found for IMDb ID {imdb_id}")
+        self._failed_conversion("imdb_id", imdb_id, "tmdb_id", f"TMDb Error: No TMDb ID found for IMDb ID {imdb_id}")
 
     def get_movie_show_or_collection(self, tmdb_id, is_movie):
         if is_movie:
@@ -198,14 +225,36 @@ class TMDb:
                 except Failed:                  raise Failed(f"TMDb Error: No Movie or Collection found for TMDb ID {tmdb_id}")
         else:                           return self.get_show(tmdb_id)
 
+    def _cached_item(self, key, item_class, tmdb_id):
+        with self._items_lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.item_hits += 1
+                return self._items[key]
+            self.item_misses += 1
+        item = item_class(self, tmdb_id)
+        if self.cache_size > 0:
+            with self._items_lock:
+                self._items[key] = item
+                self._items.move_to_end(key)
+                while len(self._items) > self.cache_size:
+                    self._items.popitem(last=False)
+        return item
+
     def get_movie(self, tmdb_id):
-        try:                            return TMDbMovie(self, tmdb_id)
+        try:                            return self._cached_item(("movie", str(tmdb_id)), TMDbMovie, tmdb_id)
         except TMDbException as e:      raise Failed(f"TMDb Error: No Movie found for TMDb ID {tmdb_id}: {e}")
 
     def get_show(self, tmdb_id):
-        try:                            return TMDbShow(self, tmdb_id)
+        try:                            return self._cached_item(("show", str(tmdb_id)), TMDbShow, tmdb_id)
         except TMDbException as e:      raise Failed(f"TMDb Error: No Show found for TMDb ID {tmdb_id}: {e}")
 
+    def refresh_movie(self, tmdb_id):
+        return TMDbMovie(self, tmdb_id, refresh=True)
+
+    def refresh_show(self, tmdb_id):
+        return TMDbShow(self, tmdb_id, refresh=True)
+
     def get_collection(self, tmdb_id, partial=None):
         try:                            return self.TMDb.collection(tmdb_id, partial=partial)
         except TMDbException as e:      raise Failed(f"TMDb Error: No Collection found for TMDb ID {tmdb_id}: {e}")
@@ -1,5 +1,5 @@
 import base64
-import contextlib, glob, logging, os, re, requests, signal, sys, time
+import contextlib, glob, logging, os, re, requests, signal, sys, threading, time
 from datetime import datetime, timedelta, timezone
 from pathvalidate import is_valid_filename, sanitize_filename
 from plexapi.audio import Album, Track
@@ -41,6 +41,20 @@ class ImageData:
     def __str__(self):
         return str(self.__dict__)
 
+class RateLimiter:
+    def __init__(self, per_second):
+        self.interval = 1 / per_second
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
 def retry_if_not_failed(exception):
     return not isinstance(exception, Failed)
 
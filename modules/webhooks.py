@@ -71,7 +71,8 @@ class Webhooks:
                 "items_removed": stats["removed"],
                 "added_to_radarr": stats["radarr"],
                 "added_to_sonarr": stats["sonarr"],
-                "names": stats["names"]
+                "names": stats["names"],
+                "cache": stats["cache"] if "cache" in stats else {}
             })
 
     def error_hooks(self, text, server=None, library=None, collection=None, playlist=None, critical=True):
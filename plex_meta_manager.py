@@ -1,4 +1,5 @@
 import argparse, os, re, sys, time, traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 try:
@@ -35,6 +36,12 @@ parser.add_argument("-rm", "-m", "--metadata", "--metadata-files", "--run-metada
 parser.add_argument("-dc", "--delete", "--delete-collections", dest="delete", help="Deletes all Collections in the Plex Library before running", action="store_true", default=False)
 parser.add_argument("-nc", "--no-countdown", dest="no_countdown", help="Run without displaying the countdown", action="store_true", default=False)
 parser.add_argument("-nm", "--no-missing", dest="no_missing", help="Run without running the missing section", action="store_true", default=False)
+parser.add_argument("-cm", "--cache-maintenance", dest="cache_maintenance", help="Run cache maintenance at the end of the run", action="store_true", default=False)
+parser.add_argument("-ci", "--cache-import", dest="cache_import", help="Import a cache snapshot at the start of the first run", type=str)
+parser.add_argument("-ce", "--cache-export", dest="cache_export", help="Export a cache snapshot at the end of the run", type=str)
+parser.add_argument("-ct", "--cache-tables", dest="cache_tables", help="Cache tables to export (comma-separated list)", type=str)
+parser.add_argument("-mi", "--mapping-import", dest="mapping_import", help="Import ID mapping files at the start of the first run (comma-separated list)", type=str)
+parser.add_argument("-ms", "--mapping-static", dest="mapping_static", help="Never expire the ID mappings imported with --mapping-import", action="store_true", default=False)
 parser.add_argument("-ro", "--read-only-config", dest="read_only_config", help="Run without writing to the config", action="store_true", default=False)
 parser.add_argument("-d", "--divider", dest="divider", help="Character that divides the sections (Default: '=')", default="=", type=str)
 parser.add_argument("-w", "--width", dest="width", help="Screen Width (Default: 100)", default=100, type=int)
@@ -73,6 +80,12 @@ delete = get_arg("PMM_DELETE_COLLECTIONS", args.delete, arg_bool=True)
 resume = get_arg("PMM_RESUME", args.resume)
 no_countdown = get_arg("PMM_NO_COUNTDOWN", args.no_countdown, arg_bool=True)
 no_missing = get_arg("PMM_NO_MISSING", args.no_missing, arg_bool=True)
+cache_maintenance = get_arg("PMM_CACHE_MAINTENANCE", args.cache_maintenance, arg_bool=True)
+cache_import = get_arg("PMM_CACHE_IMPORT", args.cache_import)
+cache_export = get_arg("PMM_CACHE_EXPORT", args.cache_export)
+cache_tables = get_arg("PMM_CACHE_TABLES", args.cache_tables)
+mapping_import = get_arg("PMM_MAPPING_IMPORT", args.mapping_import)
+mapping_static = get_arg("PMM_MAPPING_STATIC", args.mapping_static, arg_bool=True)
 read_only_config = get_arg("PMM_READ_ONLY_CONFIG", args.read_only_config, arg_bool=True)
 divider = get_arg("PMM_DIVIDER", args.divider)
 screen_width = get_arg("PMM_WIDTH", args.width, arg_int=True)
@@ -84,6 +97,9 @@ if screen_width < 90 or screen_width > 300:
     print(f"Argument Error: width argument invalid: {screen_width} must be an integer between 90 and 300 using the default 100")
     screen_width = 100
 
+# Snapshot and mapping imports only need to run once per process, not on every scheduled run
+completed_imports = set()
+
 default_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config")
 if config_file and os.path.exists(config_file):
     default_dir = os.path.join(os.path.dirname(os.path.abspath(config_file)))
@@ -167,6 +183,12 @@ def embyStart(attrs):
     logger.debug(f"--resume (PMM_RESUME): {resume}")
     logger.debug(f"--no-countdown (PMM_NO_COUNTDOWN): {no_countdown}")
     logger.debug(f"--no-missing (PMM_NO_MISSING): {no_missing}")
+    logger.debug(f"--cache-maintenance (PMM_CACHE_MAINTENANCE): {cache_maintenance}")
+    logger.debug(f"--cache-import (PMM_CACHE_IMPORT): {cache_import}")
+    logger.debug(f"--cache-export (PMM_CACHE_EXPORT): {cache_export}")
+    logger.debug(f"--cache-tables (PMM_CACHE_TABLES): {cache_tables}")
+    logger.debug(f"--mapping-import (PMM_MAPPING_IMPORT): {mapping_import}")
+    logger.debug(f"--mapping-static (PMM_MAPPING_STATIC): {mapping_static}")
     logger.debug(f"--read-only-config (PMM_READ_ONLY_CONFIG): {read_only_config}")
     logger.debug(f"--divider (PMM_DIVIDER): {divider}")
     logger.debug(f"--width (PMM_WIDTH): {screen_width}")
@@ -182,12 +204,44 @@ def embyStart(attrs):
         logger.stacktrace()
         logger.critical(e)
     else:
+        if config.Cache and config.cache_import and "cache_import" not in completed_imports:
+            try:
+                run_cache_import(config)
+                completed_imports.add("cache_import")
+            except Exception as e:
+                logger.stacktrace()
+                logger.error(f"Cache Import Error: {e}")
+        if config.Cache and config.mapping_import and "mapping_import" not in completed_imports:
+            try:
+                run_mapping_import(config)
+                completed_imports.add("mapping_import")
+            except Exception as e:
+                logger.stacktrace()
+                logger.error(f"Mapping Import Error: {e}")
+        if config.Cache and config.general["cache_refresh_ahead"] > 0:
+            try:
+                run_cache_refresh(config)
+            except Exception as e:
+                logger.stacktrace()
+                logger.error(f"Cache Refresh Error: {e}")
         try:
             stats = update_emby_libraries(config)
         except Exception as e:
             config.notify(e)
             logger.stacktrace()
             logger.critical(e)
+        if config.Cache and config.cache_maintenance:
+            try:
+                run_cache_maintenance(config)
+            except Exception as e:
+                logger.stacktrace()
+                logger.error(f"Cache Maintenance Error: {e}")
+        if config.Cache and config.cache_export:
+            try:
+                run_cache_export(config)
+            except Exception as e:
+                logger.stacktrace()
+                logger.error(f"Cache Export Error: {e}")
     logger.info("")
     end_time = datetime.now()
     run_time = str(end_time - start_time).split(".")[0]
@@ -197,12 +251,144 @@ def embyStart(attrs):
         except Failed as e:
             logger.stacktrace()
             logger.error(f"Webhooks Error: {e}")
+        if config.Cache:
+            config.Cache.close()
     version_line = f"Version: {version[0]}"
     if new_version:
         version_line = f"{version_line}        Newest Version: {new_version}"
     logger.separator(f"Finished {start_type}Run\n{version_line}\nFinished: {end_time.strftime('%H:%M:%S %Y-%m-%d')} Run Time: {run_time}")
     logger.remove_main_handler()
 
+def run_cache_import(config):
+    logger.info("")
+    logger.separator("Cache Import")
+    logger.info("")
+    counts = config.Cache.import_snapshot(config.cache_import)
+    longest = max([20] + [len(t) for t in counts])
+    logger.info(f"{'Table':^{longest}} | Inserted | Updated | Skipped")
+    breaker = f"{logger.separating_character * longest}|{logger.separating_character * 10}|{logger.separating_character * 9}|{logger.separating_character * 9}"
+    logger.separator(breaker, space=False, border=False, side_space=False, left=True)
+    for table, data in counts.items():
+        logger.info(f"{table:<{longest}} | {data['inserted']:^8} | {data['updated']:^7} | {data['skipped']:^7}")
+
+def run_mapping_import(config):
+    logger.info("")
+    logger.separator("Mapping Import")
+    logger.info("")
+    for path in config.mapping_import:
+        try:
+            counts, skipped = config.Cache.import_mappings(path, static=config.mapping_static)
+        except Failed as e:
+            logger.error(e)
+            continue
+        logger.info(f"{path}: {skipped} Records Skipped")
+        longest = max([20] + [len(t) for t in counts])
+        logger.info(f"{'Table':^{longest}} |  Read  | Imported")
+        breaker = f"{logger.separating_character * longest}|{logger.separating_character * 8}|{logger.separating_character * 10}"
+        logger.separator(breaker, space=False, border=False, side_space=False, left=True)
+        for table, data in counts.items():
+            logger.info(f"{table:<{longest}} | {data['read']:^6} | {data['imported']:^8}")
+        logger.info("")
+
+def run_cache_export(config):
+    logger.info("")
+    logger.separator("Cache Export")
+    logger.info("")
+    counts = config.Cache.export_snapshot(config.cache_export, tables=config.cache_tables)
+    for table, count in counts.items():
+        logger.info(f"{table}: {count} Rows Exported")
+    logger.info("")
+    logger.info(f"Cache snapshot saved to {config.cache_export}")
+
+def run_cache_refresh(config):
+    logger.info("")
+    logger.separator("Cache Refresh")
+    logger.info("")
+    jobs = []
+    if config.TMDb:
+        tmdb_limit = util.RateLimiter(20)
+        def refresh_imdb_map(imdb_id):
+            tmdb_id, tmdb_type = config.TMDb.convert_imdb_to(imdb_id)
+            config.Cache.update_imdb_to_tmdb_map(tmdb_type, True, imdb_id, tmdb_id)
+        def refresh_tvdb_map(tmdb_id):
+            config.Cache.update_tmdb_to_tvdb_map(True, tmdb_id, config.TMDb.convert_from(tmdb_id, "tvdb_id", False))
+        for table, column, service, func in [
+            ("tmdb_movie_data", "tmdb_id", config.TMDb, config.TMDb.refresh_movie),
+            ("tmdb_show_data", "tmdb_id", config.TMDb, config.TMDb.refresh_show),
+            ("imdb_to_tmdb_map", "imdb_id", config.TMDb, refresh_imdb_map),
+            ("tmdb_to_tvdb_map2", "tmdb_id", config.TMDb, refresh_tvdb_map)
+        ]:
+            jobs.extend([(table, service, tmdb_limit, func, _id) for _id in config.Cache.query_expiring(table, column)])
+    if config.OMDb:
+        omdb_limit = util.RateLimiter(5)
+        def refresh_omdb(imdb_id):
+            config.OMDb.get_omdb(imdb_id, refresh=True)
+        jobs.extend([("omdb_data3", config.OMDb, omdb_limit, refresh_omdb, _id) for _id in config.Cache.query_expiring("omdb_data3", "imdb_id")])
+    if config.Mdblist.has_key:
+        mdb_limit = util.RateLimiter(5)
+        jobs.extend([("mdb_data2", config.Mdblist, mdb_limit, config.Mdblist.refresh, _id) for _id in config.Cache.query_expiring("mdb_data2", "key_id")])
+
+    def refresh(job):
+        table, service, limiter, func, _id = job
+        if getattr(service, "limit", False):
+            return table, None
+        limiter.wait()
+        func(_id)
+        return table, True
+
+    report = {}
+    with ThreadPoolExecutor(max_workers=config.general["cache_refresh_ahead"]) as executor:
+        futures = {executor.submit(refresh, job): job for job in jobs}
+        for future in as_completed(futures):
+            table = futures[future][0]
+            if table not in report:
+                report[table] = {"refreshed": 0, "skipped": 0, "failed": 0}
+            try:
+                _, refreshed = future.result()
+                report[table]["refreshed" if refreshed else "skipped"] += 1
+            except Exception as e:
+                logger.debug(f"Cache Refresh Error: {table} {futures[future][4]}: {e}")
+                report[table]["failed"] += 1
+    config.Cache.flush()
+    if not report:
+        logger.info("No cache entries expire within the next day")
+        return
+    longest = max([20] + [len(t) for t in report])
+    logger.info(f"{'Table':^{longest}} | Refreshed | Skipped | Failed")
+    breaker = f"{logger.separating_character * longest}|{logger.separating_character * 11}|{logger.separating_character * 9}|{logger.separating_character * 8}"
+    logger.separator(breaker, space=False, border=False, side_space=False, left=True)
+    for table, data in report.items():
+        logger.info(f"{table:<{longest}} | {data['refreshed']:^9} | {data['skipped']:^7} | {data['failed']:^6}")
+
+def run_cache_maintenance(config):
+    logger.info("")
+    logger.separator("Cache Maintenance")
+    logger.info("")
+    report, reclaimed = config.Cache.maintenance(max(config.general["cache_retention"], 1), max_rows=config.general["cache_max_rows"])
+    longest = max([len(t) for t in report])
+    logger.info(f"{'Table':^{longest}} | {'Deleted':^9} | {'Reclaimed':^12}")
+    breaker = f"{logger.separating_character * longest}|{logger.separating_character * 11}|{logger.separating_character * 13}"
+    logger.separator(breaker, space=False, border=False, side_space=False, left=True)
+    for table, data in report.items():
+        size = "N/A" if data["reclaimed"] is None else f"{data['reclaimed']} B"
+        logger.info(f"{table:<{longest}} | {data['deleted']:^9} | {size:>12}")
+    logger.info("")
+    logger.info(f"Cache file reduced by {reclaimed} bytes")
+
+def print_cache_stats(cache):
+    cache_stats = cache.get_stats()
+    if not cache_stats:
+        return
+    longest = max([20] + [len(t) for t in cache_stats])
+    logger.info("")
+    logger.separator("Cache Summary", space=False, border=False)
+    logger.info("")
+    logger.info(f"{'Table':^{longest}} |  Hits  | Misses | Expired | Hit Rate | Avg ms")
+    breaker = f"{logger.separating_character * longest}|{logger.separating_character * 8}|{logger.separating_character * 8}|{logger.separating_character * 9}|{logger.separating_character * 10}|"
+    logger.separator(breaker, space=False, border=False, side_space=False, left=True)
+    for table, data in cache_stats.items():
+        logger.info(f"{table:<{longest}} | {data['hits']:^6} | {data['misses']:^6} | {data['expired']:^7} | {data['hit_rate']:>8.1%} | {data['average_ms']:.3f}")
+
 def update_emby_libraries(config):
     for library in config.libraries:
         if library.skip_library:
@@ -366,6 +552,10 @@ def update_emby_libraries(config):
         print_status(library.name, library.status)
     if playlist_status:
         print_status("Playlists", playlist_status)
+    if config.Cache:
+        print_cache_stats(config.Cache)
+    if config.TMDb:
+        logger.debug(f"TMDb Item Cache: {config.TMDb.item_hits} Hits, {config.TMDb.item_misses} Misses")
 
     stats = {"created": 0, "modified": 0, "deleted": 0, "added": 0, "unchanged": 0, "removed": 0, "radarr": 0, "sonarr": 0, "names": []}
     stats["added"] += amount_added
@@ -389,6 +579,7 @@ def update_emby_libraries(config):
         stats["radarr"] += playlist_stats["radarr"]
         stats["sonarr"] += playlist_stats["sonarr"]
         stats["names"].extend([{"name": n, "library": "PLAYLIST"} for n in playlist_stats["names"]])
+    stats["cache"] = config.Cache.get_stats() if config.Cache else {}
     return stats
 
 def emby_library_operations(config, library):
@@ -421,6 +612,10 @@ def emby_library_operations(config, library):
     logger.debug(f"Item Operation: {library.items_library_operation}")
     logger.debug("")
 
+    if config.Cache and library.image_table_name and (library.assets_for_all or library.items_library_operation):
+        image_counts = config.Cache.load_image_maps(library.image_table_name)
+        logger.debug(f"Image Maps Loaded: {sum(image_counts.values())}")
+
     #TODO: Don't think there is a good way to do this in Emby
     if library.split_duplicates:
         items = library.search(**{"duplicate": True})
@@ -442,8 +637,6 @@ def emby_library_operations(config, library):
 
     tmdb_collections = {}
     if library.items_library_operation:
-        itemList = library.get_all(load=True)
-        items = itemList.items
         radarr_adds = []
         sonarr_adds = []
         trakt_ratings = config.Trakt.user_ratings(library.is_movie) if library.mass_trakt_rating_update else []
@@ -453,13 +646,19 @@ def emby_library_operations(config, library):
             for k, v in library.anidb_map.items():
                 reverse_anidb[v] = k
 
-        for i, item in enumerate(items, 1):
-            try:
-                item = library.reload(item)
-            except Failed as e:
-                logger.error(e)
-                continue
-            logger.ghost(f"Processing: {i}/{len(items)} {item.name}")
+        # update_item posts the whole item back so only items that can be edited are reloaded with every field
+        edit_items = library.remove_title_parentheses or library.mass_imdb_parental_labels or library.mass_genre_update or library.genre_mapper \
+                     or library.mass_audience_rating_update or library.mass_critic_rating_update or library.mass_content_rating_update \
+                     or library.content_rating_mapper or library.mass_originally_available_update
+
+        for i, total_items, item in library.iter_all(profile="operations"):
+            if edit_items:
+                try:
+                    item = library.reload(item)
+                except Failed as e:
+                    logger.error(e)
+                    continue
+            logger.ghost(f"Processing: {i}/{total_items} {item.name}")
             if library.assets_for_all:
                 library.find_assets(item)
             tmdb_id, tvdb_id, imdb_id = library.get_ids(item)
@@ -544,14 +743,11 @@ def emby_library_operations(config, library):
             if any([o == "anidb" for o in library.meta_operations]):
                 if item.id in reverse_anidb:
                     anidb_id = reverse_anidb[item.id]
-                elif tvdb_id in config.Convert._tvdb_to_anidb:
-                    anidb_id = config.Convert._tvdb_to_anidb[tvdb_id]
-                elif imdb_id in config.Convert._imdb_to_anidb:
-                    anidb_id = config.Convert._imdb_to_anidb[imdb_id]
                 else:
-                    anidb_id = None
+                    anidb_id = config.Convert.ids_to_anidb(tvdb_id=tvdb_id, imdb_id=imdb_id)
+                if not anidb_id:
                     logger.info(f"{item.name[:25]:<25} | No AniDB ID for Guid: {item.id}")
-                if anidb_id:
+                else:
                     try:
                         anidb_item = config.AniDB.get_anime(anidb_id)
                     except Failed as e:
@@ -731,10 +927,11 @@ def emby_library_operations(config, library):
                         logger.info(f"{item.name[:25]:<25} | Originally Available Date | {new_date.strftime('%Y-%m-%d')}")
                 except Failed:
                     pass
-            try:
-                library.update_item(item, item.id)
-            except ApiException as ae:
-                logger.error(ae)
+            if edit_items:
+                try:
+                    library.update_item(item, item.id)
+                except ApiException as ae:
+                    logger.error(ae)
 
         if library.Radarr and library.radarr_add_all_existing:
             try:
@@ -841,6 +1038,9 @@ def emby_library_operations(config, library):
         for col in unmanaged_collections:
             library.find_assets(col)
 
+    if config.Cache:
+        config.Cache.flush()
+
     #TODO: Metadata backup adaptation possible?
     if library.metadata_backup:
         logger.info("")
@@ -927,6 +1127,12 @@ def start(attrs):
     logger.debug(f"--resume (PMM_RESUME): {resume}")
     logger.debug(f"--no-countdown (PMM_NO_COUNTDOWN): {no_countdown}")
     logger.debug(f"--no-missing (PMM_NO_MISSING): {no_missing}")
+    logger.debug(f"--cache-maintenance (PMM_CACHE_MAINTENANCE): {cache_maintenance}")
+    logger.debug(f"--cache-import (PMM_CACHE_IMPORT): {cache_import}")
+    logger.debug(f"--cache-export (PMM_CACHE_EXPORT): {cache_export}")
+    logger.debug(f"--cache-tables (PMM_CACHE_TABLES): {cache_tables}")
+    logger.debug(f"--mapping-import (PMM_MAPPING_IMPORT): {mapping_import}")
+    logger.debug(f"--mapping-static (PMM_MAPPING_STATIC): {mapping_static}")
     logger.debug(f"--read-only-config (PMM_READ_ONLY_CONFIG): {read_only_config}")
     logger.debug(f"--divider (PMM_DIVIDER): {divider}")
     logger.debug(f"--width (PMM_WIDTH): {screen_width}")
@@ -942,12 +1148,44 @@ def start(attrs):
         logger.stacktrace()
         logger.critical(e)
     else:
+        if config.Cache and config.cache_import and "cache_import" not in completed_imports:
+            try:
+                run_cache_import(config)
+                completed_imports.add("cache_import")
+            except Exception as e:
+                logger.stacktrace()
+                logger.error(f"Cache Import Error: {e}")
+        if config.Cache and config.mapping_import and "mapping_import" not in completed_imports:
+            try:
+                run_mapping_import(config)
+                completed_imports.add("mapping_import")
+            except Exception as e:
+                logger.stacktrace()
+                logger.error(f"Mapping Import Error: {e}")
+        if config.Cache and config.general["cache_refresh_ahead"] > 0:
+            try:
+                run_cache_refresh(config)
+            except Exception as e:
+                logger.stacktrace()
+                logger.error(f"Cache Refresh Error: {e}")
         try:
             stats = update_libraries(config)
         except Exception as e:
             config.notify(e)
             logger.stacktrace()
             logger.critical(e)
+        if config.Cache and config.cache_maintenance:
+            try:
+                run_cache_maintenance(config)
+            except Exception as e:
+                logger.stacktrace()
+                logger.error(f"Cache Maintenance Error: {e}")
+        if config.Cache and config.cache_export:
+            try:
+                run_cache_export(config)
+            except Exception as e:
+                logger.stacktrace()
+                logger.error(f"Cache Export Error: {e}")
     logger.info("")
     end_time = datetime.now()
     run_time = str(end_time - start_time).split(".")[0]
@@ -957,6 +1195,8 @@ def start(attrs):
         except Failed as e:
             logger.stacktrace()
             logger.error(f"Webhooks Error: {e}")
+        if config.Cache:
+            config.Cache.close()
     version_line = f"Version: {version[0]}"
     if new_version:
         version_line = f"{version_line}        Newest Version: {new_version}"
@@ -1139,6 +1379,10 @@ def update_libraries(config):
         print_status(library.name, library.status)
     if playlist_status:
         print_status("Playlists", playlist_status)
+    if config.Cache:
+        print_cache_stats(config.Cache)
+    if config.TMDb:
+        logger.debug(f"TMDb Item Cache: {config.TMDb.item_hits} Hits, {config.TMDb.item_misses} Misses")
 
     stats = {"created": 0, "modified": 0, "deleted": 0, "added": 0, "unchanged": 0, "removed": 0, "radarr": 0, "sonarr": 0, "names": []}
     stats["added"] += amount_added
@@ -1162,6 +1406,7 @@ def update_libraries(config):
         stats["radarr"] += playlist_stats["radarr"]
         stats["sonarr"] += playlist_stats["sonarr"]
         stats["names"].extend([{"name": n, "library": "PLAYLIST"} for n in playlist_stats["names"]])
+    stats["cache"] = config.Cache.get_stats() if config.Cache else {}
     return stats
 
 def library_operations(config, library):
@@ -1194,6 +1439,10 @@ def library_operations(config, library):
     logger.debug(f"Item Operation: {library.items_library_operation}")
     logger.debug("")
 
+    if config.Cache and library.image_table_name and (library.assets_for_all or library.items_library_operation):
+        image_counts = config.Cache.load_image_maps(library.image_table_name)
+        logger.debug(f"Image Maps Loaded: {sum(image_counts.values())}")
+
     if library.split_duplicates:
         items = library.search(**{"duplicate": True})
         for item in items:
@@ -1311,14 +1560,11 @@ def library_operations(config, library):
             if any([o == "anidb" for o in library.meta_operations]):
                 if item.ratingKey in reverse_anidb:
                     anidb_id = reverse_anidb[item.ratingKey]
-                elif tvdb_id in config.Convert._tvdb_to_anidb:
-                    anidb_id = config.Convert._tvdb_to_anidb[tvdb_id]
-                elif imdb_id in config.Convert._imdb_to_anidb:
-                    anidb_id = config.Convert._imdb_to_anidb[imdb_id]
                 else:
-                    anidb_id = None
+                    anidb_id = config.Convert.ids_to_anidb(tvdb_id=tvdb_id, imdb_id=imdb_id)
+                if not anidb_id:
                     logger.info(f"{item.title[:25]:<25} | No AniDB ID for Guid: {item.guid}")
-                if anidb_id:
+                else:
                     try:
                         anidb_item = config.AniDB.get_anime(anidb_id)
                     except Failed as e:
@@ -1572,6 +1818,9 @@ def library_operations(config, library):
         for col in unmanaged_collections:
             library.find_assets(col)
 
+    if config.Cache:
+        config.Cache.flush()
+
     if library.metadata_backup:
         logger.info("")
         logger.separator(f"Metadata Backup for {library.name} Library", space=False, border=False)
@@ -1970,7 +2219,13 @@ try:
             "metadata_files": metadata_files,
             "library_first": library_first,
             "resume": resume,
-            "trace": trace
+            "trace": trace,
+            "cache_maintenance": cache_maintenance,
+            "cache_import": cache_import,
+            "cache_export": cache_export,
+            "cache_tables": cache_tables,
+            "mapping_import": mapping_import,
+            "mapping_static": mapping_static
         })
         # start({
         #     "config_file": config_file,
@@ -1996,7 +2251,7 @@ try:
                 else:
                     raise Failed(f"Argument Error: blank time argument")
         for time_to_run in valid_times:
-            schedule.every().day.at(time_to_run).do(start, {"config_file": config_file, "time": time_to_run, "delete": delete, "library_first": library_first, "trace": trace})
+            schedule.every().day.at(time_to_run).do(start, {"config_file": config_file, "time": time_to_run, "delete": delete, "library_first": library_first, "trace": trace, "cache_maintenance": cache_maintenance, "cache_import": cache_import, "cache_export": cache_export, "cache_tables": cache_tables, "mapping_import": mapping_import, "mapping_static": mapping_static})
         while True:
             schedule.run_pending()
             if not no_countdown:
@@ -0,0 +1,61 @@
+import argparse, os, random, sqlite3, sys, tempfile, time
+from contextlib import closing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.cache import Cache
+
+parser = argparse.ArgumentParser(description="Compare per-call guids_map latency of a connection per call against the persistent Cache connection.")
+parser.add_argument("-r", "--rows", dest="rows", help="Rows to load into guids_map", type=int, default=2000)
+parser.add_argument("-l", "--lookups", dest="lookups", help="Lookups and updates to time", type=int, default=10000)
+parser.add_argument("-j", "--journal-mode", dest="journal_mode", help="Cache journal mode (wal or delete)", default="wal")
+args = parser.parse_args()
+
+cache_params = {
+    "expiration": 60, "busy_timeout": 30, "batch_size": 500, "batch_seconds": 30,
+    "failed_expiration": 1, "compress": False, "journal_mode": args.journal_mode
+}
+
+def per_call_query(cache_path, emby_guid):
+    # The pre-pool Cache pattern: a new connection and cursor for every lookup
+    with sqlite3.connect(cache_path) as connection:
+        connection.row_factory = sqlite3.Row
+        with closing(connection.cursor()) as cursor:
+            cursor.execute("SELECT *, IFNULL(expires_at, 0) <= ? AS expired FROM guids_map WHERE emby_guid = ?", (int(time.time()), emby_guid))
+            return cursor.fetchone()
+
+def per_call_update(cache_path, emby_guid, t_id, imdb_id, expires_at):
+    with sqlite3.connect(cache_path) as connection:
+        with closing(connection.cursor()) as cursor:
+            cursor.execute("INSERT OR IGNORE INTO guids_map(emby_guid) VALUES(?)", (emby_guid,))
+            cursor.execute("UPDATE guids_map SET t_id = ?, imdb_id = ?, expires_at = ? WHERE emby_guid = ?", (t_id, imdb_id, expires_at, emby_guid))
+
+def timed(label, func, calls):
+    start = time.perf_counter()
+    for call in calls:
+        func(*call)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed / len(calls) * 1000000:>8.1f} us/call")
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    config_path = os.path.join(temp_dir, "config.yml")
+    cache = Cache(config_path, cache_params)
+    for i in range(args.rows):
+        cache.update_guid_map(str(i), str(i + 100000), f"tt{i:07d}", False, "movie")
+    cache.flush()
+
+    guids = [(str(random.randrange(args.rows)),) for _ in range(args.lookups)]
+    updates = [(str(random.randrange(args.rows)), str(random.randrange(1000000)), f"tt{random.randrange(10000000):07d}") for _ in range(args.lookups)]
+    expires_at = int(time.time()) + 86400
+
+    print(f"guids_map rows: {args.rows}, calls: {args.lookups}, journal mode: {args.journal_mode}")
+    timed("query_guid_map (per call)", lambda g: per_call_query(cache.cache_path, g), guids)
+    timed("query_guid_map (persistent)", cache.query_guid_map, guids)
+    timed("update_guid_map (per call)", lambda g, t, i: per_call_update(cache.cache_path, g, t, i, expires_at), updates)
+
+    start = time.perf_counter()
+    for g, t, i in updates:
+        cache.update_guid_map(g, t, i, False, None)
+    cache.flush()
+    print(f"{'update_guid_map (persistent)':<32} {(time.perf_counter() - start) / len(updates) * 1000000:>8.1f} us/call")
+    cache.close()
@@ -0,0 +1,66 @@
+import argparse, os, random, sys, tempfile, time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.cache import Cache
+
+parser = argparse.ArgumentParser(description="Compare file size and lookup latency of the column and compressed (cache_compress) TMDb movie cache layouts.")
+parser.add_argument("-r", "--rows", dest="rows", help="Synthetic TMDb movie rows to write", type=int, default=20000)
+parser.add_argument("-l", "--lookups", dest="lookups", help="Random lookups to time", type=int, default=5000)
+parser.add_argument("-s", "--seed", dest="seed", help="Random seed for the synthetic rows", type=int, default=1)
+args = parser.parse_args()
+
+words = ["the", "last", "night", "city", "return", "dark", "love", "war", "story", "home", "lost", "king", "secret", "world", "man", "day"]
+genres = ["Action", "Adventure", "Animation", "Comedy", "Crime", "Drama", "Family", "Fantasy", "Horror", "Romance", "Thriller", "Western"]
+
+def sentence(rng, low, high):
+    return " ".join(rng.choice(words) for _ in range(rng.randint(low, high))).capitalize()
+
+def synthetic_movie(rng, tmdb_id):
+    title = sentence(rng, 1, 5)
+    return SimpleNamespace(
+        tmdb_id=tmdb_id, title=title, original_title=title, studio=sentence(rng, 1, 3), overview=sentence(rng, 30, 80),
+        tagline=sentence(rng, 4, 10), imdb_id=f"tt{rng.randrange(10000000):07d}",
+        poster_url=f"https://image.tmdb.org/t/p/original/{rng.getrandbits(128):032x}.jpg",
+        backdrop_url=f"https://image.tmdb.org/t/p/original/{rng.getrandbits(128):032x}.jpg",
+        vote_count=rng.randrange(50000), vote_average=round(rng.uniform(1, 10), 1), language_iso="en", language_name="English",
+        genres=rng.sample(genres, rng.randint(1, 4)), keywords=[sentence(rng, 1, 2) for _ in range(rng.randint(0, 12))],
+        release_date=datetime(1950, 1, 1) + timedelta(days=rng.randrange(27000)),
+        collection_id=rng.randrange(1000000) if rng.random() < 0.2 else None, collection_name=sentence(rng, 2, 4) if rng.random() < 0.2 else None
+    )
+
+def run(compress):
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = Cache(os.path.join(temp_dir, "config.yml"), {
+            "expiration": 60, "busy_timeout": 30, "batch_size": 500, "batch_seconds": 30,
+            "failed_expiration": 1, "compress": compress, "journal_mode": "delete"
+        })
+        for tmdb_id in range(1, args.rows + 1):
+            cache.update_tmdb_movie(False, synthetic_movie(rng, tmdb_id), 60)
+        cache.flush()
+        with cache._cursor() as cursor:
+            cursor.execute("VACUUM")
+        size = os.path.getsize(cache.cache_path)
+
+        lookups = [rng.randint(1, args.rows) for _ in range(args.lookups)]
+        start = time.perf_counter()
+        for tmdb_id in lookups:
+            cache.query_tmdb_movie(tmdb_id, 60)
+        query_only = (time.perf_counter() - start) / len(lookups) * 1000000
+
+        start = time.perf_counter()
+        for tmdb_id in lookups:
+            tmdb_dict, _ = cache.query_tmdb_movie(tmdb_id, 60)
+            tmdb_dict["title"], tmdb_dict["overview"], tmdb_dict["release_date"]
+        with_reads = (time.perf_counter() - start) / len(lookups) * 1000000
+        cache.close()
+    return size, query_only, with_reads
+
+print(f"tmdb_movie_data rows: {args.rows}, lookups: {args.lookups}")
+print(f"{'layout':<12} {'file size':>12} {'query only':>12} {'query + field reads':>20}")
+for label, compress in [("columns", False), ("compressed", True)]:
+    size, query_only, with_reads = run(compress)
+    print(f"{label:<12} {size // 1024:>8} KiB {query_only:>9.1f} us {with_reads:>17.1f} us")
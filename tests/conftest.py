@@ -0,0 +1,11 @@
+import os, sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def my_logger(tmp_path, monkeypatch):
+    from modules import builder
+    from modules.logs import MyLogger
+    monkeypatch.setattr(builder, "logger", MyLogger("Plex Meta Manager Test", str(tmp_path), 100, "=", True, False))
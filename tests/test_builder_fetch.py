@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+from modules.builder import CollectionBuilder
+
+class FakeLibrary:
+    def __init__(self, items):
+        self.items = {item.id: item for item in items}
+        self.calls = []
+
+    def fetch_items(self, ids, filters=None):
+        self.calls.append(list(ids))
+        return {i: self.items[i] for i in ids if i in self.items}
+
+def emby_item(item_id, name, item_type="Movie"):
+    return SimpleNamespace(id=item_id, name=name, type=item_type)
+
+def collection_builder(library, **attrs):
+    collection = CollectionBuilder.__new__(CollectionBuilder)
+    collection.library = library
+    collection.libraries = [library]
+    collection.filters = []
+    collection.tmdb_filters = []
+    collection.playlist = False
+    collection.collection_level = "movie"
+    collection.do_missing = False
+    collection.parts_collection = False
+    collection.ignore_ids = []
+    collection.ignore_imdb_ids = []
+    collection.missing_movies = []
+    collection.missing_shows = []
+    collection.added_items = []
+    collection.filtered_keys = {}
+    collection.details = {"show_filtered": False, "only_filter_missing": False}
+    collection.obj = None
+    collection.name = "Test"
+    collection.Type = "Collection"
+    for attr, value in attrs.items():
+        setattr(collection, attr, value)
+    return collection
+
+def test_load_items_fetches_int_and_string_ids():
+    movie, other, loaded = emby_item("1001", "Movie"), emby_item("1002", "Other"), emby_item("1003", "Loaded")
+    library = FakeLibrary([movie, other])
+    collection = collection_builder(library)
+
+    items = collection.load_items(["1001", 1002, loaded, "1001", "9999"])
+
+    assert library.calls == [["1001", "1002", "9999"]]
+    assert items == [movie, other, loaded, movie]
+
+def test_filter_and_save_items_with_mapped_movie_ids(my_logger):
+    # map_guids stores int(item.id) in movie_map and show_map but the string item.id in imdb_map
+    first, second = emby_item("1001", "First"), emby_item("1002", "Second")
+    library = FakeLibrary([first, second])
+    library.movie_map = {603: [1001]}
+    library.imdb_map = {"tt0133093": ["1002"]}
+    collection = collection_builder(library)
+
+    collection.filter_and_save_items([(603, "tmdb"), ("tt0133093", "imdb"), (604, "tmdb")])
+
+    assert library.calls == [["1001", "1002"]]
+    assert collection.added_items == [first, second]
+    assert collection.missing_movies == [604]
+
+def test_filter_and_save_items_with_mapped_show_ids(my_logger):
+    first, second = emby_item("2001", "First", "Series"), emby_item("2002", "Second", "Series")
+    library = FakeLibrary([first, second])
+    library.show_map = {81189: [2001]}
+    library.imdb_map = {"tt0903747": ["2002"]}
+    collection = collection_builder(library, collection_level="show")
+
+    collection.filter_and_save_items([("81189", "tvdb"), ("tt0903747", "imdb"), ("79168", "tvdb")])
+
+    assert library.calls == [["2001", "2002"]]
+    assert collection.added_items == [first, second]
+    assert collection.missing_shows == ["79168"]
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+from modules.builder import CollectionBuilder
+from modules.util import Failed
+
+class FakeLibrary:
+    def __init__(self, sorted_items=None, error=None):
+        self.sorted_items = sorted_items
+        self.error = error
+        self.searches = []
+
+    def get_filter_items(self, data):
+        self.searches.append(data)
+        if self.error:
+            raise Failed(self.error)
+        return self.sorted_items
+
+    def moveItem(self, obj, item, after):
+        raise AssertionError("Emby collections cannot be reordered")
+
+def collection_builder(library, custom_sort, items, added_items=None):
+    collection = CollectionBuilder.__new__(CollectionBuilder)
+    collection.library = library
+    collection.custom_sort = custom_sort
+    collection.items = items
+    collection.added_items = added_items or []
+    collection.name = "Marvel"
+    collection.Type = "Collection"
+    collection.obj = None
+    return collection
+
+def emby_items(*ids):
+    return [SimpleNamespace(id=i, name=f"Item {i}") for i in ids]
+
+def test_sort_collection_searches_by_emby_sort(caplog, my_logger):
+    library = FakeLibrary(sorted_items=emby_items("2", "1"))
+    collection = collection_builder(library, "release.desc", emby_items("1", "2"))
+
+    collection.sort_collection()
+
+    assert library.searches == [{"sort_by": "release.desc", "all": {"collection": "Marvel"}}]
+    assert "does not support reordering" in caplog.text
+
+def test_sort_collection_already_sorted(caplog, my_logger):
+    library = FakeLibrary(sorted_items=emby_items("1", "2"))
+    collection = collection_builder(library, "title.asc", emby_items("1", "2"))
+
+    collection.sort_collection()
+
+    assert "already sorted" in caplog.text
+    assert "does not support reordering" not in caplog.text
+
+def test_sort_collection_custom_order_compares_by_id(caplog, my_logger):
+    collection = collection_builder(FakeLibrary(), True, emby_items("1", "2"), added_items=emby_items("1", "2"))
+
+    collection.sort_collection()
+
+    assert "already sorted" in caplog.text
+
+def test_sort_collection_search_failure_is_logged(caplog, my_logger):
+    collection = collection_builder(FakeLibrary(error="Emby Error: Collection: Marvel not found"), "title", emby_items("1"))
+
+    collection.sort_collection()
+
+    assert "Collection: Marvel not found" in caplog.text
@@ -0,0 +1,39 @@
+import multiprocessing, os, sqlite3
+from contextlib import closing
+
+import pytest
+
+from modules.cache import Cache
+
+processes = 6
+rows_per_process = 300
+
+def cache_params(journal_mode):
+    return {
+        "expiration": 60, "busy_timeout": 30, "batch_size": 25, "batch_seconds": 30,
+        "failed_expiration": 1, "compress": False, "journal_mode": journal_mode
+    }
+
+def write_guid_maps(config_path, journal_mode, worker):
+    try:
+        cache = Cache(config_path, cache_params(journal_mode))
+        for i in range(rows_per_process):
+            cache.update_guid_map(f"{worker}-{i}", str(worker * 100000 + i), f"tt{i:07d}", False, "movie")
+            if i % 50 == 0:
+                cache.query_guid_map(f"{worker}-{i}")
+        cache.close()
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+@pytest.mark.parametrize("journal_mode", ["wal", "delete"])
+def test_processes_share_cache_file(tmp_path, journal_mode):
+    config_path = str(tmp_path / "config.yml")
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        errors = pool.starmap(write_guid_maps, [(config_path, journal_mode, w) for w in range(processes)])
+    assert [e for e in errors if e] == []
+
+    with closing(sqlite3.connect(f"{os.path.splitext(config_path)[0]}.cache")) as connection:
+        rows = connection.execute("SELECT emby_guid, t_id FROM guids_map").fetchall()
+    assert len(rows) == processes * rows_per_process
+    assert dict(rows) == {f"{w}-{i}": str(w * 100000 + i) for w in range(processes) for i in range(rows_per_process)}
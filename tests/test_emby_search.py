@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+import pytest
+
+# modules.emby and modules.builder import each other, so builder has to load first
+from modules import builder, emby
+from modules.util import Failed
+
+class FakeItemsService:
+    def __init__(self, items):
+        self.items = items
+        self.calls = []
+
+    def get_users_by_userid_items(self, **kwargs):
+        self.calls.append(kwargs)
+        start, limit = kwargs["start_index"], kwargs["limit"]
+        return SimpleNamespace(items=self.items[start:start + limit], total_record_count=len(self.items))
+
+def emby_library(items, collections=None):
+    library = emby.Emby.__new__(emby.Emby)
+    library.user_id = "user"
+    library.library_id = "library"
+    library.item_types = "Movie"
+    library.page_size = 2
+    library.items_service = FakeItemsService(items)
+    library.service = lambda api, admin=False: library.items_service
+    library.get_collection_id = lambda name: (collections or {}).get(name)
+    return library
+
+def test_get_filter_items_rejects_plex_uri():
+    library = emby_library([])
+    with pytest.raises(Failed):
+        library.get_filter_items("?type=1&sort=titleSort&genre=Action")
+
+def test_collection_search_queries_the_collection():
+    items = [SimpleNamespace(id=str(i)) for i in range(3)]
+    library = emby_library(items, collections={"Marvel": "501"})
+
+    found = library.get_filter_items({"sort_by": "release.desc", "all": {"collection": "Marvel"}})
+
+    assert found == items
+    assert [c["parent_id"] for c in library.items_service.calls] == ["501", "501"]
+    assert all(c["include_item_types"] is None for c in library.items_service.calls)
+    assert all(c["sort_by"] == "PremiereDate,Id" and c["sort_order"] == "Descending" for c in library.items_service.calls)
+
+def test_search_pages_in_a_stable_order():
+    library = emby_library([SimpleNamespace(id="1")])
+
+    library.get_filter_items({"genre": "Action"})
+
+    assert library.items_service.calls[0]["parent_id"] == "library"
+    assert library.items_service.calls[0]["include_item_types"] == "Movie"
+    assert library.items_service.calls[0]["genres"] == "Action"
+    assert library.items_service.calls[0]["sort_by"] == "SortName,Id"
+
+def test_missing_collection_fails():
+    library = emby_library([])
+    with pytest.raises(Failed):
+        library.build_search({"all": {"collection": "Missing"}})